@@ -1,19 +1,214 @@
-from typing import List
-import re
+from typing import (
+    BinaryIO,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Union,
+)
+import codecs
+import contextlib
+import hashlib
 import os
+import sys
+import types
+
+from compressed import detect_compression, open_compressed, open_decompressed
+from dedup import SentenceDeduplicator
+from mapped_book import MappedBook
+from match_table import MatchTable
+from question import Question
+from question_cache import QuestionCache
+from sentence_splitter import (
+    ABBREVIATIONS,
+    SentenceStream,
+    compile_boundary,
+    split_sentences,
+)
+from text_encoding import SNIFF_BYTES, is_bytes_compatible, sniff_encoding
+from word_matcher import AhoCorasick, WholeWordMatcher, load_matcher
 
 # create comment to how to use the methods
 
+# Characters read per step by the streaming methods
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+Matcher = Union[AhoCorasick, WholeWordMatcher]
+
+
+def _hash_code(code: types.CodeType, digest) -> None:
+    # Bytecode, constants and names, nested functions included
+    digest.update(code.co_code)
+    digest.update(" ".join(code.co_names).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _hash_code(const, digest)
+        else:
+            digest.update(repr(const).encode())
+
+
+def callable_identity(func: Callable) -> Optional[str]:
+    """
+    Returns a name for ``func`` that is the same in every process and tells
+    apart functions that behave differently, or None when there is none.
+
+    Python functions are named by module, qualified name and a hash of their
+    code, so two lambdas differ. Functions that capture values (closures,
+    defaults) and callables bound to an instance have no such name: what
+    they do depends on state the name cannot see.
+    """
+
+    if isinstance(func, types.FunctionType):
+        if func.__closure__ or func.__defaults__ or func.__kwdefaults__:
+            return None
+        digest = hashlib.blake2b(digest_size=8)
+        _hash_code(func.__code__, digest)
+        return f"{func.__module__}.{func.__qualname__}:{digest.hexdigest()}"
+    if isinstance(func, types.MethodDescriptorType):
+        # e.g. str.lower
+        return f"{func.__objclass__.__module__}.{func.__qualname__}"
+    if isinstance(func, types.BuiltinFunctionType) and (
+        func.__self__ is None or isinstance(func.__self__, types.ModuleType)
+    ):
+        return f"{func.__module__}.{func.__qualname__}"
+    return None
+
 
 class QuestionEngine:
-    def __init__(self, book_file_path: str, words_file_path: str):
+    def __init__(
+        self,
+        book_file_path: str,
+        words_file_path: str,
+        match_order: str = "list",
+        cache: Optional[QuestionCache] = None,
+        use_matcher_artifact: bool = False,
+        match_mode: str = "substring",
+        casefold: bool = False,
+        lemmatize: Optional[Callable[[str], str]] = None,
+        abbreviations: Iterable[str] = ABBREVIATIONS,
+        dedup: bool = False,
+        encoding: Optional[str] = None,
+        lemmatize_id: Optional[str] = None,
+    ):
+        if match_order not in ("list", "text"):
+            raise ValueError("match_order must be 'list' or 'text'")
+        if match_mode not in ("substring", "word"):
+            raise ValueError("match_mode must be 'substring' or 'word'")
         self.book_file_path = book_file_path
         self.words_file_path = words_file_path
+        # "list": the first word of the word list found in the sentence wins.
+        # "text": the word that starts earliest in the sentence wins.
+        self.match_order = match_order
+        self.cache = cache
+        # Reuse the compiled word list saved next to the words file
+        self.use_matcher_artifact = use_matcher_artifact
+        # "substring": "art" matches "party", like `word in sentence`.
+        # "word": only whole words match; casefold and lemmatize apply here.
+        self.match_mode = match_mode
+        self.casefold = casefold
+        self.lemmatize = lemmatize
+        # Names lemmatize in caches and saved indexes; by default derived
+        # from the function by callable_identity
+        self.lemmatize_id = lemmatize_id
+        # Words whose trailing period does not end a sentence ("Mr.")
+        self.abbreviations = tuple(sorted(set(abbreviations)))
+        self._boundary = compile_boundary(self.abbreviations)
+        # Drop questions whose sentence repeats, or nearly repeats, an earlier one
+        self.dedup = dedup
+        # None: the locale default, like open(); "auto": sniffed from the
+        # first bytes of the book; or any codec name
+        self.encoding = encoding
+
+    def engine_options(self) -> Optional[dict]:
+        """
+        Everything besides the input files that changes the questions.
+
+        Returns None when ``lemmatize`` has no stable identity (see
+        ``callable_identity``) and no ``lemmatize_id`` was given: the options
+        cannot then tell two engines apart, so nothing is cached or saved.
+        """
+
+        options = {
+            "match_order": self.match_order,
+            "match_mode": self.match_mode,
+            "abbreviations": list(self.abbreviations),
+        }
+        if self.match_mode == "word":
+            options["casefold"] = self.casefold
+            lemmatize = self.lemmatize_id
+            if lemmatize is None and self.lemmatize is not None:
+                lemmatize = callable_identity(self.lemmatize)
+                if lemmatize is None:
+                    return None
+            options["lemmatize"] = lemmatize
+        if self.dedup:
+            options["dedup"] = True
+        if self.encoding is not None:
+            options["encoding"] = self.encoding
+        return options
+
+    def open_raw_book(self) -> BinaryIO:
+        # The bytes of the book, decompressed while they are read
+        compression = detect_compression(self.book_file_path)
+        if compression is None:
+            return open(self.book_file_path, "rb")
+        return open_decompressed(self.book_file_path, compression)
+
+    def book_encoding(self) -> Optional[str]:
+        """
+        Returns the encoding the book is read with, sniffing it from the first
+        ``SNIFF_BYTES`` of the book when ``encoding`` is ``"auto"``.
+        """
+
+        if self.encoding != "auto":
+            return self.encoding
+        with self.open_raw_book() as file:
+            return sniff_encoding(file.read(SNIFF_BYTES))
+
+    def open_book(self) -> TextIO:
+        # Plain text, or a compressed book decompressed while it is read
+        encoding = self.book_encoding()
+        compression = detect_compression(self.book_file_path)
+        if compression is not None:
+            return open_compressed(self.book_file_path, compression, encoding)
+        if encoding is None:
+            return open(self.book_file_path, "r")
+        return open(self.book_file_path, "r", encoding=encoding)
 
     def read_file_from_local(self) -> str:
-        with open(self.book_file_path, "r") as file:
+        with self.open_book() as file:
             return file.read()
 
+    def read_mapped_book(self) -> MappedBook:
+        """
+        Memory-maps the book and indexes its sentences by byte offsets.
+
+        Use it as a context manager so the mapping is released:
+
+            with qe.read_mapped_book() as book:
+                first = book.sentence(0)
+
+        Compressed books cannot be mapped; use ``iter_bytes_questions`` for
+        them. The book is decoded as UTF-8 unless ``encoding`` says otherwise.
+        """
+
+        if detect_compression(self.book_file_path) is not None:
+            raise ValueError("compressed books cannot be memory-mapped")
+        return MappedBook(
+            self.book_file_path,
+            encoding=self._bytes_encoding(),
+            boundary=compile_boundary(self.abbreviations, binary=True),
+        )
+
+    def _bytes_encoding(self) -> str:
+        # The bytes paths default to UTF-8 rather than the locale
+        encoding = self.book_encoding() or "utf-8"
+        if not is_bytes_compatible(encoding):
+            raise ValueError(f"{encoding} text cannot be scanned as bytes")
+        return encoding
+
     def read_words_from_file(self) -> List[str]:
         """
         Reads words from a file and returns a list of strings.
@@ -35,13 +230,104 @@ class QuestionEngine:
         return words
 
     def parse_text_to_sentences(self, text: str) -> list:
-        # Parse the text to sentences
-        sentences = re.split(
-            r"(?<=[.!?])\s+", text.replace("\n", " ").replace("\r", "")
-        )
+        # Parse the text to sentences, line breaks are joined per sentence
+        sentences = split_sentences(text, self._boundary)
         return sentences
 
+    def sentence_stream(self) -> SentenceStream:
+        # Incremental splitter using this engine's sentence boundaries
+        return SentenceStream(self._boundary)
+
+    def iter_sentences(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        """
+        Streams the sentences of the book without loading the whole file.
+
+        The book, decompressed on the fly if it is compressed, is read
+        ``chunk_size`` characters at a time and the partial sentence at the
+        end of each chunk is carried over to the next one, so the sentences
+        are the same as ``parse_text_to_sentences`` returns for the whole text
+        while memory stays bounded by the chunk size.
+
+        Args:
+            chunk_size (int): Number of characters read per step.
+
+        Yields:
+            str: The sentences of the book, in order.
+        """
+
+        stream = self.sentence_stream()
+        with self.open_book() as file:
+            for chunk in iter(lambda: file.read(chunk_size), ""):
+                yield from stream.feed(chunk)
+
+        yield from stream.close()
+
+    def sentence_deduplicator(self) -> Optional[SentenceDeduplicator]:
+        # A fresh one per run; only matched sentences are checked, so
+        # sentences that cannot become questions cost nothing
+        if self.dedup:
+            return SentenceDeduplicator()
+        return None
+
+    def iter_raw_sentences(
+        self, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """
+        Bytes counterpart of ``iter_sentences``: the sentences are split on
+        the raw bytes of the book and never decoded.
+        """
+
+        stream = SentenceStream(compile_boundary(self.abbreviations, binary=True))
+        with self.open_raw_book() as file:
+            for chunk in iter(lambda: file.read(chunk_size), b""):
+                yield from stream.feed(chunk)
+
+        yield from stream.close()
+
+    def build_matcher(self, words: List[str]) -> Matcher:
+        # Compile the word list once so each sentence is scanned in one pass
+        if self.match_mode == "word":
+            return WholeWordMatcher(words, self.casefold, self.lemmatize)
+        return AhoCorasick(words)
+
+    def load_word_matcher(self) -> Matcher:
+        """
+        Returns the compiled matcher for the word list.
+
+        With ``use_matcher_artifact`` the matcher compiled by an earlier run is
+        loaded from next to the words file, unless the file has changed since.
+        """
+
+        if self.use_matcher_artifact and self.match_mode == "substring":
+            return load_matcher(self.words_file_path)
+        return self.build_matcher(self.read_words_from_file())
+
+    def match_function(self, matcher: Matcher) -> Callable[[str], Optional[str]]:
+        if self.match_order == "list":
+            return matcher.first_match
+        return matcher.leftmost_match
+
     def question_generator(self) -> List[dict]:
+        options = self.engine_options()
+        if self.cache is None or options is None:
+            return self._generate_questions()
+
+        key = self.cache.make_key(self.book_file_path, self.words_file_path, options)
+        questions = self.cache.get(key)
+        if questions is None:
+            questions = self._generate_questions()
+            self.cache.put(key, questions)
+        return questions
+
+    def _generate_questions(self) -> List[dict]:
+        return [question.as_dict() for question in self.question_records()]
+
+    def question_records(self) -> List[Question]:
+        """
+        Same questions as ``question_generator``, as compact ``Question``
+        records that share one table of the matched sentences.
+        """
+
         # Read the text from the file
         text: str = self.read_file_from_local()
 
@@ -49,22 +335,145 @@ class QuestionEngine:
         sentences: List[str] = self.parse_text_to_sentences(text)
 
         # Read the word list from the file
-        words: List[str] = self.read_words_from_file()
+        matcher: Matcher = self.load_word_matcher()
 
         # Filter the sentences that contain the words
+        find = self.match_function(matcher)
+        dedup = self.sentence_deduplicator()
+        matched: List[str] = []
         questions = []
         for sentence in sentences:
-            for word in words:
-                if word in sentence:
-                    questions.append({"sentence": sentence, "word": word})
-                    break
+            word = find(sentence)
+            if word is not None and not (dedup and dedup.is_duplicate(sentence)):
+                questions.append(Question(matched, len(matched), word))
+                matched.append(sentence)
 
         return questions
 
+    def match_table(self) -> MatchTable:
+        """
+        Finds every occurrence of every word instead of the first word only.
 
-# create an instance of the class and call question_generator method
-# Get the absolute path of the current directory
+        Returns:
+            MatchTable: One row per ``(sentence, word, offset)`` match, ordered
+            by sentence and then by offset.
+        """
+
+        sentences = self.parse_text_to_sentences(self.read_file_from_local())
+        words = self.read_words_from_file()
+        matcher = self.build_matcher(words)
+
+        table = MatchTable(sentences, words)
+        for sentence_id, sentence in enumerate(sentences):
+            for offset, word_id in sorted(matcher.iter_matches(sentence)):
+                table.append(sentence_id, word_id, offset)
+        return table
+
+    def iter_questions(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+        """
+        Lazy, streaming counterpart of ``question_generator``.
+
+        Sentences come from ``iter_sentences`` and each question is yielded as
+        soon as it is found, so memory does not grow with the size of the book.
+        """
+
+        find = self.match_function(self.load_word_matcher())
+        dedup = self.sentence_deduplicator()
+        for sentence in self.iter_sentences(chunk_size):
+            word = find(sentence)
+            if word is not None and not (dedup and dedup.is_duplicate(sentence)):
+                yield {"sentence": sentence, "word": word}
+
+    def iter_mapped_questions(self) -> Iterator[dict]:
+        """
+        Generates the questions from the memory-mapped book.
+
+        The words are matched against the raw bytes of each sentence, as
+        views of the mapped file that are not copied (see
+        ``MappedBook.iter_match_views``), and a sentence is only decoded to
+        ``str`` when it is part of a question.
+        """
+
+        words = self.read_words_from_file()
+        dedup = self.sentence_deduplicator()
+        if self.match_mode == "word":
+            # Tokenizing needs str, so every sentence is decoded in this mode
+            find = self.match_function(self.build_matcher(words))
+            with self.read_mapped_book() as book:
+                for index in range(len(book)):
+                    sentence = book.sentence(index)
+                    word = find(sentence)
+                    if word is not None and not (
+                        dedup and dedup.is_duplicate(sentence)
+                    ):
+                        yield {"sentence": sentence, "word": word}
+            return
+
+        encoding = self._bytes_encoding()
+        find = self._bytes_match_function(words, encoding)
+        multiword = any(" " in word for word in words)
+        with self.read_mapped_book() as book:
+            views = book.iter_match_views(multiword)
+            with contextlib.closing(views):
+                for _, raw in views:
+                    word = find(raw)
+                    if word is not None:
+                        sentence = book.decode(raw)
+                        if not (dedup and dedup.is_duplicate(sentence)):
+                            yield {"sentence": sentence, "word": word}
+
+    def _bytes_match_function(
+        self, words: List[str], encoding: str
+    ) -> Callable[[bytes], Optional[str]]:
+        # Match the encoded words on raw bytes, return the word as str
+        codec = codecs.lookup(encoding).name
+        if codec == "utf-8-sig":
+            codec = "utf-8"
+        encoded = [word.encode(codec) for word in words]
+        decoded = dict(zip(encoded, words))
+        find = self.match_function(self.build_matcher(encoded))
+
+        def match(raw: bytes) -> Optional[str]:
+            word = find(raw)
+            return None if word is None else decoded[word]
+
+        return match
+
+    def iter_bytes_questions(
+        self, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[dict]:
+        """
+        Streaming questions matched on the raw bytes of the book.
+
+        Sentences are split and matched without decoding the book; only the
+        sentences that become questions are decoded. Plain and compressed
+        books work alike and memory stays bounded by the chunk size.
+
+        This needs ``substring`` matching and UTF-8 or a single-byte encoding
+        (see ``text_encoding.is_bytes_compatible``); otherwise the questions
+        come from ``iter_questions``. As in ``MappedBook``, only ASCII
+        whitespace separates sentences here.
+        """
+
+        encoding = self.book_encoding() or "utf-8"
+        if self.match_mode != "substring" or not is_bytes_compatible(encoding):
+            yield from self.iter_questions(chunk_size)
+            return
+
+        find = self._bytes_match_function(self.read_words_from_file(), encoding)
+        dedup = self.sentence_deduplicator()
+        for raw in self.iter_raw_sentences(chunk_size):
+            word = find(raw)
+            if word is not None:
+                sentence = raw.decode(encoding)
+                if not (dedup and dedup.is_duplicate(sentence)):
+                    yield {"sentence": sentence, "word": word}
+
+
+# Run the command-line entry point, on the sample data when no arguments
 def main():
+    from cli import main as cli_main
+
     current_dir = os.path.abspath(os.getcwd())
 
     # Construct the absolute paths for the book file and words file
@@ -75,13 +484,16 @@ def main():
         os.path.join(current_dir, "../data/words/6000.txt")
     )
 
-    # Create an instance of the class and call question_generator method
-    qe = QuestionEngine(book_file_path, words_file_path)
-    questions = qe.question_generator()
-    print(questions)
-    questions = qe.question_generator()
-    print(questions)
+    # Repeat runs on the sample book are served from the question cache
+    default_args = [
+        book_file_path,
+        "--words",
+        words_file_path,
+        "--cache-dir",
+        os.path.expanduser("~/.cache/question_engine"),
+    ]
+    return cli_main(sys.argv[1:] or default_args)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,121 @@
+from concurrent.futures import Executor
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+import asyncio
+import functools
+import threading
+
+from dedup import SentenceDeduplicator
+from QuestionEngine import DEFAULT_CHUNK_SIZE, QuestionEngine
+from sentence_splitter import SentenceStream
+
+
+class _ChunkReader:
+    # Book state of one iter_questions call, used from executor threads
+
+    def __init__(
+        self,
+        file,
+        stream: SentenceStream,
+        find: Callable[[str], Optional[str]],
+        chunk_size: int,
+        dedup: Optional[SentenceDeduplicator] = None,
+    ):
+        self._file = file
+        self._stream = stream
+        self._find = find
+        self._dedup = dedup
+        self._chunk_size = chunk_size
+        self._lock = threading.Lock()
+
+    def next_batch(self) -> Tuple[List[dict], bool]:
+        with self._lock:
+            chunk = self._file.read(self._chunk_size)
+            sentences = self._stream.feed(chunk) if chunk else self._stream.close()
+        questions = []
+        for sentence in sentences:
+            word = self._find(sentence)
+            if word is not None and not self._is_duplicate(sentence):
+                questions.append({"sentence": sentence, "word": word})
+        return questions, not chunk
+
+    def _is_duplicate(self, sentence: str) -> bool:
+        # Batches run one after another, so the deduplicator is never shared
+        return self._dedup is not None and self._dedup.is_duplicate(sentence)
+
+    def try_close(self) -> bool:
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._file.close()
+        finally:
+            self._lock.release()
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class AsyncQuestionEngine:
+    """
+    Asynchronous facade over ``QuestionEngine`` for use in a web server.
+
+    File reads and matching run in an executor, one chunk of the book per
+    job, so the event loop is never blocked by I/O or by matching a whole
+    book. Questions come out of an async generator: the next chunk is only
+    read once the consumer has taken the previous batch, which gives
+    backpressure per request, and a consumer that stops iterating or is
+    cancelled stops the work after the chunk in progress.
+
+    Args:
+        engine (QuestionEngine): The configured engine to run.
+        executor (Executor): Where blocking work runs; the loop's default
+            thread pool if omitted.
+        chunk_size (int): Characters of the book processed per job.
+
+    Usage:
+        engine = AsyncQuestionEngine(QuestionEngine(book_path, words_path))
+        async for question in engine.iter_questions():
+            await response.write(json.dumps(question))
+    """
+
+    def __init__(
+        self,
+        engine: QuestionEngine,
+        executor: Optional[Executor] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self.engine = engine
+        self.executor = executor
+        self.chunk_size = chunk_size
+
+    async def _run(self, func: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args))
+
+    async def iter_questions(self) -> AsyncIterator[dict]:
+        """
+        Yields the same questions as ``QuestionEngine.iter_questions``.
+        """
+
+        matcher = await self._run(self.engine.load_word_matcher)
+        reader = _ChunkReader(
+            await self._run(self.engine.open_book),
+            self.engine.sentence_stream(),
+            self.engine.match_function(matcher),
+            self.chunk_size,
+            self.engine.sentence_deduplicator(),
+        )
+        try:
+            done = False
+            while not done:
+                questions, done = await self._run(reader.next_batch)
+                for question in questions:
+                    yield question
+        finally:
+            if not reader.try_close():
+                # Cancelled mid-chunk: close once the running job is over
+                asyncio.get_running_loop().run_in_executor(self.executor, reader.close)
+
+    async def question_generator(self) -> List[dict]:
+        return [question async for question in self.iter_questions()]
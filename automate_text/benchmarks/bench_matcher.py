@@ -0,0 +1,100 @@
+"""
+Compares the original nested ``word in sentence`` loop with the compiled
+Aho-Corasick matcher used by ``QuestionEngine.question_generator``.
+
+Usage:
+    python benchmarks/bench_matcher.py
+    python benchmarks/bench_matcher.py --book ../data/books/pride_and_prejudice.txt \\
+        --words ../data/words/6000.txt
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from QuestionEngine import QuestionEngine  # noqa: E402
+from word_matcher import AhoCorasick  # noqa: E402
+
+
+def synthetic_words(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        length = rng.randint(4, 9)
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(length)))
+    return sorted(words)
+
+
+def synthetic_sentences(words: List[str], count: int, seed: int = 1) -> List[str]:
+    rng = random.Random(seed)
+    filler = synthetic_words(500, seed=seed + 1)
+    sentences = []
+    for _ in range(count):
+        tokens = [rng.choice(filler) for _ in range(rng.randint(8, 20))]
+        if rng.random() < 0.3:
+            tokens[rng.randrange(len(tokens))] = rng.choice(words)
+        sentences.append(" ".join(tokens).capitalize() + ".")
+    return sentences
+
+
+def naive_questions(sentences: List[str], words: List[str]) -> List[dict]:
+    questions = []
+    for sentence in sentences:
+        for word in words:
+            if word in sentence:
+                questions.append({"sentence": sentence, "word": word})
+                break
+    return questions
+
+
+def automaton_questions(sentences: List[str], words: List[str]) -> List[dict]:
+    matcher = AhoCorasick(words)
+    questions = []
+    for sentence in sentences:
+        word: Optional[str] = matcher.first_match(sentence)
+        if word is not None:
+            questions.append({"sentence": sentence, "word": word})
+    return questions
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--book", help="Book file; synthetic sentences if omitted")
+    parser.add_argument("--words", help="Word list; synthetic words if omitted")
+    parser.add_argument("--sentences", type=int, default=2000)
+    parser.add_argument("--word-count", type=int, default=6000)
+    args = parser.parse_args()
+
+    if args.book and args.words:
+        qe = QuestionEngine(args.book, args.words)
+        sentences = qe.parse_text_to_sentences(qe.read_file_from_local())
+        words = qe.read_words_from_file()
+    else:
+        words = synthetic_words(args.word_count)
+        sentences = synthetic_sentences(words, args.sentences)
+
+    expected, naive_time = timed(naive_questions, sentences, words)
+    result, automaton_time = timed(automaton_questions, sentences, words)
+    if result != expected:
+        sys.exit("automaton results differ from the nested loop")
+
+    print(f"sentences: {len(sentences)}  words: {len(words)}")
+    print(f"nested loop : {naive_time:.3f}s")
+    print(f"aho-corasick: {automaton_time:.3f}s (includes compile)")
+    print(f"speedup     : {naive_time / automaton_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
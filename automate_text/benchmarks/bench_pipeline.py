@@ -0,0 +1,216 @@
+"""
+Benchmarks each stage of the QuestionEngine pipeline on synthetic inputs.
+
+Synthetic books (1MB, 100MB and 1GB by default) and word lists (1k, 6k and
+50k words) are generated once into --workdir and reused by later runs. Every
+(book, word list) pair runs in a fresh process so the peak RSS recorded after
+each stage belongs to that pair alone. Results are written as JSON; pass an
+earlier result file as --baseline to fail on slowdowns.
+
+Usage:
+    python benchmarks/bench_pipeline.py --sizes 1MB --word-counts 1000,6000
+    python benchmarks/bench_pipeline.py --output results.json
+    python benchmarks/bench_pipeline.py --baseline results.json --max-regression 1.2
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_matcher import synthetic_words  # noqa: E402
+from QuestionEngine import QuestionEngine  # noqa: E402
+
+STAGES = [
+    "read_file_from_local",
+    "parse_text_to_sentences",
+    "read_words_from_file",
+    "question_generator",
+]
+_UNITS = {"KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+# Unique text generated per book; larger books repeat it
+_BLOCK_SIZE = 4 << 20
+
+
+def parse_size(size: str) -> int:
+    size = size.strip().upper()
+    for unit, factor in _UNITS.items():
+        if size.endswith(unit):
+            return int(float(size[: -len(unit)]) * factor)
+    return int(size)
+
+
+def book_vocabulary() -> List[str]:
+    return synthetic_words(20000, seed=7)
+
+
+def write_book(path: str, size: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    vocabulary = book_vocabulary()
+    sentences = []
+    length = 0
+    while length < min(size, _BLOCK_SIZE):
+        tokens = rng.choices(vocabulary, k=rng.randint(6, 24))
+        sentence = " ".join(tokens).capitalize() + rng.choice(".!?")
+        sentence += "\n" if rng.random() < 0.2 else " "
+        sentences.append(sentence)
+        length += len(sentence)
+    block = "".join(sentences)
+
+    with open(path + ".tmp", "w") as file:
+        written = 0
+        while written < size:
+            chunk = block[: size - written]
+            file.write(chunk)
+            written += len(chunk)
+    os.replace(path + ".tmp", path)
+
+
+def write_words(path: str, count: int, seed: int = 1) -> None:
+    # Half of the words occur in the books, the other half never do
+    rng = random.Random(seed)
+    vocabulary = book_vocabulary()
+    known = rng.sample(vocabulary, min(count // 2, len(vocabulary)))
+    unknown = [w + "q" for w in synthetic_words(count - len(known), seed=seed)]
+    words = known + unknown
+    rng.shuffle(words)
+    with open(path, "w") as file:
+        file.write("\n".join(words) + "\n")
+
+
+def ensure_inputs(workdir: str, sizes: List[str], word_counts: List[int]) -> Dict:
+    os.makedirs(workdir, exist_ok=True)
+    books = {}
+    for size in sizes:
+        path = os.path.join(workdir, f"book-{size}.txt")
+        if not os.path.exists(path):
+            print(f"generating {path}", file=sys.stderr)
+            write_book(path, parse_size(size))
+        books[size] = path
+    words = {}
+    for count in word_counts:
+        path = os.path.join(workdir, f"words-{count}.txt")
+        if not os.path.exists(path):
+            write_words(path, count)
+        words[count] = path
+    return {"books": books, "words": words}
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_case(book_file_path: str, words_file_path: str) -> Dict:
+    qe = QuestionEngine(book_file_path, words_file_path)
+    results = {}
+
+    def measure(stage, func, *args):
+        start = time.perf_counter()
+        value = func(*args)
+        results[stage] = {
+            "seconds": time.perf_counter() - start,
+            "peak_rss_bytes": peak_rss_bytes(),
+        }
+        return value
+
+    text = measure("read_file_from_local", qe.read_file_from_local)
+    sentences = measure("parse_text_to_sentences", qe.parse_text_to_sentences, text)
+    words = measure("read_words_from_file", qe.read_words_from_file)
+    del text
+    questions = measure("question_generator", qe.question_generator)
+    results["counts"] = {
+        "sentences": len(sentences),
+        "words": len(words),
+        "questions": len(questions),
+    }
+    return results
+
+
+def compare(
+    results: List[Dict],
+    baseline: List[Dict],
+    max_regression: float,
+    min_seconds: float = 0.01,
+) -> List:
+    # Stages faster than min_seconds are too noisy to compare
+    previous = {(case["book"], case["words"]): case for case in baseline}
+    regressions = []
+    for case in results:
+        old = previous.get((case["book"], case["words"]))
+        if old is None:
+            continue
+        for stage in STAGES:
+            before = old["stages"][stage]["seconds"]
+            after = case["stages"][stage]["seconds"]
+            if before >= min_seconds and after / before > max_regression:
+                regressions.append((case["book"], case["words"], stage, after / before))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="1MB,100MB,1GB")
+    parser.add_argument("--word-counts", default="1000,6000,50000")
+    parser.add_argument(
+        "--workdir", default=os.path.join(tempfile.gettempdir(), "qe-bench")
+    )
+    parser.add_argument("--output", default="bench_pipeline.json")
+    parser.add_argument("--baseline", help="Earlier --output file to compare with")
+    parser.add_argument("--max-regression", type=float, default=1.25)
+    parser.add_argument("--min-seconds", type=float, default=0.01)
+    args = parser.parse_args()
+
+    sizes = [size.strip() for size in args.sizes.split(",")]
+    word_counts = [int(count) for count in args.word_counts.split(",")]
+    inputs = ensure_inputs(args.workdir, sizes, word_counts)
+
+    cases = []
+    context = multiprocessing.get_context("spawn")
+    for size in sizes:
+        for count in word_counts:
+            with context.Pool(1) as pool:
+                stages = pool.apply(
+                    run_case, (inputs["books"][size], inputs["words"][count])
+                )
+            counts = stages.pop("counts")
+            cases.append(
+                {"book": size, "words": count, "stages": stages, "counts": counts}
+            )
+            timings = "  ".join(
+                f"{stage}={stages[stage]['seconds']:.3f}s" for stage in STAGES
+            )
+            peak = stages["question_generator"]["peak_rss_bytes"] / (1 << 20)
+            print(f"book={size} words={count}  {timings}  peak_rss={peak:.0f}MB")
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cases": cases,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["cases"]
+        regressions = compare(cases, baseline, args.max_regression, args.min_seconds)
+        for book, words, stage, ratio in regressions:
+            print(f"REGRESSION book={book} words={words} {stage}: {ratio:.2f}x")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
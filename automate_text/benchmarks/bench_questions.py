@@ -0,0 +1,73 @@
+"""
+Memory held by the questions of a book: ``question_generator`` dicts vs.
+``question_records`` records, measured with tracemalloc.
+
+Usage:
+    python benchmarks/bench_questions.py
+    python benchmarks/bench_questions.py --book ../data/books/pride_and_prejudice.txt \\
+        --words ../data/words/6000.txt
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from QuestionEngine import QuestionEngine  # noqa: E402
+from bench_matcher import synthetic_sentences, synthetic_words  # noqa: E402
+
+
+def retained(func):
+    # Bytes still allocated once func has returned, and its result
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def measure(book_path: str, words_path: str) -> None:
+    qe = QuestionEngine(book_path, words_path)
+    dicts, dict_bytes = retained(qe.question_generator)
+    records, record_bytes = retained(qe.question_records)
+    if [record.as_dict() for record in records] != dicts:
+        sys.exit("records differ from question_generator")
+
+    count = max(len(dicts), 1)
+    print(f"questions: {len(dicts)}")
+    for name, size in (("dicts", dict_bytes), ("records", record_bytes)):
+        print(f"{name:<9}: {size / 1e6:8.2f} MB  {size / count:6.0f} B/question")
+    print(f"saved    : {1 - record_bytes / max(dict_bytes, 1):.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--book", help="Book file; synthetic book if omitted")
+    parser.add_argument("--words", help="Word list; synthetic words if omitted")
+    parser.add_argument("--sentences", type=int, default=20000)
+    parser.add_argument("--word-count", type=int, default=6000)
+    args = parser.parse_args()
+
+    if args.book and args.words:
+        measure(args.book, args.words)
+        return
+
+    words = synthetic_words(args.word_count)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        book_path = os.path.join(tmpdir, "book.txt")
+        words_path = os.path.join(tmpdir, "words.txt")
+        with open(book_path, "w") as file:
+            file.write(" ".join(synthetic_sentences(words, args.sentences)))
+        with open(words_path, "w") as file:
+            file.write("\n".join(words))
+        measure(book_path, words_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Compares the original ``parse_text_to_sentences`` split, two whole-text
+``replace`` copies followed by a look-behind ``re.split``, with
+``sentence_splitter``.
+
+Usage:
+    python benchmarks/bench_splitter.py
+    python benchmarks/bench_splitter.py --book ../data/books/pride_and_prejudice.txt
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_pipeline import write_book  # noqa: E402
+from sentence_splitter import iter_sentence_spans, split_sentences  # noqa: E402
+
+ORIGINAL_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+def original_split(text):
+    return ORIGINAL_BOUNDARY.split(text.replace("\n", " ").replace("\r", ""))
+
+
+def best_of(repeat, func, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--book", help="Book file; a synthetic 50MB book if omitted")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    book = args.book
+    if not book:
+        book = os.path.join(tempfile.gettempdir(), "qe-bench-splitter.txt")
+        if not os.path.exists(book):
+            write_book(book, 50 << 20)
+    with open(book, "r") as file:
+        text = file.read()
+
+    original, original_time = best_of(args.repeat, original_split, text)
+    sentences, split_time = best_of(args.repeat, split_sentences, text)
+    _, spans_time = best_of(
+        args.repeat, lambda t: sum(1 for _ in iter_sentence_spans(t)), text
+    )
+
+    print(f"characters: {len(text)}")
+    print(f"original split   : {original_time:.3f}s  {len(original)} sentences")
+    print(f"split_sentences  : {split_time:.3f}s  {len(sentences)} sentences")
+    print(f"iter_sentence_spans: {spans_time:.3f}s  (offsets only)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+Command-line entry point: generates the questions of one or more books and
+writes them out as they are found.
+
+Usage:
+    python cli.py book.txt --words words.txt
+    python cli.py "books/**/*.txt" more/ --words words.txt --workers 8 \\
+        --format csv --output questions.csv
+    python cli.py book.txt --words words.txt --output questions.parquet
+    python cli.py book.txt --words words.txt --cache-dir ~/.cache/question_engine
+    python cli.py book.txt --words words.txt --profile --profile-output run.prof
+"""
+
+from typing import IO, Iterable, Iterator, List, Optional
+import argparse
+import contextlib
+import cProfile
+import csv
+import json
+import os
+import pstats
+import sys
+import tracemalloc
+
+from corpus import find_books, iter_corpus_questions
+from QuestionEngine import QuestionEngine
+from question_cache import QuestionCache
+
+FIELDS = ("book", "sentence", "word")
+FORMATS = ("jsonl", "csv", "parquet")
+
+
+class JsonLinesWriter:
+    def __init__(self, file: IO[str]):
+        self._file = file
+
+    def write(self, question: dict) -> None:
+        self._file.write(json.dumps(question) + "\n")
+
+    def close(self) -> None:
+        self._file.flush()
+
+
+class CsvWriter:
+    def __init__(self, file: IO[str]):
+        self._file = file
+        self._writer = csv.DictWriter(file, fieldnames=FIELDS)
+        self._writer.writeheader()
+
+    def write(self, question: dict) -> None:
+        self._writer.writerow(question)
+
+    def close(self) -> None:
+        self._file.flush()
+
+
+class ParquetWriter:
+    # Buffers batch_size questions per row group; requires pyarrow
+
+    def __init__(self, path: str, batch_size: int = 10_000):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema([(field, pa.string()) for field in FIELDS])
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._batch_size = batch_size
+        self._columns: dict = {field: [] for field in FIELDS}
+
+    def write(self, question: dict) -> None:
+        for field in FIELDS:
+            self._columns[field].append(question[field])
+        if len(self._columns["book"]) >= self._batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._columns["book"]:
+            table = self._pa.table(self._columns, schema=self._schema)
+            self._writer.write_table(table)
+            self._columns = {field: [] for field in FIELDS}
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+
+def guess_format(output: Optional[str]) -> str:
+    # From the output file extension, JSON lines otherwise
+    if output:
+        extension = os.path.splitext(output)[1].lstrip(".").lower()
+        if extension in FORMATS:
+            return extension
+    return "jsonl"
+
+
+def write_questions(
+    questions: Iterable[dict],
+    output_format: str,
+    output: Optional[str] = None,
+    batch_size: int = 10_000,
+) -> int:
+    """
+    Writes the questions one by one as they are produced.
+
+    Args:
+        questions (Iterable[dict]): Questions with ``book``, ``sentence`` and
+            ``word`` keys.
+        output_format (str): One of ``jsonl``, ``csv`` or ``parquet``.
+        output (str): Path of the output file; standard output if omitted,
+            except for parquet which needs a path.
+        batch_size (int): Rows per parquet row group.
+
+    Returns:
+        int: The number of questions written.
+    """
+
+    if output_format not in FORMATS:
+        raise ValueError(f"output_format must be one of {', '.join(FORMATS)}")
+    with contextlib.ExitStack() as stack:
+        if output_format == "parquet":
+            if not output:
+                raise ValueError("parquet output needs an output path")
+            writer = ParquetWriter(output, batch_size)
+        else:
+            if output:
+                file = stack.enter_context(
+                    open(output, "w", encoding="utf-8", newline="")
+                )
+            else:
+                file = sys.stdout
+            if output_format == "csv":
+                writer = CsvWriter(file)
+            else:
+                writer = JsonLinesWriter(file)
+
+        count = 0
+        try:
+            for question in questions:
+                writer.write(question)
+                count += 1
+        finally:
+            writer.close()
+    return count
+
+
+def iter_cached_questions(
+    book_file_path: str,
+    words_file_path: str,
+    cache_dir: str,
+    match_order: str = "list",
+    encoding: Optional[str] = None,
+    use_matcher_artifact: bool = False,
+) -> Iterator[dict]:
+    """
+    Generates the questions of one book through a ``QuestionCache`` kept in
+    ``cache_dir``, so a repeat run on the same files reads them back instead
+    of matching the book again.
+    """
+
+    qe = QuestionEngine(
+        book_file_path,
+        words_file_path,
+        match_order=match_order,
+        encoding=encoding,
+        use_matcher_artifact=use_matcher_artifact,
+        cache=QuestionCache(cache_dir=cache_dir),
+    )
+    for question in qe.question_generator():
+        yield {"book": book_file_path, **question}
+
+
+@contextlib.contextmanager
+def profiled(output: Optional[str] = None, limit: int = 25):
+    """
+    Profiles the enclosed block with cProfile and tracemalloc and prints the
+    top functions and allocations to standard error.
+
+    Only the current process is profiled, so use one worker to see the
+    matching itself.
+
+    Args:
+        output (str): Where to dump the raw cProfile stats, for snakeviz or
+            ``python -m pstats``.
+        limit (int): Number of lines printed per report.
+    """
+
+    profile = cProfile.Profile()
+    tracemalloc.start()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        if output:
+            profile.dump_stats(output)
+        stats = pstats.Stats(profile, stream=sys.stderr)
+        stats.sort_stats("cumulative").print_stats(limit)
+        print(f"tracemalloc peak: {peak / 1e6:.1f} MB", file=sys.stderr)
+        for stat in snapshot.statistics("lineno")[:limit]:
+            print(stat, file=sys.stderr)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Generate fill-in-the-blank questions from books."
+    )
+    parser.add_argument(
+        "books", nargs="+", help="Book files, directories of books or glob patterns"
+    )
+    parser.add_argument("--words", required=True, help="Path to the word list")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes; one per CPU by default, none for a single book",
+    )
+    parser.add_argument("--match-order", choices=("list", "text"), default="list")
+    parser.add_argument(
+        "--encoding",
+        default="auto",
+        help="Encoding of the books, or auto to sniff each one (default)",
+    )
+    parser.add_argument(
+        "--format",
+        dest="output_format",
+        choices=FORMATS,
+        help="Output format; from the output extension by default, else jsonl",
+    )
+    parser.add_argument("--output", help="Output file; standard output by default")
+    parser.add_argument(
+        "--no-matcher-cache",
+        dest="matcher_cache",
+        action="store_false",
+        help="Compile the word list instead of loading the matcher saved next to "
+        "it by an earlier run",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Cache the questions of a single book in this directory",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=10_000, help="Rows per parquet row group"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print cProfile and tracemalloc stats to standard error",
+    )
+    parser.add_argument("--profile-output", help="Also dump the cProfile stats here")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    output_format = args.output_format or guess_format(args.output)
+    if output_format == "parquet":
+        if not args.output:
+            parser.error("--format parquet needs --output")
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("parquet output requires pyarrow")
+
+    found = dict.fromkeys(book for source in args.books for book in find_books(source))
+    books = list(found)
+    if not books:
+        parser.error("no book found")
+
+    if args.cache_dir and len(books) != 1:
+        parser.error("--cache-dir only applies to a single book")
+
+    workers = args.workers
+    if workers is None and len(books) == 1:
+        workers = 1
+
+    with contextlib.ExitStack() as stack:
+        if args.profile or args.profile_output:
+            stack.enter_context(profiled(args.profile_output))
+        if args.cache_dir:
+            questions = iter_cached_questions(
+                books[0],
+                args.words,
+                args.cache_dir,
+                match_order=args.match_order,
+                encoding=args.encoding,
+                use_matcher_artifact=args.matcher_cache,
+            )
+        else:
+            questions = iter_corpus_questions(
+                books,
+                args.words,
+                workers,
+                match_order=args.match_order,
+                encoding=args.encoding,
+                use_matcher_artifact=args.matcher_cache,
+            )
+        try:
+            count = write_questions(
+                questions, output_format, args.output, args.batch_size
+            )
+        except BrokenPipeError:
+            # The reader went away, e.g. `| head`: stop quietly
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            return 1
+    print(f"{count} questions from {len(books)} books", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+from typing import BinaryIO, Optional, TextIO
+import bz2
+import gzip
+import io
+import lzma
+import os
+
+# Leading bytes of each format, checked before the file extension
+MAGIC_BYTES = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
+EXTENSIONS = {
+    ".gz": "gzip",
+    ".gzip": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".lzma": "xz",
+    ".zst": "zstd",
+    ".zstd": "zstd",
+}
+# Formats without magic bytes: their extension is trusted even for long files.
+# Legacy .lzma (LZMA_Alone) files are read by lzma.open like xz ones.
+UNMARKED_EXTENSIONS = {".lzma": "xz"}
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """
+    Returns the compression of a file from its magic bytes, or from its
+    extension when the file cannot be read or is too short to tell. Formats
+    without magic bytes (``.lzma``) are always told by their extension.
+
+    Returns:
+        Optional[str]: ``gzip``, ``bz2``, ``xz``, ``zstd`` or None for plain
+        text.
+    """
+
+    try:
+        with open(path, "rb") as file:
+            head = file.read(6)
+    except OSError:
+        head = b""
+    for magic, compression in MAGIC_BYTES:
+        if head.startswith(magic):
+            return compression
+    extension = os.path.splitext(path)[1].lower()
+    if len(head) >= 6:
+        return UNMARKED_EXTENSIONS.get(extension)
+    return EXTENSIONS.get(extension)
+
+
+def open_decompressed(path: str, compression: str) -> BinaryIO:
+    """
+    Opens a compressed book as a binary stream, decompressed as it is read:
+    memory does not depend on the size of the book and nothing is written to
+    disk.
+
+    ``zstd`` requires the zstandard package.
+    """
+
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "bz2":
+        return bz2.open(path, "rb")
+    if compression == "xz":
+        return lzma.open(path, "rb")
+    if compression == "zstd":
+        import zstandard
+
+        raw = open(path, "rb")
+        try:
+            reader = zstandard.ZstdDecompressor().stream_reader(
+                raw, read_across_frames=True, closefd=True
+            )
+        except BaseException:
+            raw.close()
+            raise
+        return io.BufferedReader(reader)
+    raise ValueError(f"unknown compression {compression!r}")
+
+
+def open_compressed(
+    path: str, compression: str, encoding: Optional[str] = None
+) -> TextIO:
+    # Text counterpart of open_decompressed
+    return io.TextIOWrapper(open_decompressed(path, compression), encoding=encoding)
@@ -0,0 +1,174 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Optional
+import argparse
+import glob
+import json
+import os
+
+from QuestionEngine import QuestionEngine
+
+# Per-process state, set up once by _init_worker
+_worker_words_file_path: Optional[str] = None
+_worker_match_order: str = "list"
+_worker_encoding: Optional[str] = None
+_worker_find: Optional[Callable[[str], Optional[str]]] = None
+
+
+def find_books(source: str) -> List[str]:
+    """
+    Returns the book files for a directory or a glob pattern, sorted by path.
+    A path to a single file is returned as it is, even if it looks like a glob.
+
+    Args:
+        source (str): A directory of books, a book, or a glob such as
+            ``books/**/*.txt``.
+
+    Returns:
+        List[str]: The paths of the books.
+    """
+
+    if os.path.isfile(source):
+        return [source]
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        paths = glob.glob(source, recursive=True)
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
+def _init_worker(
+    words_file_path: str,
+    match_order: str,
+    encoding: Optional[str] = None,
+    use_matcher_artifact: bool = False,
+) -> None:
+    # Compile the word list once per process instead of once per book
+    global _worker_words_file_path, _worker_match_order, _worker_encoding
+    global _worker_find
+    qe = QuestionEngine(
+        "",
+        words_file_path,
+        match_order=match_order,
+        use_matcher_artifact=use_matcher_artifact,
+    )
+    _worker_words_file_path = words_file_path
+    _worker_match_order = match_order
+    _worker_encoding = encoding
+    _worker_find = qe.match_function(qe.load_word_matcher())
+
+
+def _iter_book_questions(book_file_path: str) -> Iterator[dict]:
+    qe = QuestionEngine(
+        book_file_path,
+        _worker_words_file_path,
+        match_order=_worker_match_order,
+        encoding=_worker_encoding,
+    )
+    for sentence in qe.iter_sentences():
+        word = _worker_find(sentence)
+        if word is not None:
+            yield {"book": book_file_path, "sentence": sentence, "word": word}
+
+
+def _book_questions(book_file_path: str) -> List[dict]:
+    return list(_iter_book_questions(book_file_path))
+
+
+def iter_corpus_questions(
+    books: List[str],
+    words_file_path: str,
+    workers: Optional[int] = None,
+    match_order: str = "list",
+    encoding: Optional[str] = None,
+    use_matcher_artifact: bool = False,
+) -> Iterator[dict]:
+    """
+    Generates the questions for many books in parallel.
+
+    The books are spread over a pool of worker processes. The questions are
+    yielded in the order of ``books`` and, within a book, in sentence order,
+    each with a ``book`` key holding the path it came from.
+
+    Args:
+        books (List[str]): Paths of the books, e.g. from ``find_books``.
+        words_file_path (str): The path to the words file.
+        workers (int): Number of processes; defaults to the number of CPUs.
+            With 1 the books are processed in the current process.
+        match_order (str): Passed on to ``QuestionEngine``.
+        encoding (str): Passed on to ``QuestionEngine``; ``"auto"`` sniffs
+            each book on its own.
+        use_matcher_artifact (bool): Passed on to ``QuestionEngine``: every
+            worker loads the matcher saved next to the word list instead of
+            compiling it.
+    """
+
+    initargs = (words_file_path, match_order, encoding, use_matcher_artifact)
+    if workers == 1:
+        _init_worker(*initargs)
+        for book_file_path in books:
+            yield from _iter_book_questions(book_file_path)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=initargs
+    ) as pool:
+        for questions in pool.map(_book_questions, books):
+            yield from questions
+
+
+def corpus_question_generator(
+    source: str,
+    words_file_path: str,
+    workers: Optional[int] = None,
+    match_order: str = "list",
+    encoding: Optional[str] = None,
+    use_matcher_artifact: bool = False,
+) -> List[dict]:
+    """
+    Generates the questions for every book in a directory or glob.
+    """
+
+    books = find_books(source)
+    return list(
+        iter_corpus_questions(
+            books,
+            words_file_path,
+            workers,
+            match_order,
+            encoding,
+            use_matcher_artifact,
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate questions for a directory or glob of books."
+    )
+    parser.add_argument("books", help="Directory of books or glob pattern")
+    parser.add_argument("--words", required=True, help="Path to the word list")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--encoding", default="auto")
+    parser.add_argument(
+        "--no-matcher-cache",
+        dest="matcher_cache",
+        action="store_false",
+        help="Compile the word list instead of loading the matcher saved next to "
+        "it by an earlier run",
+    )
+    args = parser.parse_args()
+
+    books = find_books(args.books)
+    questions = iter_corpus_questions(
+        books,
+        args.words,
+        args.workers,
+        encoding=args.encoding,
+        use_matcher_artifact=args.matcher_cache,
+    )
+    for question in questions:
+        print(json.dumps(question))
+
+
+if __name__ == "__main__":
+    main()
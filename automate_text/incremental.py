@@ -0,0 +1,350 @@
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+
+from QuestionEngine import QuestionEngine
+from sentence_splitter import compile_boundary, normalize, split_sentences
+from word_matcher import TOKEN_PATTERN
+
+INDEX_FORMAT_VERSION = 2
+MANIFEST_NAME = "manifest.json"
+CHUNKS_DIR = "chunks"
+CHUNK_SUFFIX = ".json.gz"
+# A paragraph break ends a chunk about once every CHUNK_FANOUT paragraphs
+CHUNK_FANOUT = 8
+# Past LONG_RUN_CHARS without such a break, a sentence boundary ends a chunk
+# too, about once every SENTENCE_FANOUT sentences
+LONG_RUN_CHARS = 16 * 1024
+SENTENCE_FANOUT = 32
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _is_cut(text: str, start: int, end: int, fanout: int) -> bool:
+    # Depends on the text just before end only, not on where the chunk began
+    tail_start = max(start, end - 32)
+    tail = text[tail_start:end].encode("utf-8")
+    return zlib.crc32(tail) % fanout == 0
+
+
+class IncrementalIndex:
+    """
+    Persisted sentence -> matches index that is updated from diffs.
+
+    The book is cut into chunks at paragraph breaks chosen from the text
+    itself (content-defined chunking), so an edit only changes the chunks
+    around it. Every sentence keeps all the words it contains, not only the
+    winning one. On ``update``:
+
+    - unchanged chunks are recognised by their hash and reused as they are;
+      only new or edited chunks are segmented and matched again;
+    - removed words are dropped from the chunks that contained them;
+    - added words are searched only in the chunks whose text contains them.
+
+    The index is a directory: a small ``manifest.json`` with the options,
+    the word list and the chunks in book order, and one file per chunk in
+    ``chunks/``, named after its content. An update writes the chunks it
+    built or changed and the manifest, nothing when the book and the words
+    are unchanged, and only reads the chunks a word change may concern.
+
+    The questions are then picked from the stored matches with the engine's
+    ``match_order``, so they equal ``question_generator``'s output.
+
+    Usage:
+        index = IncrementalIndex(qe, "book.index")
+        index.update()          # full build the first time, a diff afterwards
+        questions = index.questions()
+    """
+
+    def __init__(self, engine: QuestionEngine, index_path: str):
+        self.engine = engine
+        self.index_path = index_path
+        self._boundary = compile_boundary(engine.abbreviations)
+        self._paragraph = compile_boundary(engine.abbreviations, paragraph=True)
+        self.words: List[str] = []
+        # [text hash, chunk file id] of every chunk, in book order
+        self.entries: List[List[str]] = []
+        # Chunks built or changed by the last update, by file id
+        self._chunks: Dict[str, dict] = {}
+        self.stats: Dict[str, int] = {}
+
+    def _chunk_path(self, file_id: str) -> str:
+        return os.path.join(self.index_path, CHUNKS_DIR, file_id + CHUNK_SUFFIX)
+
+    def _load(self) -> Optional[dict]:
+        try:
+            manifest_path = os.path.join(self.index_path, MANIFEST_NAME)
+            with open(manifest_path, encoding="utf-8") as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            return None
+        options = self.engine.engine_options()
+        if (
+            options is None
+            or state.get("version") != INDEX_FORMAT_VERSION
+            or state.get("options") != options
+        ):
+            return None
+        return state
+
+    def _save(self, pending: Dict[str, bytes]) -> None:
+        options = self.engine.engine_options()
+        if options is None:
+            # Could not be told apart from an index of another lemmatizer
+            return
+        if os.path.isfile(self.index_path):
+            # Single-file index of the previous format
+            os.remove(self.index_path)
+        chunks_dir = os.path.join(self.index_path, CHUNKS_DIR)
+        os.makedirs(chunks_dir, exist_ok=True)
+        for file_id, data in pending.items():
+            path = self._chunk_path(file_id)
+            if not os.path.exists(path):
+                # zlib's default level: much faster than 9 for about the same size
+                _write_atomic(path, gzip.compress(data, compresslevel=6))
+
+        state = {
+            "version": INDEX_FORMAT_VERSION,
+            "options": options,
+            "words": self.words,
+            "chunks": self.entries,
+        }
+        manifest = json.dumps(state, separators=(",", ":")).encode("utf-8")
+        _write_atomic(os.path.join(self.index_path, MANIFEST_NAME), manifest)
+
+        # Chunks the manifest no longer refers to
+        keep = {file_id + CHUNK_SUFFIX for _, file_id in self.entries}
+        for name in os.listdir(chunks_dir):
+            if name.endswith(CHUNK_SUFFIX) and name not in keep:
+                os.remove(os.path.join(chunks_dir, name))
+
+    def _store(self, chunk: dict, pending: Dict[str, bytes]) -> str:
+        # Names the chunk after its content and keeps it until it is saved
+        data = json.dumps(chunk, separators=(",", ":")).encode("utf-8")
+        file_id = hashlib.blake2b(data, digest_size=16).hexdigest()
+        self._chunks[file_id] = chunk
+        pending[file_id] = data
+        return file_id
+
+    def _read_chunk(self, file_id: str) -> dict:
+        chunk = self._chunks.get(file_id)
+        if chunk is not None:
+            return chunk
+        with open(self._chunk_path(file_id), "rb") as file:
+            return json.loads(gzip.decompress(file.read()))
+
+    def iter_chunks(self, text: str) -> Iterator[str]:
+        """
+        Cuts the book into chunks that end on paragraph breaks.
+
+        A paragraph break ends a chunk when a checksum of the text just before
+        it falls in one bucket out of ``CHUNK_FANOUT``. The cut points depend
+        only on the nearby text, so an insertion does not move them elsewhere.
+        Text with few paragraph breaks is also cut at sentence boundaries the
+        same way, once a chunk is longer than ``LONG_RUN_CHARS``.
+        """
+
+        start = 0
+        for match in self._paragraph.finditer(text):
+            for end, next_start in self._sentence_cuts(text, start, match.start()):
+                yield text[start:end]
+                start = next_start
+            end = match.start() + 1
+            if _is_cut(text, start, end, CHUNK_FANOUT):
+                yield text[start:end]
+                start = match.end()
+        for end, next_start in self._sentence_cuts(text, start, len(text)):
+            yield text[start:end]
+            start = next_start
+        yield text[start:]
+
+    def _sentence_cuts(
+        self, text: str, start: int, limit: int
+    ) -> Iterator[Tuple[int, int]]:
+        # (end, next start) of the sentence cuts before limit, in a run that
+        # began at start; only boundaries past LONG_RUN_CHARS are candidates
+        position = start + LONG_RUN_CHARS - 1
+        while position < limit:
+            for match in self._boundary.finditer(text, position, limit):
+                end = match.start() + 1
+                if _is_cut(text, start, end, SENTENCE_FANOUT):
+                    yield end, match.end()
+                    start = match.end()
+                    position = start + LONG_RUN_CHARS - 1
+                    break
+            else:
+                return
+
+    def _scan(self, sentences: List[str], matcher) -> List[List[list]]:
+        # [[offset, word], ...] per sentence, first occurrence of each word
+        matches = []
+        for sentence in sentences:
+            first: Dict[str, int] = {}
+            for offset, index in matcher.iter_matches(sentence):
+                word = matcher.words[index]
+                if offset < first.get(word, offset + 1):
+                    first[word] = offset
+            matches.append(sorted([offset, word] for word, offset in first.items()))
+        return matches
+
+    def _build_chunk(self, text: str, matcher) -> dict:
+        sentences = split_sentences(text, self._boundary)
+        return {"sentences": sentences, "matches": self._scan(sentences, matcher)}
+
+    def _prefilter(self, word: str) -> Optional[Callable[[str], bool]]:
+        # Cheap test on a chunk's text; None when nothing can be ruled out
+        if self.engine.match_mode == "substring":
+            return lambda text: word in text
+        if self.engine.lemmatize is not None:
+            return None
+        casefold = self.engine.casefold
+        tokens = TOKEN_PATTERN.findall(word.casefold() if casefold else word)
+
+        def test(text: str) -> bool:
+            if casefold:
+                text = text.casefold()
+            return all(token in text for token in tokens)
+
+        return test
+
+    def _apply_word_diff(
+        self, chunk: dict, removed: Set[str], added: List[str]
+    ) -> bool:
+        changed = False
+        if removed:
+            for index, matches in enumerate(chunk["matches"]):
+                kept = [match for match in matches if match[1] not in removed]
+                if len(kept) != len(matches):
+                    chunk["matches"][index] = kept
+                    changed = True
+
+        if added:
+            matcher = self.engine.build_matcher(added)
+            rescanned = self._scan(chunk["sentences"], matcher)
+            for matches, extra in zip(chunk["matches"], rescanned):
+                if extra:
+                    matches.extend(extra)
+                    matches.sort()
+                    changed = True
+        return changed
+
+    def update(self) -> Dict[str, int]:
+        """
+        Brings the index in line with the current book and word list.
+
+        Returns:
+            Dict[str, int]: What was reused and what was recomputed;
+            ``written`` counts the chunk files that had to be written.
+        """
+
+        words = self.engine.read_words_from_file()
+        text = self.engine.read_file_from_local()
+        state = self._load()
+
+        old_words = set(state["words"]) if state else set()
+        new_words = set(words)
+        removed = old_words - new_words
+        added = [word for word in dict.fromkeys(words) if word not in old_words]
+        # Text hash -> chunk file id
+        previous = dict(state["chunks"]) if state else {}
+
+        # A word change only concerns the chunks whose text passes its test
+        removed_tests = [(word, self._prefilter(word)) for word in removed]
+        added_tests = [(word, self._prefilter(word)) for word in added]
+        full_matcher = None
+        self._chunks = {}
+        pending: Dict[str, bytes] = {}
+
+        stats = {"chunks": 0, "reused": 0, "rescanned": 0, "updated": 0}
+        entries = []
+        for chunk_text in self.iter_chunks(text):
+            digest = hashlib.blake2b(
+                chunk_text.encode("utf-8"), digest_size=16
+            ).hexdigest()
+            file_id = previous.get(digest)
+            if file_id is not None and not os.path.exists(self._chunk_path(file_id)):
+                file_id = None
+            if file_id is None:
+                if full_matcher is None:
+                    full_matcher = self.engine.build_matcher(words)
+                chunk = self._build_chunk(chunk_text, full_matcher)
+                file_id = self._store(chunk, pending)
+                stats["rescanned"] += 1
+            else:
+                stats["reused"] += 1
+                if removed_tests or added_tests:
+                    joined = normalize(chunk_text)
+                    stale = {
+                        word
+                        for word, test in removed_tests
+                        if test is None or test(joined)
+                    }
+                    fresh = [
+                        word
+                        for word, test in added_tests
+                        if test is None or test(joined)
+                    ]
+                    if stale or fresh:
+                        chunk = self._read_chunk(file_id)
+                        if self._apply_word_diff(chunk, stale, fresh):
+                            file_id = self._store(chunk, pending)
+                            stats["updated"] += 1
+            entries.append([digest, file_id])
+            stats["chunks"] += 1
+
+        stats["words_added"] = len(added) if state else len(new_words)
+        stats["words_removed"] = len(removed)
+        stats["written"] = len(pending)
+        self.words = words
+        self.entries = entries
+        self.stats = stats
+        if (
+            state is None
+            or pending
+            or state["words"] != words
+            or state["chunks"] != entries
+        ):
+            self._save(pending)
+        return stats
+
+    def questions(self) -> List[dict]:
+        """
+        Returns the questions for the indexed book and word list.
+        """
+
+        rank: Dict[str, int] = {}
+        for index, word in enumerate(self.words):
+            rank.setdefault(word, index)
+
+        if self.engine.match_order == "list":
+
+            def key(match):
+                return rank[match[1]]
+
+        else:
+
+            def key(match):
+                return match[0], rank[match[1]]
+
+        dedup = self.engine.sentence_deduplicator()
+        questions = []
+        for _, file_id in self.entries:
+            chunk = self._read_chunk(file_id)
+            for sentence, matches in zip(chunk["sentences"], chunk["matches"]):
+                if matches and not (dedup and dedup.is_duplicate(sentence)):
+                    word = min(matches, key=key)[1]
+                    questions.append({"sentence": sentence, "word": word})
+        return questions
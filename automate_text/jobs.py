@@ -0,0 +1,298 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+import argparse
+import json
+import mmap
+import os
+import tempfile
+
+from QuestionEngine import QuestionEngine
+from compressed import detect_compression
+from sentence_splitter import compile_boundary
+from text_encoding import is_bytes_compatible
+
+JOB_FORMAT_VERSION = 1
+DEFAULT_SHARD_BYTES = 64 * 1024 * 1024
+MANIFEST_NAME = "manifest.json"
+
+# Per-process state, set up once by _init_worker
+_worker_engine: Optional[QuestionEngine] = None
+_worker_find = None
+
+
+def _stamp(path: str) -> dict:
+    stat = os.stat(path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _write_atomic(path: str, text: str) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _init_worker(engine: QuestionEngine) -> None:
+    # Compile the word list once per process instead of once per shard
+    global _worker_engine, _worker_find
+    _worker_engine = engine
+    _worker_find = engine.match_function(engine.load_word_matcher())
+
+
+def _run_shard(task: Tuple[int, int, str, str]) -> int:
+    start, end, encoding, output_path = task
+    with open(_worker_engine.book_file_path, "rb") as file:
+        file.seek(start)
+        text = file.read(end - start).decode(encoding)
+
+    lines = []
+    for sentence in _worker_engine.parse_text_to_sentences(text):
+        word = _worker_find(sentence)
+        if word is not None:
+            lines.append(json.dumps({"sentence": sentence, "word": word}) + "\n")
+    _write_atomic(output_path, "".join(lines))
+    return len(lines)
+
+
+class ShardedJob:
+    """
+    Resumable question generation for one large book.
+
+    The book is cut into shards of about ``shard_bytes`` that end on sentence
+    boundaries, recorded in a manifest in ``job_dir``. Each shard is processed
+    on its own and writes its questions to its own JSONL file, atomically, so
+    a finished shard is exactly a shard whose output file exists. A rerun
+    after a crash skips those and resumes at the first unfinished shard;
+    ``merge`` then concatenates the outputs in book order.
+
+    The manifest records the book, the word list and the engine options: if
+    any of them changed, the job starts over. Compressed books cannot be
+    sharded because they cannot be read from an offset.
+
+    Usage:
+        job = ShardedJob(QuestionEngine(book_path, words_path), "job/")
+        job.run(workers=4)        # rerun the same line after a crash
+        job.merge("questions.jsonl")
+    """
+
+    def __init__(
+        self,
+        engine: QuestionEngine,
+        job_dir: str,
+        shard_bytes: int = DEFAULT_SHARD_BYTES,
+    ):
+        self.engine = engine
+        self.job_dir = job_dir
+        self.shard_bytes = shard_bytes
+        self.manifest_path = os.path.join(job_dir, MANIFEST_NAME)
+
+    def _inputs(self) -> dict:
+        options = self.engine.engine_options()
+        if options is None:
+            raise ValueError(
+                "lemmatize has no stable identity; pass lemmatize_id to resume jobs"
+            )
+        return {
+            "version": JOB_FORMAT_VERSION,
+            "book": os.path.abspath(self.engine.book_file_path),
+            "book_stamp": _stamp(self.engine.book_file_path),
+            "words": os.path.abspath(self.engine.words_file_path),
+            "words_stamp": _stamp(self.engine.words_file_path),
+            "options": options,
+            "shard_bytes": self.shard_bytes,
+        }
+
+    def shard_path(self, index: int) -> str:
+        return os.path.join(self.job_dir, f"shard-{index:05d}.jsonl")
+
+    def plan_shards(self) -> List[Tuple[int, int]]:
+        """
+        Returns the ``(start, end)`` byte ranges of the shards.
+
+        A shard ends right after the punctuation of a sentence boundary found
+        at or after each multiple of ``shard_bytes``; the whitespace between
+        two shards belongs to neither, just as between two sentences.
+        """
+
+        if detect_compression(self.engine.book_file_path) is not None:
+            raise ValueError("compressed books cannot be sharded")
+        boundary = compile_boundary(self.engine.abbreviations, binary=True)
+        size = os.path.getsize(self.engine.book_file_path)
+        if size == 0:
+            return [(0, 0)]
+
+        shards = []
+        start = 0
+        with open(self.engine.book_file_path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                while start < size:
+                    # Searching from an offset still sees the text before it,
+                    # so abbreviations are recognised across the cut
+                    match = boundary.search(data, start + self.shard_bytes)
+                    if match is None:
+                        break
+                    shards.append((start, match.start() + 1))
+                    start = match.end()
+        shards.append((start, size))
+        return shards
+
+    def load_manifest(self) -> dict:
+        """
+        Returns the manifest of the job, planning it first unless one for the
+        same inputs is already in ``job_dir``.
+        """
+
+        inputs = self._inputs()
+        try:
+            with open(self.manifest_path, encoding="utf-8") as file:
+                manifest = json.load(file)
+            if {key: manifest.get(key) for key in inputs} == inputs:
+                return manifest
+        except (OSError, ValueError):
+            pass
+
+        os.makedirs(self.job_dir, exist_ok=True)
+        for name in os.listdir(self.job_dir):
+            if name.startswith("shard-"):
+                os.remove(os.path.join(self.job_dir, name))
+        # Shards are cut on bytes, like iter_bytes_questions splits sentences
+        encoding = self.engine.book_encoding() or "utf-8"
+        if not is_bytes_compatible(encoding):
+            raise ValueError(f"{encoding} books cannot be sharded")
+        manifest = {**inputs, "encoding": encoding, "shards": self.plan_shards()}
+        _write_atomic(self.manifest_path, json.dumps(manifest, indent=1))
+        return manifest
+
+    def pending_shards(self, manifest: Optional[dict] = None) -> List[int]:
+        # Indices of the shards without an output file
+        if manifest is None:
+            manifest = self.load_manifest()
+        return [
+            index
+            for index in range(len(manifest["shards"]))
+            if not os.path.exists(self.shard_path(index))
+        ]
+
+    def run(self, workers: Optional[int] = 1) -> Dict[str, int]:
+        """
+        Processes every shard that has no output yet.
+
+        Args:
+            workers (int): Number of processes; with 1 the shards are
+                processed in the current process, None uses every CPU.
+
+        Returns:
+            Dict[str, int]: Number of shards, shards skipped because they were
+            already done, and shards processed by this run.
+        """
+
+        manifest = self.load_manifest()
+        pending = self.pending_shards(manifest)
+        tasks = [
+            (*manifest["shards"][index], manifest["encoding"], self.shard_path(index))
+            for index in pending
+        ]
+        if workers == 1 and tasks:
+            _init_worker(self.engine)
+            for task in tasks:
+                _run_shard(task)
+        elif tasks:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(self.engine,)
+            ) as pool:
+                for _ in pool.map(_run_shard, tasks):
+                    pass
+
+        shards = len(manifest["shards"])
+        return {
+            "shards": shards,
+            "skipped": shards - len(pending),
+            "processed": len(pending),
+        }
+
+    def iter_questions(self) -> Iterator[dict]:
+        """
+        Yields the questions of every finished shard, in book order.
+
+        Raises:
+            RuntimeError: If some shards are not finished yet.
+        """
+
+        manifest = self.load_manifest()
+        pending = self.pending_shards(manifest)
+        if pending:
+            raise RuntimeError(f"{len(pending)} shards are not finished")
+        dedup = self.engine.sentence_deduplicator()
+        for index in range(len(manifest["shards"])):
+            with open(self.shard_path(index), encoding="utf-8") as file:
+                for line in file:
+                    question = json.loads(line)
+                    if not (dedup and dedup.is_duplicate(question["sentence"])):
+                        yield question
+
+    def merge(self, output_path: str) -> int:
+        """
+        Writes the questions of all the shards to one JSONL file, atomically.
+
+        ``dedup`` is applied here, across shards.
+
+        Returns:
+            int: The number of questions written.
+        """
+
+        directory = os.path.dirname(os.path.abspath(output_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        count = 0
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                for question in self.iter_questions():
+                    file.write(json.dumps(question) + "\n")
+                    count += 1
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return count
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate the questions of a large book in resumable shards."
+    )
+    parser.add_argument("book", help="Path to the book")
+    parser.add_argument("--words", required=True, help="Path to the word list")
+    parser.add_argument("--job-dir", required=True, help="Manifest and shard outputs")
+    parser.add_argument("--output", required=True, help="Merged JSONL output")
+    parser.add_argument("--shard-mb", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--encoding", default="auto")
+    parser.add_argument(
+        "--no-matcher-cache",
+        dest="matcher_cache",
+        action="store_false",
+        help="Compile the word list instead of loading the matcher saved next to "
+        "it by an earlier run",
+    )
+    args = parser.parse_args()
+
+    engine = QuestionEngine(
+        args.book,
+        args.words,
+        encoding=args.encoding,
+        use_matcher_artifact=args.matcher_cache,
+    )
+    job = ShardedJob(engine, args.job_dir, args.shard_mb * 1024 * 1024)
+    stats = job.run(args.workers)
+    count = job.merge(args.output)
+    print(
+        f"{stats['processed']} shards processed, {stats['skipped']} resumed, "
+        f"{count} questions"
+    )
+
+
+if __name__ == "__main__":
+    main()
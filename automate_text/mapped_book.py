@@ -0,0 +1,118 @@
+from array import array
+from typing import Iterator, Pattern, Tuple, Union
+import mmap
+import os
+
+from sentence_splitter import SENTENCE_END_BYTES, iter_sentence_spans, normalize
+
+
+class MappedBook:
+    """
+    Read-only, memory-mapped view of a book split into sentences.
+
+    Sentences are not materialized: only their ``(start, end)`` byte offsets
+    are kept, in one flat ``array('Q')``. A sentence is decoded to ``str``
+    only when it is asked for, e.g. once it has matched a word.
+
+    The split follows ``QuestionEngine.parse_text_to_sentences`` on the raw
+    bytes. Line breaks inside a sentence are normalised when the sentence is
+    read, exactly like the ``str`` path does. The only difference is that
+    non-ASCII whitespace such as a no-break space is not a sentence boundary
+    here. ``boundary`` is a bytes pattern from
+    ``sentence_splitter.compile_boundary``.
+
+    Usage:
+        with MappedBook("book.txt") as book:
+            for index in range(len(book)):
+                print(book.sentence(index))
+    """
+
+    def __init__(
+        self,
+        book_file_path: str,
+        encoding: str = "utf-8",
+        boundary: Pattern = SENTENCE_END_BYTES,
+    ):
+        self.book_file_path = book_file_path
+        self.encoding = encoding
+        self.boundary = boundary
+        self._file = open(book_file_path, "rb")
+        if os.fstat(self._file.fileno()).st_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            # Empty files cannot be mapped
+            self._map = b""
+        self._view = memoryview(self._map)
+        self.offsets = self._index_sentences()
+
+    def _index_sentences(self) -> array:
+        offsets = array("Q")
+        for start, end in iter_sentence_spans(self._map, self.boundary):
+            offsets.append(start)
+            offsets.append(end)
+        return offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) // 2
+
+    def __enter__(self) -> "MappedBook":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._view.release()
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def span(self, index: int) -> Tuple[int, int]:
+        return self.offsets[2 * index], self.offsets[2 * index + 1]
+
+    def raw_sentence(self, index: int) -> bytes:
+        """
+        Returns the bytes of a sentence with line breaks normalised.
+        """
+
+        start, end = self.span(index)
+        return normalize(self._map[start:end])
+
+    def sentence(self, index: int) -> str:
+        return self.raw_sentence(index).decode(self.encoding)
+
+    def iter_raw_sentences(self) -> Iterator[bytes]:
+        for index in range(len(self)):
+            yield self.raw_sentence(index)
+
+    def iter_match_views(
+        self, multiword: bool = False
+    ) -> Iterator[Tuple[int, Union[memoryview, bytes]]]:
+        """
+        Yields ``(index, raw)`` for every sentence, to match words against.
+
+        ``raw`` is a ``memoryview`` of the mapped file, so nothing is copied,
+        whenever normalising line breaks cannot change what matches: the
+        sentence holds no ``\r`` and, for word lists with multi-word entries
+        (``multiword``), no ``\n``. Otherwise it is the normalised bytes.
+        A view is only valid until the next item; ``decode`` it first. Close
+        or exhaust the iterator before closing the book, which cannot unmap
+        the file while a view is alive.
+        """
+
+        data = self._map
+        offsets = self.offsets
+        for index in range(len(self)):
+            start = offsets[2 * index]
+            end = offsets[2 * index + 1]
+            if data.find(b"\r", start, end) < 0 and not (
+                multiword and data.find(b"\n", start, end) >= 0
+            ):
+                with self._view[start:end] as view:
+                    yield index, view
+            else:
+                yield index, normalize(data[start:end])
+
+    def decode(self, raw: Union[memoryview, bytes]) -> str:
+        # The sentence of an iter_match_views item, line breaks normalised
+        return normalize(str(raw, self.encoding))
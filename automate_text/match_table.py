@@ -0,0 +1,61 @@
+from array import array
+from typing import Iterator, List
+
+
+class MatchTable:
+    """
+    Every ``(sentence, word, offset)`` match, stored column by column.
+
+    Each match costs three machine integers: indices into the shared
+    ``sentences`` and ``words`` tables and the character offset of the word
+    in its sentence. Dicts are only built when a match is read back.
+
+    Usage:
+        table = qe.match_table()
+        len(table)            # number of matches
+        table[0]              # {"sentence": ..., "word": ..., "offset": ...}
+        table.to_numpy()      # structured array, requires numpy
+    """
+
+    def __init__(self, sentences: List[str], words: List[str]):
+        self.sentences = sentences
+        self.words = words
+        self.sentence_ids = array("I")
+        self.word_ids = array("I")
+        self.offsets = array("I")
+
+    def append(self, sentence_id: int, word_id: int, offset: int) -> None:
+        self.sentence_ids.append(sentence_id)
+        self.word_ids.append(word_id)
+        self.offsets.append(offset)
+
+    def __len__(self) -> int:
+        return len(self.sentence_ids)
+
+    def __getitem__(self, index: int) -> dict:
+        return {
+            "sentence": self.sentences[self.sentence_ids[index]],
+            "word": self.words[self.word_ids[index]],
+            "offset": self.offsets[index],
+        }
+
+    def __iter__(self) -> Iterator[dict]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_numpy(self):
+        """
+        Returns the matches as a NumPy structured array with the fields
+        ``sentence_id``, ``word_id`` and ``offset``.
+        """
+
+        import numpy as np
+
+        table = np.empty(
+            len(self),
+            dtype=[("sentence_id", "u4"), ("word_id", "u4"), ("offset", "u4")],
+        )
+        table["sentence_id"] = np.frombuffer(self.sentence_ids, dtype=np.uint32)
+        table["word_id"] = np.frombuffer(self.word_ids, dtype=np.uint32)
+        table["offset"] = np.frombuffer(self.offsets, dtype=np.uint32)
+        return table
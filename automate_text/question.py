@@ -0,0 +1,54 @@
+from typing import List
+import sys
+
+
+class Question:
+    """
+    Immutable question record: a sentence of the book and its word.
+
+    A ``{"sentence": ..., "word": ...}`` dict costs about 200 bytes on top of
+    its strings. A record only holds three slots: a reference to a sentences
+    table shared by all the questions of a run, the index of its sentence in
+    it, and the word, interned so that every question for a word points to
+    the same string.
+
+    Usage:
+        questions = qe.question_records()
+        questions[0].sentence, questions[0].word
+        questions[0].as_dict()  # {"sentence": ..., "word": ...}
+    """
+
+    __slots__ = ("_sentences", "sentence_id", "word")
+
+    def __init__(self, sentences: List[str], sentence_id: int, word: str):
+        object.__setattr__(self, "_sentences", sentences)
+        object.__setattr__(self, "sentence_id", sentence_id)
+        object.__setattr__(self, "word", sys.intern(word))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Question is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Question is immutable")
+
+    def __reduce__(self):
+        return Question, (self._sentences, self.sentence_id, self.word)
+
+    @property
+    def sentence(self) -> str:
+        return self._sentences[self.sentence_id]
+
+    def as_dict(self) -> dict:
+        # The format returned by question_generator
+        return {"sentence": self.sentence, "word": self.word}
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Question):
+            return NotImplemented
+        return self.sentence == other.sentence and self.word == other.word
+
+    def __hash__(self) -> int:
+        return hash((self.sentence, self.word))
+
+    def __repr__(self) -> str:
+        return f"Question(sentence={self.sentence!r}, word={self.word!r})"
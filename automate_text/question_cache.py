@@ -0,0 +1,147 @@
+from collections import OrderedDict
+from typing import List, Optional
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+
+# Bump when a change to the engine changes the questions for the same inputs
+CACHE_FORMAT_VERSION = 1
+_READ_BLOCK_SIZE = 1 << 20
+
+
+class QuestionCache:
+    """
+    Two-tier cache of generated questions.
+
+    Entries are keyed by a hash of the book content, the word list content and
+    the engine options, so editing either file or changing an option is a
+    cache miss. The first tier is an in-process LRU; the optional second tier
+    is a directory of gzip-compressed JSON files, evicted oldest-used first
+    once it grows beyond ``max_disk_bytes``.
+
+    Usage:
+        cache = QuestionCache(cache_dir="~/.cache/question_engine")
+        qe = QuestionEngine(book_file_path, words_file_path, cache=cache)
+        qe.question_generator()  # computed
+        qe.question_generator()  # served from the cache
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 32,
+        cache_dir: Optional[str] = None,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.max_entries = max_entries
+        self.cache_dir = os.path.expanduser(cache_dir) if cache_dir else None
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, List[dict]]" = OrderedDict()
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(book_file_path: str, words_file_path: str, options: dict) -> str:
+        """
+        Returns the cache key for the given input files and engine options.
+        """
+
+        digest = hashlib.sha256()
+        digest.update(str(CACHE_FORMAT_VERSION).encode())
+        for path in (book_file_path, words_file_path):
+            digest.update(b"\0")
+            with open(path, "rb") as file:
+                for block in iter(lambda: file.read(_READ_BLOCK_SIZE), b""):
+                    digest.update(block)
+        digest.update(b"\0")
+        digest.update(json.dumps(options, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[List[dict]]:
+        questions = self._memory.get(key)
+        if questions is not None:
+            self._memory.move_to_end(key)
+            return list(questions)
+
+        questions = self._read_disk(key)
+        if questions is None:
+            return None
+        self._remember(key, questions)
+        return list(questions)
+
+    def put(self, key: str, questions: List[dict]) -> None:
+        self._remember(key, list(questions))
+        self._write_disk(key, questions)
+
+    def clear(self) -> None:
+        self._memory.clear()
+        for path in self._disk_entries():
+            os.remove(path)
+
+    def _remember(self, key: str, questions: List[dict]) -> None:
+        self._memory[key] = questions
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".json.gz")
+
+    def _disk_entries(self) -> List[str]:
+        if not self.cache_dir:
+            return []
+        return [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir)
+            if name.endswith(".json.gz")
+        ]
+
+    def _read_disk(self, key: str) -> Optional[List[dict]]:
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                questions = json.load(file)
+        except (OSError, ValueError):
+            # Missing, partially written or corrupt entries are a miss
+            return None
+        try:
+            # Mark as recently used for eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return questions
+
+    def _write_disk(self, key: str, questions: List[dict]) -> None:
+        if not self.cache_dir:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw:
+                with gzip.open(raw, "wt", encoding="utf-8") as file:
+                    json.dump(questions, file, separators=(",", ":"))
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self._disk_entries():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
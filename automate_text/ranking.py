@@ -0,0 +1,153 @@
+"""
+Vectorised scoring and ranking of candidate questions. Requires numpy.
+
+Every candidate is a ``(sentence, word, offset)`` row of a ``MatchTable``.
+Scores are computed for all rows at once from three components in [0, 1]:
+
+- length: how close the sentence is to ``target_length`` characters;
+- rarity: inverse document frequency of the word over the sentences;
+- position: how close the word is to the middle of the sentence, so the
+  blank is neither the first nor the last thing in it.
+
+Usage:
+    table = qe.match_table()
+    best = rank_questions(table, k=5)  # {"word": [question, ...], ...}
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from match_table import MatchTable
+
+DEFAULT_WEIGHTS = {"length": 1.0, "rarity": 1.0, "position": 0.5}
+
+
+def candidate_rows(table: MatchTable) -> np.ndarray:
+    """
+    Returns the rows of the first match of each word in each sentence.
+    """
+
+    sentence_ids = np.frombuffer(table.sentence_ids, dtype=np.uint32)
+    word_ids = np.frombuffer(table.word_ids, dtype=np.uint32)
+    key = sentence_ids.astype(np.uint64) * max(len(table.words), 1) + word_ids
+    _, rows = np.unique(key, return_index=True)
+    return np.sort(rows)
+
+
+def candidate_word_ids(table: MatchTable) -> np.ndarray:
+    # Word id of each candidate row
+    return np.frombuffer(table.word_ids, dtype=np.uint32)[candidate_rows(table)]
+
+
+def score_matches(
+    table: MatchTable,
+    rows: Optional[np.ndarray] = None,
+    weights: Optional[Dict[str, float]] = None,
+    target_length: int = 80,
+    word_frequencies: Optional[Sequence[float]] = None,
+) -> np.ndarray:
+    """
+    Scores the given rows of the table, all rows when ``rows`` is None.
+
+    Args:
+        table (MatchTable): The matches to score.
+        rows (np.ndarray): Row indices into the table.
+        weights (Dict[str, float]): Weight of each component.
+        target_length (int): Preferred sentence length in characters.
+        word_frequencies (Sequence[float]): Frequency of each word of
+            ``table.words``; defaults to the number of sentences containing
+            it in this book. It is counted over ``rows`` when they are given,
+            so they should hold one row per sentence and word, like those of
+            ``candidate_rows``.
+
+    Returns:
+        np.ndarray: One float score per row, higher is better.
+    """
+
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    sentence_ids = np.frombuffer(table.sentence_ids, dtype=np.uint32)
+    word_ids = np.frombuffer(table.word_ids, dtype=np.uint32)
+    offsets = np.frombuffer(table.offsets, dtype=np.uint32)
+    if rows is not None:
+        sentence_ids = sentence_ids[rows]
+        word_ids = word_ids[rows]
+        offsets = offsets[rows]
+
+    sentence_lengths = np.fromiter(
+        map(len, table.sentences), dtype=np.float64, count=len(table.sentences)
+    )
+    lengths = sentence_lengths[sentence_ids]
+    length_score = 1.0 - np.minimum(
+        np.abs(lengths - target_length) / target_length, 1.0
+    )
+
+    if word_frequencies is None:
+        first = word_ids if rows is not None else candidate_word_ids(table)
+        frequencies = np.bincount(first, minlength=len(table.words)).astype(np.float64)
+    else:
+        frequencies = np.asarray(word_frequencies, dtype=np.float64)
+    idf = np.log((len(table.sentences) + 1.0) / (frequencies + 1.0))
+    rarity_score = idf[word_ids] / max(idf.max(initial=0.0), 1e-12)
+
+    relative = offsets / np.maximum(lengths, 1.0)
+    position_score = 1.0 - np.abs(2.0 * relative - 1.0)
+
+    return (
+        weights["length"] * length_score
+        + weights["rarity"] * rarity_score
+        + weights["position"] * position_score
+    )
+
+
+def top_k_per_word(
+    word_ids: np.ndarray, scores: np.ndarray, k: int
+) -> Dict[int, np.ndarray]:
+    """
+    Returns, for each word id, the positions of its k best scores, best first.
+
+    All positions are sorted by score, then grouped by word with a stable
+    sort that keeps that order; a mask on the rank within each word keeps
+    the first k. Ties come in no particular order.
+    """
+
+    if len(word_ids) == 0:
+        return {}
+    order = np.argsort(-scores)
+    # numpy radix-sorts 16-bit keys, much faster than merging 32-bit ones
+    key_type = np.uint16 if word_ids.max() <= 0xFFFF else np.uint32
+    order = order[np.argsort(word_ids[order].astype(key_type), kind="stable")]
+    grouped = word_ids[order]
+    starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]])
+    sizes = np.diff(np.r_[starts, len(grouped)])
+    rank = np.arange(len(grouped)) - np.repeat(starts, sizes)
+    kept = order[rank < k]
+
+    bounds = np.cumsum(np.minimum(sizes, k))
+    groups = np.split(kept, bounds[:-1])
+    return dict(zip(grouped[starts].tolist(), groups))
+
+
+def rank_questions(
+    table: MatchTable, k: int = 10, **score_options
+) -> Dict[str, List[dict]]:
+    """
+    Returns the k best questions of each word, best first.
+
+    Each question is a dict with ``sentence``, ``word``, ``offset`` and
+    ``score``. ``score_options`` are passed on to ``score_matches``.
+    """
+
+    rows = candidate_rows(table)
+    scores = score_matches(table, rows, **score_options)
+    word_ids = np.frombuffer(table.word_ids, dtype=np.uint32)[rows]
+
+    ranked: Dict[str, List[dict]] = {}
+    for word_id, positions in top_k_per_word(word_ids, scores, k).items():
+        questions = []
+        for position in positions.tolist():
+            question = table[int(rows[position])]
+            question["score"] = float(scores[position])
+            questions.append(question)
+        ranked[table.words[word_id]] = questions
+    return ranked
@@ -0,0 +1,249 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+import mmap
+import random
+import struct
+import sys
+
+from QuestionEngine import QuestionEngine
+
+MAGIC = b"QESIDX01"
+# magic, byte order, word count, sentence count, postings count
+_HEADER = struct.Struct("<8s8sQQQ")
+
+
+def _contains(ids: Sequence[int], value: int) -> bool:
+    position = bisect_left(ids, value)
+    return position < len(ids) and ids[position] == value
+
+
+class SentenceIndex:
+    """
+    Inverted index from each word to the sorted ids of the sentences that
+    contain it.
+
+    The index is built once from the book and word list of a
+    ``QuestionEngine`` and saved as a single binary file that ``load`` maps
+    into memory: the postings are read straight from the mapping as
+    ``uint32`` arrays and a sentence is only decoded when it is returned.
+
+    File layout, after the header: word offsets, posting offsets and sentence
+    offsets (``uint64``), the postings (``uint32``), then the UTF-8 words and
+    sentences.
+
+    Usage:
+        SentenceIndex.build(qe).save("book.idx")
+        index = SentenceIndex.load("book.idx")
+        index.sentences_for("pride", limit=5)
+        index.intersect("pride", "prejudice")
+        index.sample("pride", 3, seed=1)
+    """
+
+    def __init__(
+        self,
+        words: List[str],
+        postings: Sequence[int],
+        posting_offsets: Sequence[int],
+        sentences: "SentenceTable",
+    ):
+        self.words = words
+        self._word_ids: Dict[str, int] = {}
+        for word_id, word in enumerate(words):
+            self._word_ids.setdefault(word, word_id)
+        self._postings = postings
+        self._posting_offsets = posting_offsets
+        self._sentences = sentences
+        self._map: Optional[mmap.mmap] = None
+
+    @classmethod
+    def build(cls, engine: QuestionEngine) -> "SentenceIndex":
+        """
+        Builds the index from every match of every word in the book.
+        """
+
+        table = engine.match_table()
+        per_word: List[array] = [array("I") for _ in table.words]
+        for sentence_id, word_id in zip(table.sentence_ids, table.word_ids):
+            ids = per_word[word_id]
+            if not ids or ids[-1] != sentence_id:
+                ids.append(sentence_id)
+
+        postings = array("I")
+        posting_offsets = array("Q", [0])
+        for ids in per_word:
+            postings.extend(ids)
+            posting_offsets.append(len(postings))
+        return cls(
+            table.words, postings, posting_offsets, SentenceTable(table.sentences)
+        )
+
+    def save(self, path: str) -> None:
+        words = [word.encode("utf-8") for word in self.words]
+        sentences = [self._sentences[i].encode("utf-8") for i in range(len(self))]
+        word_offsets = _cumulative(words)
+        sentence_offsets = _cumulative(sentences)
+        postings = array("I", self._postings)
+        posting_offsets = array("Q", self._posting_offsets)
+
+        with open(path, "wb") as file:
+            file.write(
+                _HEADER.pack(
+                    MAGIC,
+                    sys.byteorder.encode().ljust(8, b"\0"),
+                    len(words),
+                    len(sentences),
+                    len(postings),
+                )
+            )
+            word_offsets.tofile(file)
+            posting_offsets.tofile(file)
+            sentence_offsets.tofile(file)
+            postings.tofile(file)
+            file.write(b"".join(words))
+            file.write(b"".join(sentences))
+
+    @classmethod
+    def load(cls, path: str) -> "SentenceIndex":
+        with open(path, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        index = cls(*_map_views(data, path))
+        index._map = data
+        return index
+
+    def __enter__(self) -> "SentenceIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        # Drop the views into the mapping so that it can be closed
+        if self._map is not None:
+            self._postings = array("I")
+            self._posting_offsets = array("Q", [0] * (len(self.words) + 1))
+            self._sentences = SentenceTable([])
+            try:
+                self._map.close()
+            except BufferError:
+                # A view is still held elsewhere: map the index again
+                _, self._postings, self._posting_offsets, self._sentences = _map_views(
+                    self._map, "index"
+                )
+                raise
+            self._map = None
+
+    def __len__(self) -> int:
+        return len(self._sentences)
+
+    def sentence(self, sentence_id: int) -> str:
+        return self._sentences[sentence_id]
+
+    def sentence_ids(self, word: str) -> array:
+        """
+        Returns the sorted ids of the sentences containing the word.
+
+        The ids are a copy, so the index can be closed while they are kept.
+        """
+
+        ids = array("I")
+        with memoryview(self._posting_ids(word)) as view, view.cast("B") as raw:
+            ids.frombytes(raw)
+        return ids
+
+    def _posting_ids(self, word: str) -> Sequence[int]:
+        # Slice of the postings, a view into the mapping for loaded indexes
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            return array("I")
+        start = self._posting_offsets[word_id]
+        end = self._posting_offsets[word_id + 1]
+        return self._postings[start:end]
+
+    def sentences_for(self, word: str, limit: Optional[int] = None) -> List[str]:
+        ids = self._posting_ids(word)
+        if limit is not None:
+            ids = ids[:limit]
+        return [self.sentence(sentence_id) for sentence_id in ids]
+
+    def intersect(self, *words: str) -> List[int]:
+        """
+        Returns the sorted ids of the sentences that contain all the words.
+
+        The shortest posting list is walked and every id is looked up in the
+        other lists by binary search.
+        """
+
+        postings = sorted((self._posting_ids(word) for word in words), key=len)
+        if not postings:
+            return []
+        result = list(postings[0])
+        for ids in postings[1:]:
+            result = [value for value in result if _contains(ids, value)]
+        return result
+
+    def sample(self, word: str, n: int, seed: Optional[int] = None) -> List[str]:
+        """
+        Returns up to n random sentences containing the word.
+        """
+
+        ids = self._posting_ids(word)
+        picks = random.Random(seed).sample(range(len(ids)), min(n, len(ids)))
+        return [self.sentence(ids[pick]) for pick in picks]
+
+
+class SentenceTable:
+    # A list of str, or UTF-8 strings in one buffer decoded on access
+
+    def __init__(self, sentences, offsets: Optional[Sequence[int]] = None):
+        self._blob = sentences
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        if self._offsets is None:
+            return len(self._blob)
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if self._offsets is None:
+            return self._blob[index]
+        start = self._offsets[index]
+        end = self._offsets[index + 1]
+        return str(self._blob[start:end], "utf-8")
+
+
+def _map_views(
+    data: mmap.mmap, path: str
+) -> Tuple[List[str], memoryview, memoryview, SentenceTable]:
+    # Words, postings, posting offsets and sentences of a saved index
+    magic, byteorder, word_count, sentence_count, posting_count = _HEADER.unpack_from(
+        data
+    )
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a sentence index")
+    if byteorder.rstrip(b"\0").decode() != sys.byteorder:
+        raise ValueError(f"{path} was written with another byte order")
+
+    view = memoryview(data)
+    position = _HEADER.size
+
+    def take(count: int, itemsize: int, fmt: str) -> memoryview:
+        nonlocal position
+        start, position = position, position + count * itemsize
+        return view[start:position].cast(fmt)
+
+    word_offsets = take(word_count + 1, 8, "Q")
+    posting_offsets = take(word_count + 1, 8, "Q")
+    sentence_offsets = take(sentence_count + 1, 8, "Q")
+    postings = take(posting_count, 4, "I")
+    word_table = SentenceTable(take(word_offsets[-1], 1, "B"), word_offsets)
+    words = [word_table[i] for i in range(word_count)]
+    sentences = SentenceTable(view[position:], sentence_offsets)
+    return words, postings, posting_offsets, sentences
+
+
+def _cumulative(blobs: List[bytes]) -> array:
+    offsets = array("Q", [0])
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    return offsets
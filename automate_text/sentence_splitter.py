@@ -0,0 +1,175 @@
+from typing import Iterable, Iterator, List, Optional, Pattern, Tuple
+import re
+
+# Titles that end with a period without ending the sentence ("Mr. Darcy")
+ABBREVIATIONS = (
+    "Mr",
+    "Mrs",
+    "Ms",
+    "Messrs",
+    "Dr",
+    "St",
+    "Jr",
+    "Sr",
+    "Rev",
+    "Prof",
+    "Capt",
+    "Col",
+    "Gen",
+    "Lt",
+    "Sgt",
+    "Mme",
+    "Mlle",
+)
+
+
+def compile_boundary(
+    abbreviations: Iterable[str] = ABBREVIATIONS,
+    binary: bool = False,
+    paragraph: bool = False,
+) -> Pattern:
+    """
+    Compiles the pattern of the text between two sentences.
+
+    A boundary is a ``.``, ``!`` or ``?`` followed by whitespace, unless the
+    period closes one of the abbreviations. The match starts at the
+    punctuation, which belongs to the sentence before it. Starting on a
+    literal character lets the regex engine skip ahead to candidates instead
+    of testing a look-behind at every position of the text.
+
+    Args:
+        abbreviations (Iterable[str]): Words that do not end a sentence.
+        binary (bool): Compile a ``bytes`` pattern for raw UTF-8 input.
+        paragraph (bool): Only match boundaries whose whitespace holds a
+            blank line, i.e. sentence boundaries that also end a paragraph.
+    """
+
+    not_abbreviation = "".join(
+        rf"(?<!\b{re.escape(word)}\.)" for word in sorted(set(abbreviations))
+    )
+    whitespace = r"[^\S\n]*\n[^\S\n]*\n\s*" if paragraph else r"\s+"
+    pattern = r"[.!?]" + not_abbreviation + whitespace
+    return re.compile(pattern.encode() if binary else pattern)
+
+
+SENTENCE_END = compile_boundary()
+SENTENCE_END_BYTES = compile_boundary(binary=True)
+
+
+def iter_sentence_spans(
+    text, boundary: Pattern = SENTENCE_END
+) -> Iterator[Tuple[int, int]]:
+    """
+    Yields the ``(start, end)`` offsets of the sentences of the text.
+
+    Line breaks are handled by the scan itself, so the text does not have to
+    be copied to normalise them first; use ``normalize`` on the sentences
+    that are actually needed.
+    """
+
+    start = 0
+    for match in boundary.finditer(text):
+        yield start, match.start() + 1
+        start = match.end()
+    yield start, len(text)
+
+
+def normalize(sentence):
+    """
+    Joins the lines of a sentence: ``\\n`` becomes a space, ``\\r`` is dropped.
+    """
+
+    if isinstance(sentence, bytes):
+        return sentence.replace(b"\n", b" ").replace(b"\r", b"")
+    if "\n" in sentence or "\r" in sentence:
+        return sentence.replace("\n", " ").replace("\r", "")
+    return sentence
+
+
+def split_sentences(text: str, boundary: Pattern = SENTENCE_END) -> List[str]:
+    """
+    Splits the text into sentences with their line breaks normalised.
+
+    ``bytes`` are split too, with a binary ``boundary``.
+    """
+
+    if isinstance(text, bytes):
+        return [
+            normalize(text[start:end])
+            for start, end in iter_sentence_spans(text, boundary)
+        ]
+    sentences = []
+    append = sentences.append
+    start = 0
+    for match in boundary.finditer(text):
+        end = match.start() + 1
+        sentence = text[start:end]
+        if "\n" in sentence or "\r" in sentence:
+            sentence = sentence.replace("\n", " ").replace("\r", "")
+        append(sentence)
+        start = match.end()
+    append(normalize(text[start:]))
+    return sentences
+
+
+class SentenceStream:
+    """
+    Splits text that arrives in consecutive chunks, ``str`` or, with a
+    binary ``boundary``, ``bytes``.
+
+    The partial sentence at the end of each chunk is carried over to the next
+    one, so feeding a text in any number of chunks yields the same sentences
+    as ``split_sentences`` on the whole text. Each feed only scans the new
+    text, from where the carry could still end a sentence, so the cost is
+    linear in the text however long the carry grows.
+
+    Memory holds one chunk and the carry, which is one sentence: a text
+    without boundaries for a long stretch is carried whole. ``max_carry``
+    bounds it by cutting longer sentences into pieces of that length, which
+    then differ from ``split_sentences``.
+
+    Usage:
+        stream = SentenceStream()
+        for chunk in chunks:
+            sentences.extend(stream.feed(chunk))
+        sentences.extend(stream.close())
+    """
+
+    def __init__(
+        self, boundary: Pattern = SENTENCE_END, max_carry: Optional[int] = None
+    ):
+        self.boundary = boundary
+        self.max_carry = max_carry
+        self._carry = boundary.pattern[:0]
+        # No boundary starts before this offset of the carry
+        self._scan_from = 0
+
+    def feed(self, chunk: str) -> List[str]:
+        buffer = self._carry + chunk
+        sentences = []
+        start = 0
+        # A final punctuation mark may be followed by whitespace next time
+        scan_from = max(len(buffer) - 1, 0)
+        for match in self.boundary.finditer(buffer, self._scan_from):
+            # Whitespace at the end of the buffer may continue in the next
+            # chunk, so that boundary is not final yet
+            if match.end() == len(buffer):
+                scan_from = match.start()
+                break
+            end = match.start() + 1
+            sentences.append(normalize(buffer[start:end]))
+            start = match.end()
+        if self.max_carry is not None:
+            while len(buffer) - start > self.max_carry:
+                end = start + self.max_carry
+                sentences.append(normalize(buffer[start:end]))
+                start = end
+        self._carry = buffer[start:]
+        self._scan_from = max(scan_from - start, 0)
+        return sentences
+
+    def close(self) -> List[str]:
+        sentences = split_sentences(self._carry, self.boundary)
+        self._carry = self._carry[:0]
+        self._scan_from = 0
+        return sentences
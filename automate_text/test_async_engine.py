@@ -0,0 +1,66 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from async_engine import AsyncQuestionEngine
+from QuestionEngine import QuestionEngine
+
+
+class TestAsyncQuestionEngine(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        book_path = os.path.join(self.tmpdir.name, "book.txt")
+        words_path = os.path.join(self.tmpdir.name, "words.txt")
+        with open(book_path, "w") as file:
+            file.write("A sample. Nothing. Some\ntext here. " * 50)
+        with open(words_path, "w") as file:
+            file.write("sample\ntext\n")
+        self.qe = QuestionEngine(book_path, words_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    async def test_iter_questions_matches_sync_engine(self):
+        engine = AsyncQuestionEngine(self.qe, chunk_size=7)
+        questions = [question async for question in engine.iter_questions()]
+        self.assertEqual(questions, self.qe.question_generator())
+        self.assertEqual(len(questions), 100)
+
+    async def test_stopping_early_closes_the_book(self):
+        opened = []
+        open_book = self.qe.open_book
+
+        def recording_open_book():
+            opened.append(open_book())
+            return opened[-1]
+
+        engine = AsyncQuestionEngine(self.qe, chunk_size=16)
+        with patch.object(self.qe, "open_book", recording_open_book):
+            questions = engine.iter_questions()
+            first = await questions.__anext__()
+            self.assertFalse(opened[0].closed)
+            await questions.aclose()
+        self.assertEqual(first, {"sentence": "A sample.", "word": "sample"})
+        self.assertEqual(len(opened), 1)
+        self.assertTrue(opened[0].closed)
+
+    async def test_does_not_block_other_tasks(self):
+        engine = AsyncQuestionEngine(self.qe, chunk_size=8)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        await engine.question_generator()
+        task.cancel()
+        self.assertGreater(ticks, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import pstats
+import tempfile
+import unittest
+from unittest.mock import patch
+from cli import guess_format, main
+from QuestionEngine import QuestionEngine
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.book_path = os.path.join(self.tmpdir.name, "book.txt")
+        self.words_path = os.path.join(self.tmpdir.name, "words.txt")
+        with open(self.book_path, "w") as file:
+            file.write("A sample here. Nothing there. Some text.")
+        with open(self.words_path, "w") as file:
+            file.write("sample\ntext\n")
+        self.expected = [
+            {"book": self.book_path, "sentence": "A sample here.", "word": "sample"},
+            {"book": self.book_path, "sentence": "Some text.", "word": "text"},
+        ]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_cli(self, *args):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            self.assertEqual(
+                main([self.book_path, "--words", self.words_path, *args]), 0
+            )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def output_path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_guess_format(self):
+        self.assertEqual(guess_format(None), "jsonl")
+        self.assertEqual(guess_format("out.CSV"), "csv")
+        self.assertEqual(guess_format("out.parquet"), "parquet")
+        self.assertEqual(guess_format("out.txt"), "jsonl")
+
+    def test_jsonl_to_stdout(self):
+        stdout, stderr = self.run_cli()
+        questions = [json.loads(line) for line in stdout.splitlines()]
+        self.assertEqual(questions, self.expected)
+        self.assertIn("2 questions from 1 books", stderr)
+
+    def test_books_encoding_is_sniffed(self):
+        with open(self.book_path, "wb") as file:
+            file.write("Un café sample. Nothing there.".encode("cp1252"))
+        stdout, _ = self.run_cli()
+        self.assertEqual(
+            [json.loads(line)["sentence"] for line in stdout.splitlines()],
+            ["Un café sample."],
+        )
+        stdout, _ = self.run_cli("--encoding", "latin-1", "--workers", "2")
+        self.assertEqual(json.loads(stdout)["sentence"], "Un café sample.")
+
+    def test_matcher_cache(self):
+        artifact = self.words_path + ".matcher"
+        self.run_cli("--no-matcher-cache")
+        self.assertFalse(os.path.exists(artifact))
+        for _ in range(2):
+            stdout, _ = self.run_cli()
+            questions = [json.loads(line) for line in stdout.splitlines()]
+            self.assertEqual(questions, self.expected)
+            self.assertTrue(os.path.exists(artifact))
+
+    def test_cache_dir(self):
+        cache_dir = self.output_path("cache")
+        with patch.object(
+            QuestionEngine,
+            "_generate_questions",
+            autospec=True,
+            side_effect=QuestionEngine._generate_questions,
+        ) as generate:
+            for _ in range(2):
+                stdout, _ = self.run_cli("--cache-dir", cache_dir)
+                questions = [json.loads(line) for line in stdout.splitlines()]
+                self.assertEqual(questions, self.expected)
+        # The second run read the questions back from the cache
+        self.assertEqual(generate.call_count, 1)
+        self.assertTrue(os.listdir(cache_dir))
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                main(
+                    [self.book_path, self.words_path, "--words", self.words_path]
+                    + ["--cache-dir", cache_dir]
+                )
+
+    def test_csv_output(self):
+        path = self.output_path("out.csv")
+        self.run_cli("--output", path)
+        with open(path, newline="", encoding="utf-8") as file:
+            self.assertEqual(list(csv.DictReader(file)), self.expected)
+
+    @unittest.skipIf(pq is None, "pyarrow is not installed")
+    def test_parquet_output(self):
+        path = self.output_path("out.parquet")
+        self.run_cli("--output", path, "--batch-size", "1")
+        self.assertEqual(pq.read_table(path).to_pylist(), self.expected)
+
+    def test_parquet_needs_output(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                main(
+                    [self.book_path, "--words", self.words_path, "--format", "parquet"]
+                )
+
+    def test_profile(self):
+        path = self.output_path("run.prof")
+        _, stderr = self.run_cli(
+            "--output", self.output_path("out.jsonl"), "--profile-output", path
+        )
+        self.assertIn("tracemalloc peak", stderr)
+        self.assertGreater(pstats.Stats(path).total_calls, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import bz2
+import gzip
+import lzma
+import os
+import tempfile
+import unittest
+from QuestionEngine import QuestionEngine
+from compressed import detect_compression
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+TEXT = "A sample here. Nothing there.\nSome text\nover lines. End. " * 50
+
+
+class TestCompressed(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.words_path = os.path.join(self.tmpdir.name, "words.txt")
+        with open(self.words_path, "w") as file:
+            file.write("sample\ntext\n")
+        plain_path = self.write("book.txt", TEXT.encode())
+        self.expected = QuestionEngine(plain_path, self.words_path).question_generator()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "wb") as file:
+            file.write(data)
+        return path
+
+    def books(self):
+        data = TEXT.encode()
+        books = {
+            "gzip": self.write("book.txt.gz", gzip.compress(data)),
+            "bz2": self.write("book.txt.bz2", bz2.compress(data)),
+            "xz": self.write("book.txt.xz", lzma.compress(data)),
+        }
+        if zstandard is not None:
+            compressed = zstandard.ZstdCompressor().compress(data)
+            books["zstd"] = self.write("book.txt.zst", compressed)
+        return books
+
+    def test_detect_by_magic_bytes(self):
+        for compression, path in self.books().items():
+            renamed = path + ".bin"
+            os.rename(path, renamed)
+            with self.subTest(compression=compression):
+                self.assertEqual(detect_compression(renamed), compression)
+        self.assertIsNone(
+            detect_compression(os.path.join(self.tmpdir.name, "book.txt"))
+        )
+
+    def test_detect_by_extension(self):
+        missing = os.path.join(self.tmpdir.name, "missing.txt.bz2")
+        self.assertEqual(detect_compression(missing), "bz2")
+        self.assertEqual(detect_compression(self.write("empty.xz", b"")), "xz")
+
+    def test_legacy_lzma_books(self):
+        data = lzma.compress(TEXT.encode(), format=lzma.FORMAT_ALONE)
+        path = self.write("book.txt.lzma", data)
+        self.assertEqual(detect_compression(path), "xz")
+        qe = QuestionEngine(path, self.words_path)
+        self.assertEqual(qe.question_generator(), self.expected)
+        # Without the extension there is nothing to tell it from plain text
+        self.assertIsNone(detect_compression(self.write("book.bin", data)))
+
+    def test_questions_from_compressed_books(self):
+        for compression, path in self.books().items():
+            qe = QuestionEngine(path, self.words_path)
+            with self.subTest(compression=compression):
+                self.assertEqual(qe.question_generator(), self.expected)
+                self.assertEqual(list(qe.iter_questions(chunk_size=7)), self.expected)
+
+    def test_compressed_books_cannot_be_mapped(self):
+        qe = QuestionEngine(self.books()["gzip"], self.words_path)
+        with self.assertRaises(ValueError):
+            qe.read_mapped_book()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from corpus import corpus_question_generator, find_books
+
+
+class TestCorpus(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.books_dir = os.path.join(self.tmpdir.name, "books")
+        os.mkdir(self.books_dir)
+        self.words_path = os.path.join(self.tmpdir.name, "words.txt")
+        with open(self.words_path, "w") as file:
+            file.write("sample\ntext\n")
+        books = {
+            "b.txt": "A text here. Nothing.",
+            "a.txt": "A sample. Another text.",
+            "c.md": "No match at all.",
+        }
+        for name, text in books.items():
+            with open(os.path.join(self.books_dir, name), "w") as file:
+                file.write(text)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_find_books_directory_and_glob(self):
+        names = [os.path.basename(p) for p in find_books(self.books_dir)]
+        self.assertEqual(names, ["a.txt", "b.txt", "c.md"])
+        pattern = os.path.join(self.books_dir, "*.txt")
+        names = [os.path.basename(p) for p in find_books(pattern)]
+        self.assertEqual(names, ["a.txt", "b.txt"])
+
+    def test_find_books_single_file(self):
+        path = os.path.join(self.books_dir, "vol[1].txt")
+        with open(path, "w") as file:
+            file.write("A sample.")
+        self.assertEqual(find_books(path), [path])
+        questions = corpus_question_generator(path, self.words_path, workers=1)
+        self.assertEqual([q["word"] for q in questions], ["sample"])
+
+    def test_results_are_ordered_by_book(self):
+        expected = [
+            ("a.txt", "A sample.", "sample"),
+            ("a.txt", "Another text.", "text"),
+            ("b.txt", "A text here.", "text"),
+        ]
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                questions = corpus_question_generator(
+                    self.books_dir, self.words_path, workers=workers
+                )
+                result = [
+                    (os.path.basename(q["book"]), q["sentence"], q["word"])
+                    for q in questions
+                ]
+                self.assertEqual(result, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+from QuestionEngine import QuestionEngine
+from incremental import IncrementalIndex
+from dedup import SentenceDeduplicator, normalize_sentence
+
+
+class TestSentenceDeduplicator(unittest.TestCase):
+
+    def test_normalize_ignores_case_punctuation_and_spacing(self):
+        self.assertEqual(normalize_sentence("  CHAPTER  I.\n"), "chapter i")
+        self.assertEqual(normalize_sentence("Hello, world!"), "hello world")
+
+    def test_exact_duplicates_are_dropped(self):
+        sentences = ["Chapter I.", "It was a truth.", "CHAPTER I", "It was a truth."]
+        result = list(SentenceDeduplicator().filter(sentences))
+        self.assertEqual(result, ["Chapter I.", "It was a truth."])
+
+    def test_near_duplicates_are_dropped(self):
+        dedup = SentenceDeduplicator()
+        original = (
+            "This eBook is for the use of anyone anywhere at no cost and with "
+            "almost no restrictions whatsoever in the United States"
+        )
+        self.assertFalse(dedup.is_duplicate(original))
+        self.assertTrue(dedup.is_duplicate(original + " and Canada"))
+        self.assertFalse(
+            dedup.is_duplicate("Mr. Bennet was so odd a mixture of quick parts.")
+        )
+        self.assertEqual(dedup.dropped, 1)
+
+    def test_near_duplicates_can_be_disabled(self):
+        dedup = SentenceDeduplicator(near_duplicates=False)
+        self.assertFalse(dedup.is_duplicate("one two three four five six seven"))
+        self.assertFalse(dedup.is_duplicate("one two three four five six seven eight"))
+        self.assertTrue(dedup.is_duplicate("One two three four five six seven!"))
+
+    def test_memory_is_bounded(self):
+        dedup = SentenceDeduplicator(max_entries=2)
+        for sentence in ("first one", "second one", "third one"):
+            self.assertFalse(dedup.is_duplicate(sentence))
+        self.assertEqual(len(dedup._exact), 2)
+        # The oldest sentence was forgotten
+        self.assertFalse(dedup.is_duplicate("first one"))
+
+    def test_bands_are_remembered_as_small_digests(self):
+        dedup = SentenceDeduplicator(max_entries=3)
+        sentences = [
+            "The quick brown fox jumps over the lazy dog.",
+            "It is a truth universally acknowledged, they said.",
+            "Every single morning she walked along the river.",
+            "Nobody expected the storm to arrive so early.",
+            "Bright lamps hung above the crowded market stalls.",
+        ]
+        for sentence in sentences:
+            self.assertFalse(dedup.is_duplicate(sentence))
+        self.assertEqual(len(dedup._buckets), 3 * dedup.bands)
+        self.assertTrue(
+            all(
+                isinstance(key, bytes) and len(key) == 8 for key in dedup._buckets._keys
+            )
+        )
+
+    def test_bands_must_divide_num_perm(self):
+        with self.assertRaises(ValueError):
+            SentenceDeduplicator(num_perm=30, bands=4)
+
+
+class TestEngineDedup(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.book_path = os.path.join(self.tmpdir.name, "book.txt")
+        self.words_path = os.path.join(self.tmpdir.name, "words.txt")
+        with open(self.words_path, "w") as file:
+            file.write("chapter\nsample\n")
+        with open(self.book_path, "w") as file:
+            file.write("The chapter starts. A sample. The chapter starts! A sample.")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_dedup_option(self):
+        qe = QuestionEngine(self.book_path, self.words_path, dedup=True)
+        expected = [
+            {"sentence": "The chapter starts.", "word": "chapter"},
+            {"sentence": "A sample.", "word": "sample"},
+        ]
+        self.assertEqual(qe.question_generator(), expected)
+        self.assertEqual(list(qe.iter_questions(chunk_size=5)), expected)
+        self.assertEqual(list(qe.iter_bytes_questions(chunk_size=5)), expected)
+        self.assertEqual(list(qe.iter_mapped_questions()), expected)
+        self.assertEqual(qe.engine_options()["dedup"], True)
+
+        index = IncrementalIndex(qe, os.path.join(self.tmpdir.name, "index"))
+        index.update()
+        self.assertEqual(index.questions(), expected)
+
+        plain = QuestionEngine(self.book_path, self.words_path)
+        self.assertEqual(len(plain.question_generator()), 4)
+        self.assertNotIn("dedup", plain.engine_options())
+
+    def test_dedup_option_in_word_mode(self):
+        qe = QuestionEngine(
+            self.book_path, self.words_path, dedup=True, match_mode="word"
+        )
+        expected = qe.question_generator()
+        self.assertEqual(len(expected), 2)
+        self.assertEqual(list(qe.iter_mapped_questions()), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
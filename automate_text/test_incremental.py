@@ -0,0 +1,151 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from incremental import LONG_RUN_CHARS, IncrementalIndex
+from QuestionEngine import QuestionEngine
+
+
+class TestIncrementalIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.book_path = os.path.join(self.tmpdir.name, "book.txt")
+        self.words_path = os.path.join(self.tmpdir.name, "words.txt")
+        self.index_path = os.path.join(self.tmpdir.name, "index")
+        rng = random.Random(0)
+        vocabulary = ["apple", "party", "art", "Mr. Darcy", "tea", "sea", "dog"]
+        paragraphs = []
+        for _ in range(120):
+            sentences = [
+                " ".join(rng.choices(vocabulary, k=4)).capitalize() + "."
+                for _ in range(rng.randint(1, 3))
+            ]
+            paragraphs.append("\n".join(sentences))
+        self.paragraphs = paragraphs
+        self.write(self.book_path, "\n\n".join(paragraphs))
+        self.write(self.words_path, "tea\nart\ndog\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as file:
+            file.write(text)
+
+    def check(self, qe):
+        index = IncrementalIndex(qe, self.index_path)
+        stats = index.update()
+        self.assertEqual(index.questions(), qe.question_generator())
+        return stats
+
+    def test_first_update_builds_everything(self):
+        stats = self.check(QuestionEngine(self.book_path, self.words_path))
+        self.assertEqual(stats["reused"], 0)
+        self.assertEqual(stats["rescanned"], stats["chunks"])
+        self.assertGreater(stats["chunks"], 1)
+
+    def test_word_changes_reuse_every_chunk(self):
+        qe = QuestionEngine(self.book_path, self.words_path)
+        self.check(qe)
+        self.write(self.words_path, "sea\nart\nparty\n")
+        stats = self.check(qe)
+        self.assertEqual(stats["rescanned"], 0)
+        self.assertEqual(stats["words_added"], 2)
+        self.assertEqual(stats["words_removed"], 2)
+
+    def test_book_edit_rescans_only_changed_chunks(self):
+        qe = QuestionEngine(self.book_path, self.words_path, match_order="text")
+        first = self.check(qe)
+        self.paragraphs[60] = "A brand new dog paragraph."
+        self.write(self.book_path, "\n\n".join(self.paragraphs))
+        stats = self.check(qe)
+        self.assertLessEqual(stats["rescanned"], 2)
+        self.assertGreaterEqual(stats["reused"], first["chunks"] - 2)
+
+    def chunk_files(self):
+        return set(os.listdir(os.path.join(self.index_path, "chunks")))
+
+    def test_unchanged_update_writes_nothing(self):
+        qe = QuestionEngine(self.book_path, self.words_path)
+        self.check(qe)
+        manifest = os.path.join(self.index_path, "manifest.json")
+        os.utime(manifest, (0, 0))
+        stats = self.check(qe)
+        self.assertEqual(stats["written"], 0)
+        self.assertEqual(os.stat(manifest).st_mtime, 0)
+
+    def test_book_edit_writes_only_new_chunks(self):
+        qe = QuestionEngine(self.book_path, self.words_path)
+        self.check(qe)
+        before = self.chunk_files()
+        self.paragraphs[60] = "A brand new dog paragraph."
+        self.write(self.book_path, "\n\n".join(self.paragraphs))
+        stats = self.check(qe)
+        after = self.chunk_files()
+        self.assertEqual(len(after - before), stats["written"])
+        self.assertLessEqual(stats["written"], 2)
+        # Files of the replaced chunks are removed
+        with open(os.path.join(self.index_path, "manifest.json")) as file:
+            entries = json.load(file)["chunks"]
+        self.assertEqual(after, {file_id + ".json.gz" for _, file_id in entries})
+
+    def test_long_runs_are_cut_at_sentences(self):
+        rng = random.Random(1)
+        vocabulary = ["apple", "party", "art", "tea", "sea", "dog", "cat", "sun"]
+        sentences = [
+            " ".join(rng.choices(vocabulary, k=8)).capitalize() + "."
+            for _ in range(4000)
+        ]
+        self.write(self.book_path, "\n".join(sentences))
+        qe = QuestionEngine(self.book_path, self.words_path)
+        first = self.check(qe)
+        self.assertGreater(first["chunks"], 2)
+
+        sentences[2000] = "A brand new dog sentence."
+        self.write(self.book_path, "\n".join(sentences))
+        stats = self.check(qe)
+        self.assertLessEqual(stats["rescanned"], 2)
+
+        index = IncrementalIndex(qe, self.index_path)
+        chunks = list(index.iter_chunks(qe.read_file_from_local()))
+        for chunk in chunks[:-1]:
+            self.assertGreaterEqual(len(chunk), LONG_RUN_CHARS)
+            self.assertTrue(chunk.endswith("."))
+
+    def test_whole_word_mode(self):
+        qe = QuestionEngine(
+            self.book_path, self.words_path, match_mode="word", casefold=True
+        )
+        self.check(qe)
+        self.write(self.words_path, "party\nmr darcy\n")
+        self.check(qe)
+
+    def test_option_change_rebuilds(self):
+        self.check(QuestionEngine(self.book_path, self.words_path))
+        stats = self.check(
+            QuestionEngine(self.book_path, self.words_path, match_mode="word")
+        )
+        self.assertEqual(stats["reused"], 0)
+
+    def test_lemmatizer_change_rebuilds(self):
+        def engine(lemmatize):
+            return QuestionEngine(
+                self.book_path, self.words_path, match_mode="word", lemmatize=lemmatize
+            )
+
+        self.check(engine(lambda token: token))
+        stats = self.check(engine(lambda token: token.rstrip("s")))
+        self.assertEqual(stats["reused"], 0)
+
+        # Without a stable identity the index is never saved, nor reused
+        shutil.rmtree(self.index_path)
+        suffix = "s"
+        self.check(engine(lambda token: token.rstrip(suffix)))
+        self.assertFalse(os.path.exists(self.index_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
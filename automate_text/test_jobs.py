@@ -0,0 +1,126 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import jobs
+from QuestionEngine import QuestionEngine
+from jobs import ShardedJob
+
+TEXT = (
+    "A sample here. Mr. Bingley has some text.\nOver lines! Nothing there.\n\n"
+    "Dr. Sample? Another text. "
+) * 20
+
+
+class TestShardedJob(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.book_path = os.path.join(self.tmpdir.name, "book.txt")
+        self.words_path = os.path.join(self.tmpdir.name, "words.txt")
+        self.job_dir = os.path.join(self.tmpdir.name, "job")
+        self.output_path = os.path.join(self.tmpdir.name, "out.jsonl")
+        with open(self.book_path, "w") as file:
+            file.write(TEXT)
+        with open(self.words_path, "w") as file:
+            file.write("sample\ntext\n")
+        self.qe = QuestionEngine(self.book_path, self.words_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read_output(self):
+        with open(self.output_path) as file:
+            return [json.loads(line) for line in file]
+
+    def test_shards_end_on_sentence_boundaries(self):
+        for shard_bytes in (1, 7, 50, 1 << 20):
+            shards = ShardedJob(self.qe, self.job_dir, shard_bytes).plan_shards()
+            sentences = []
+            for start, end in shards:
+                sentences.extend(self.qe.parse_text_to_sentences(TEXT[start:end]))
+            with self.subTest(shard_bytes=shard_bytes):
+                self.assertEqual(sentences, self.qe.parse_text_to_sentences(TEXT))
+                self.assertEqual(shards[-1][1], len(TEXT))
+        self.assertGreater(len(ShardedJob(self.qe, self.job_dir, 50).plan_shards()), 10)
+
+    def test_run_and_merge(self):
+        for workers in (1, 2):
+            job = ShardedJob(self.qe, self.job_dir, shard_bytes=100)
+            with self.subTest(workers=workers):
+                stats = job.run(workers=workers)
+                self.assertEqual(stats["processed"], stats["shards"])
+                self.assertEqual(job.merge(self.output_path), 60)
+                self.assertEqual(self.read_output(), self.qe.question_generator())
+            # Start over for the next round
+            os.remove(job.manifest_path)
+
+    def test_resume_after_crash(self):
+        job = ShardedJob(self.qe, self.job_dir, shard_bytes=100)
+        calls = []
+        original = jobs._run_shard
+
+        def crash_on_third(task):
+            calls.append(task)
+            if len(calls) == 3:
+                raise KeyboardInterrupt
+            return original(task)
+
+        with patch.object(jobs, "_run_shard", crash_on_third):
+            with self.assertRaises(KeyboardInterrupt):
+                job.run()
+        self.assertEqual(
+            len(job.pending_shards()), len(job.load_manifest()["shards"]) - 2
+        )
+        with self.assertRaises(RuntimeError):
+            job.merge(self.output_path)
+        self.assertFalse(os.path.exists(self.output_path))
+
+        stats = job.run()
+        self.assertEqual(stats["skipped"], 2)
+        job.merge(self.output_path)
+        self.assertEqual(self.read_output(), self.qe.question_generator())
+
+    def test_changed_inputs_start_over(self):
+        job = ShardedJob(self.qe, self.job_dir, shard_bytes=100)
+        job.run()
+        with open(self.book_path, "a") as file:
+            file.write(" One more sample.")
+        stats = job.run()
+        self.assertEqual(stats["skipped"], 0)
+        job.merge(self.output_path)
+        self.assertEqual(self.read_output(), self.qe.question_generator())
+
+    def test_dedup_applies_across_shards(self):
+        qe = QuestionEngine(self.book_path, self.words_path, dedup=True)
+        job = ShardedJob(qe, self.job_dir, shard_bytes=100)
+        job.run()
+        self.assertEqual(job.merge(self.output_path), 3)
+        self.assertEqual(self.read_output(), qe.question_generator())
+
+    def test_unidentifiable_lemmatizer_cannot_be_resumed(self):
+        suffix = "s"
+        qe = QuestionEngine(
+            self.book_path,
+            self.words_path,
+            match_mode="word",
+            lemmatize=lambda token: token.rstrip(suffix),
+        )
+        with self.assertRaises(ValueError):
+            ShardedJob(qe, self.job_dir).run()
+        qe.lemmatize_id = "plural"
+        ShardedJob(qe, self.job_dir, shard_bytes=100).run()
+
+    def test_compressed_books_cannot_be_sharded(self):
+        path = os.path.join(self.tmpdir.name, "book.txt.gz")
+        with gzip.open(path, "wt") as file:
+            file.write(TEXT)
+        job = ShardedJob(QuestionEngine(path, self.words_path), self.job_dir)
+        with self.assertRaises(ValueError):
+            job.run()
+
+
+if __name__ == "__main__":
+    unittest.main()
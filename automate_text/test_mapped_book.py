@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from mapped_book import MappedBook
+from QuestionEngine import QuestionEngine
+
+
+class TestMappedBook(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.book_path = os.path.join(self.tmpdir.name, "book.txt")
+        self.words_path = os.path.join(self.tmpdir.name, "words.txt")
+        with open(self.words_path, "w") as file:
+            file.write("café\nsample\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_book(self, text):
+        with open(self.book_path, "w", encoding="utf-8", newline="") as file:
+            file.write(text)
+
+    def test_sentences_match_parse_text_to_sentences(self):
+        text = "Hello! How are\nyou? I'm fine.  \n\nA café sample. End"
+        self.write_book(text)
+        qe = QuestionEngine(self.book_path, self.words_path)
+        with MappedBook(self.book_path) as book:
+            sentences = [book.sentence(index) for index in range(len(book))]
+            self.assertEqual(book.offsets.typecode, "Q")
+        self.assertEqual(sentences, qe.parse_text_to_sentences(text))
+
+    def test_empty_book(self):
+        self.write_book("")
+        with MappedBook(self.book_path) as book:
+            self.assertEqual(len(book), 1)
+            self.assertEqual(book.sentence(0), "")
+
+    def test_iter_mapped_questions(self):
+        self.write_book("A café\nsample. Nothing here. A sample!")
+        qe = QuestionEngine(self.book_path, self.words_path)
+        self.assertEqual(list(qe.iter_mapped_questions()), qe.question_generator())
+
+    def test_match_views_are_not_copies(self):
+        self.write_book("A café\nsample. Windows\r\nline. Last one")
+        with MappedBook(self.book_path) as book:
+            items = [
+                (type(raw), book.decode(raw)) for _, raw in book.iter_match_views()
+            ]
+            self.assertEqual(
+                [item[1] for item in items],
+                [book.sentence(index) for index in range(len(book))],
+            )
+            # Only the sentence with a \r had to be normalised into a copy
+            self.assertEqual(
+                [item[0] for item in items], [memoryview, bytes, memoryview]
+            )
+            multiword = [type(raw) for _, raw in book.iter_match_views(True)]
+            self.assertEqual(multiword, [bytes, bytes, memoryview])
+        # Abandoning the engine's iteration still closes the book
+        with open(self.words_path, "w") as file:
+            file.write("café\nline\n")
+        questions = QuestionEngine(
+            self.book_path, self.words_path
+        ).iter_mapped_questions()
+        self.assertEqual(next(questions)["word"], "café")
+        questions.close()
+
+    def test_iter_mapped_questions_with_line_breaks(self):
+        with open(self.words_path, "w") as file:
+            file.write("café sample\nline\n")
+        self.write_book("A café\r\nsample. Windows\r\nline. A café\nsample!")
+        qe = QuestionEngine(self.book_path, self.words_path)
+        self.assertEqual(list(qe.iter_mapped_questions()), qe.question_generator())
+        self.assertEqual(len(qe.question_generator()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
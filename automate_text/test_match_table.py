@@ -0,0 +1,45 @@
+import unittest
+from unittest.mock import patch
+from match_table import MatchTable
+from QuestionEngine import QuestionEngine
+
+
+class TestMatchTable(unittest.TestCase):
+
+    def setUp(self):
+        self.qe = QuestionEngine("path/to/book.txt", "path/to/words.txt")
+
+    def test_match_table_reports_every_match(self):
+        with patch.object(
+            QuestionEngine,
+            "read_file_from_local",
+            return_value="A sample text. No match. Text and text.",
+        ), patch.object(
+            QuestionEngine, "read_words_from_file", return_value=["text", "sample"]
+        ):
+            table = self.qe.match_table()
+
+        self.assertEqual(len(table), 3)
+        self.assertEqual(list(table.sentence_ids), [0, 0, 2])
+        self.assertEqual(list(table.word_ids), [1, 0, 0])
+        self.assertEqual(list(table.offsets), [2, 9, 9])
+        self.assertEqual(
+            table[0], {"sentence": "A sample text.", "word": "sample", "offset": 2}
+        )
+        self.assertEqual([row["word"] for row in table], ["sample", "text", "text"])
+
+    def test_to_numpy(self):
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            self.skipTest("numpy is not installed")
+        table = MatchTable(["a b"], ["a", "b"])
+        table.append(0, 0, 0)
+        table.append(0, 1, 2)
+        array = table.to_numpy()
+        self.assertEqual(array["word_id"].tolist(), [0, 1])
+        self.assertEqual(array["offset"].tolist(), [0, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -55,6 +55,32 @@ class TestQuestionEngine(unittest.TestCase):
         expected_questions = [{"sentence": "This is a sample text.", "word": "sample"}]
         self.assertEqual(questions, expected_questions)
 
+    def test_question_generator_match_order(self):
+        with patch.object(
+            QuestionEngine, "read_file_from_local", return_value="A sample text."
+        ), patch.object(
+            QuestionEngine, "read_words_from_file", return_value=["text", "sample"]
+        ):
+            by_list = self.qe.question_generator()
+            by_text = QuestionEngine(
+                "path/to/book.txt", "path/to/words.txt", match_order="text"
+            ).question_generator()
+
+        self.assertEqual(by_list, [{"sentence": "A sample text.", "word": "text"}])
+        self.assertEqual(by_text, [{"sentence": "A sample text.", "word": "sample"}])
+
+    def test_question_generator_whole_words(self):
+        with patch.object(
+            QuestionEngine, "read_file_from_local", return_value="A party. The art!"
+        ), patch.object(QuestionEngine, "read_words_from_file", return_value=["art"]):
+            substring = self.qe.question_generator()
+            word = QuestionEngine(
+                "path/to/book.txt", "path/to/words.txt", match_mode="word"
+            ).question_generator()
+
+        self.assertEqual([q["sentence"] for q in substring], ["A party.", "The art!"])
+        self.assertEqual(word, [{"sentence": "The art!", "word": "art"}])
+
 
 if __name__ == "__main__":
     unittest.main()
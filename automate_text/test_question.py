@@ -0,0 +1,63 @@
+import os
+import pickle
+import tempfile
+import unittest
+from QuestionEngine import QuestionEngine
+from question import Question
+
+
+class TestQuestion(unittest.TestCase):
+
+    def test_record(self):
+        sentences = ["A sample sentence."]
+        question = Question(sentences, 0, "".join(["sam", "ple"]))
+        self.assertEqual(question.sentence, "A sample sentence.")
+        self.assertIs(question.word, Question(sentences, 0, "sample").word)
+        self.assertEqual(
+            question.as_dict(), {"sentence": "A sample sentence.", "word": "sample"}
+        )
+        self.assertEqual(question, Question(["A sample sentence."], 0, "sample"))
+        self.assertEqual(len({question, Question(sentences, 0, "sample")}), 1)
+        self.assertFalse(hasattr(question, "__dict__"))
+
+    def test_immutable(self):
+        question = Question(["A sample."], 0, "sample")
+        with self.assertRaises(AttributeError):
+            question.word = "other"
+        with self.assertRaises(AttributeError):
+            del question.sentence_id
+
+    def test_pickle(self):
+        sentences = ["One sample.", "Two samples."]
+        questions = [Question(sentences, 0, "One"), Question(sentences, 1, "Two")]
+        loaded = pickle.loads(pickle.dumps(questions))
+        self.assertEqual(loaded, questions)
+        self.assertIs(loaded[0]._sentences, loaded[1]._sentences)
+
+
+class TestQuestionRecords(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.book_path = os.path.join(self.tmpdir.name, "book.txt")
+        self.words_path = os.path.join(self.tmpdir.name, "words.txt")
+        with open(self.book_path, "w") as file:
+            file.write("A sample here. Nothing there. Some text. A sample again.")
+        with open(self.words_path, "w") as file:
+            file.write("sample\ntext\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_records_match_question_generator(self):
+        qe = QuestionEngine(self.book_path, self.words_path)
+        records = qe.question_records()
+        self.assertEqual(
+            [record.as_dict() for record in records], qe.question_generator()
+        )
+        self.assertEqual([record.sentence_id for record in records], [0, 1, 2])
+        self.assertIs(records[0].word, records[2].word)
+
+
+if __name__ == "__main__":
+    unittest.main()
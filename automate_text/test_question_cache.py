@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from question_cache import QuestionCache
+from QuestionEngine import QuestionEngine, callable_identity
+
+
+class TestQuestionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.book_path = os.path.join(self.tmpdir.name, "book.txt")
+        self.words_path = os.path.join(self.tmpdir.name, "words.txt")
+        self.cache_dir = os.path.join(self.tmpdir.name, "cache")
+        self.write(self.book_path, "A sample text. Nothing.")
+        self.write(self.words_path, "sample\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as file:
+            file.write(text)
+
+    def test_key_depends_on_content_and_options(self):
+        key = QuestionCache.make_key(self.book_path, self.words_path, {"a": 1})
+        self.assertEqual(
+            key, QuestionCache.make_key(self.book_path, self.words_path, {"a": 1})
+        )
+        self.assertNotEqual(
+            key, QuestionCache.make_key(self.book_path, self.words_path, {"a": 2})
+        )
+        self.write(self.words_path, "text\n")
+        self.assertNotEqual(
+            key, QuestionCache.make_key(self.book_path, self.words_path, {"a": 1})
+        )
+
+    def test_memory_tier_is_lru(self):
+        cache = QuestionCache(max_entries=2)
+        cache.put("a", [{"word": "a"}])
+        cache.put("b", [{"word": "b"}])
+        cache.get("a")
+        cache.put("c", [{"word": "c"}])
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), [{"word": "a"}])
+
+    def test_disk_tier_survives_a_new_cache(self):
+        QuestionCache(cache_dir=self.cache_dir).put("a", [{"word": "a"}])
+        cache = QuestionCache(cache_dir=self.cache_dir)
+        self.assertEqual(cache.get("a"), [{"word": "a"}])
+
+    def test_disk_tier_is_size_bounded(self):
+        cache = QuestionCache(max_entries=0, cache_dir=self.cache_dir)
+        cache.put("a", [{"word": "a" * 100}])
+        size = os.path.getsize(os.path.join(self.cache_dir, "a.json.gz"))
+        cache.max_disk_bytes = size
+        os.utime(os.path.join(self.cache_dir, "a.json.gz"), (0, 0))
+        cache.put("b", [{"word": "b" * 100}])
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), [{"word": "b" * 100}])
+
+    def test_question_generator_uses_cache(self):
+        qe = QuestionEngine(self.book_path, self.words_path, cache=QuestionCache())
+        expected = qe.question_generator()
+        with patch.object(QuestionEngine, "_generate_questions") as generate:
+            self.assertEqual(qe.question_generator(), expected)
+            generate.assert_not_called()
+
+    def test_lemmatizers_are_told_apart(self):
+        self.write(self.book_path, "Cats sleep. A dog sleeps.")
+        self.write(self.words_path, "cat\n")
+        cache = QuestionCache(cache_dir=self.cache_dir)
+
+        def engine(lemmatize, lemmatize_id=None):
+            return QuestionEngine(
+                self.book_path,
+                self.words_path,
+                cache=cache,
+                match_mode="word",
+                casefold=True,
+                lemmatize=lemmatize,
+                lemmatize_id=lemmatize_id,
+            )
+
+        plural = engine(lambda token: token.rstrip("s"))
+        same = engine(lambda token: token)
+        self.assertEqual(len(plural.question_generator()), 1)
+        self.assertEqual(same.question_generator(), [])
+        self.assertNotEqual(
+            plural.engine_options()["lemmatize"], same.engine_options()["lemmatize"]
+        )
+
+        # Captured values are invisible to the identity: never cached
+        suffix = "s"
+        closure = engine(lambda token: token.rstrip(suffix))
+        self.assertIsNone(closure.engine_options())
+        with patch.object(QuestionEngine, "_generate_questions", return_value=[]) as g:
+            closure.question_generator()
+            closure.question_generator()
+            self.assertEqual(g.call_count, 2)
+        named = engine(lambda token: token.rstrip(suffix), lemmatize_id="plural-v1")
+        self.assertEqual(named.engine_options()["lemmatize"], "plural-v1")
+
+    def test_callable_identity(self):
+        def first(token):
+            return token
+
+        def second(token):
+            return token.lower()
+
+        self.assertNotEqual(callable_identity(first), callable_identity(second))
+        self.assertEqual(callable_identity(first), callable_identity(first))
+        self.assertIn("first", callable_identity(first))
+        self.assertEqual(callable_identity(str.lower), "builtins.str.lower")
+        self.assertEqual(callable_identity(len), "builtins.len")
+        self.assertIsNone(callable_identity("abc".strip))
+        self.assertIsNone(callable_identity(lambda token, suffix="s": token))
+
+
+if __name__ == "__main__":
+    unittest.main()
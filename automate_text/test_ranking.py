@@ -0,0 +1,79 @@
+import unittest
+from unittest.mock import patch
+from match_table import MatchTable
+
+try:
+    import numpy as np
+    import ranking
+    from ranking import candidate_rows, rank_questions, score_matches, top_k_per_word
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestRanking(unittest.TestCase):
+
+    def setUp(self):
+        sentences = [
+            "Tea.",
+            "I would like a cup of tea with a slice of lemon, if you please.",
+            "Tea and cake and tea.",
+            "We had cake in the garden after the long walk home that day.",
+        ]
+        self.table = MatchTable(sentences, ["tea", "cake"])
+        for sentence_id, sentence in enumerate(sentences):
+            for word_id, word in enumerate(self.table.words):
+                start = sentence.lower().find(word)
+                while start != -1:
+                    self.table.append(sentence_id, word_id, start)
+                    start = sentence.lower().find(word, start + 1)
+
+    def test_top_k_per_word(self):
+        word_ids = np.array([0, 1, 0, 0, 1], dtype=np.uint32)
+        scores = np.array([0.1, 0.5, 0.9, 0.4, 0.7])
+        best = top_k_per_word(word_ids, scores, k=2)
+        self.assertEqual(best[0].tolist(), [2, 3])
+        self.assertEqual(best[1].tolist(), [4, 1])
+        self.assertEqual(top_k_per_word(word_ids[:0], scores[:0], k=2), {})
+
+    def test_scores_prefer_target_length(self):
+        scores = score_matches(self.table, weights={"rarity": 0, "position": 0})
+        by_sentence = dict(zip(self.table.sentence_ids, scores))
+        self.assertGreater(by_sentence[1], by_sentence[0])
+
+    def test_top_k_per_word_keeps_every_group(self):
+        rng = np.random.default_rng(0)
+        word_ids = rng.integers(0, 70_000, 5000).astype(np.uint32)
+        scores = rng.random(5000)
+        best = top_k_per_word(word_ids, scores, k=2)
+        self.assertEqual(set(best), set(word_ids.tolist()))
+        for word_id, positions in best.items():
+            expected = np.flatnonzero(word_ids == word_id)
+            expected = expected[np.argsort(-scores[expected])][:2]
+            self.assertEqual(positions.tolist(), expected.tolist())
+
+    def test_scores_of_candidate_rows(self):
+        rows = candidate_rows(self.table)
+        self.assertEqual(
+            score_matches(self.table, rows).tolist(),
+            score_matches(self.table)[rows].tolist(),
+        )
+        with patch.object(ranking, "candidate_rows", wraps=candidate_rows) as counted:
+            rank_questions(self.table, k=2)
+        self.assertEqual(counted.call_count, 1)
+
+    def test_rank_questions(self):
+        ranked = rank_questions(self.table, k=2, target_length=60)
+        self.assertEqual(set(ranked), {"tea", "cake"})
+        self.assertEqual(len(ranked["tea"]), 2)
+        self.assertEqual(len(ranked["cake"]), 2)
+        # One candidate per sentence and word, even with repeated words
+        tea_sentences = [question["sentence"] for question in ranked["tea"]]
+        self.assertEqual(len(set(tea_sentences)), 2)
+        self.assertEqual(ranked["tea"][0]["sentence"], self.table.sentences[1])
+        scores = [question["score"] for question in ranked["tea"]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
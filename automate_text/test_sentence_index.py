@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from QuestionEngine import QuestionEngine
+from sentence_index import SentenceIndex
+
+
+class TestSentenceIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.index_path = os.path.join(self.tmpdir.name, "book.idx")
+        text = (
+            "Tea for two. A café with tea and cake. Cake only. "
+            "Tea, cake and tea again. Nothing."
+        )
+        qe = QuestionEngine("path/to/book.txt", "path/to/words.txt")
+        with patch.object(
+            QuestionEngine, "read_file_from_local", return_value=text
+        ), patch.object(
+            QuestionEngine,
+            "read_words_from_file",
+            return_value=["tea", "cake", "café", "scone"],
+        ):
+            self.built = SentenceIndex.build(qe)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def check(self, index):
+        self.assertEqual(list(index.sentence_ids("tea")), [1, 3])
+        self.assertEqual(list(index.sentence_ids("cake")), [1, 3])
+        self.assertEqual(list(index.sentence_ids("scone")), [])
+        self.assertEqual(list(index.sentence_ids("unknown")), [])
+        self.assertEqual(index.sentences_for("café"), ["A café with tea and cake."])
+        self.assertEqual(index.sentences_for("cake", limit=1), [index.sentence(1)])
+        self.assertEqual(index.intersect("tea", "café"), [1])
+        self.assertEqual(index.intersect("tea", "scone"), [])
+        self.assertEqual(len(index), 5)
+
+    def test_built_index(self):
+        self.check(self.built)
+
+    def test_saved_index_is_memory_mapped(self):
+        self.built.save(self.index_path)
+        with SentenceIndex.load(self.index_path) as index:
+            self.check(index)
+            self.assertIsInstance(index._posting_ids("tea"), memoryview)
+
+    def test_close_while_ids_are_held(self):
+        self.built.save(self.index_path)
+        index = SentenceIndex.load(self.index_path)
+        ids = index.sentence_ids("tea")
+        index.close()
+        self.assertEqual(list(ids), [1, 3])
+
+        index = SentenceIndex.load(self.index_path)
+        view = index._posting_ids("tea")
+        with self.assertRaises(BufferError):
+            index.close()
+        # Still usable, and closes once the view is gone
+        self.check(index)
+        view.release()
+        index.close()
+
+    def test_sample(self):
+        picks = self.built.sample("cake", 5, seed=3)
+        self.assertEqual(sorted(picks), sorted(self.built.sentences_for("cake")))
+        self.assertEqual(self.built.sample("cake", 1, seed=3), picks[:1])
+
+    def test_rejects_other_files(self):
+        with open(self.index_path, "wb") as file:
+            file.write(b"\0" * 64)
+        with self.assertRaises(ValueError):
+            SentenceIndex.load(self.index_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+from sentence_splitter import (
+    SENTENCE_END,
+    SentenceStream,
+    compile_boundary,
+    iter_sentence_spans,
+    normalize,
+    split_sentences,
+)
+
+
+class TestSentenceSplitter(unittest.TestCase):
+
+    def test_split_sentences(self):
+        text = "Hello! How are you? I'm fine."
+        self.assertEqual(split_sentences(text), ["Hello!", "How are you?", "I'm fine."])
+
+    def test_abbreviations_do_not_end_sentences(self):
+        text = "Mr. Darcy bowed. Mrs. Bennet and Dr. Jones laughed!  Done."
+        self.assertEqual(
+            split_sentences(text),
+            ["Mr. Darcy bowed.", "Mrs. Bennet and Dr. Jones laughed!", "Done."],
+        )
+
+    def test_abbreviation_must_be_a_whole_word(self):
+        self.assertEqual(split_sentences("It is a Hmr. Ok."), ["It is a Hmr.", "Ok."])
+
+    def test_custom_abbreviations(self):
+        boundary = compile_boundary(["etc"])
+        self.assertEqual(
+            split_sentences("Pens, etc. were there. Mr. X.", boundary),
+            ["Pens, etc. were there.", "Mr.", "X."],
+        )
+
+    def test_line_breaks_are_joined(self):
+        text = "It is a truth\r\nuniversally acknowledged.\n\nHowever little"
+        self.assertEqual(
+            split_sentences(text),
+            ["It is a truth universally acknowledged.", "However little"],
+        )
+
+    def test_spans(self):
+        text = "One. Two!\nThree"
+        self.assertEqual(list(iter_sentence_spans(text)), [(0, 4), (5, 9), (10, 15)])
+
+    def test_trailing_whitespace_and_empty_text(self):
+        self.assertEqual(split_sentences("End. "), ["End.", ""])
+        self.assertEqual(split_sentences(""), [""])
+
+    def test_bytes(self):
+        boundary = compile_boundary(binary=True)
+        text = b"Mr. Darcy\nbowed. Yes."
+        spans = list(iter_sentence_spans(text, boundary))
+        self.assertEqual(
+            [normalize(text[start:end]) for start, end in spans],
+            [b"Mr. Darcy bowed.", b"Yes."],
+        )
+
+
+class TestSentenceStream(unittest.TestCase):
+
+    def feed_all(self, stream, text, size):
+        sentences = []
+        for start in range(0, len(text), size):
+            end = start + size
+            sentences.extend(stream.feed(text[start:end]))
+        return sentences + stream.close()
+
+    def test_any_chunking_matches_split_sentences(self):
+        text = "Mr. Darcy\r\nbowed.  Mrs. Bennet laughed!\n\nWhy? Dr. Jones. End. "
+        for size in range(1, len(text) + 1):
+            with self.subTest(size=size):
+                stream = SentenceStream()
+                self.assertEqual(
+                    self.feed_all(stream, text, size), split_sentences(text)
+                )
+        boundary = compile_boundary(binary=True)
+        data = text.encode()
+        self.assertEqual(
+            self.feed_all(SentenceStream(boundary), data, 3),
+            split_sentences(data, boundary),
+        )
+
+    def test_feeds_only_scan_new_text(self):
+        scanned = []
+
+        class Boundary:
+            pattern = SENTENCE_END.pattern
+
+            def finditer(self, buffer, pos=0):
+                scanned.append(len(buffer) - pos)
+                return SENTENCE_END.finditer(buffer, pos)
+
+        stream = SentenceStream(Boundary())
+        for _ in range(50):
+            self.assertEqual(stream.feed("no boundary here "), [])
+        self.assertLessEqual(max(scanned), len("no boundary here ") + 1)
+        self.assertEqual(stream.feed("Mr. X. Y"), ["no boundary here " * 50 + "Mr. X."])
+
+    def test_max_carry(self):
+        stream = SentenceStream(max_carry=10)
+        self.assertEqual(
+            stream.feed("abcdefghijklmnopqrstuvw"), ["abcdefghij", "klmnopqrst"]
+        )
+        self.assertEqual(stream.feed("xyz. Next"), ["uvwxyz."])
+        self.assertEqual(stream.close(), ["Next"])
+
+
+if __name__ == "__main__":
+    unittest.main()
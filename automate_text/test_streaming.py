@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+from QuestionEngine import QuestionEngine
+
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.book_path = os.path.join(self.tmpdir.name, "book.txt")
+        self.words_path = os.path.join(self.tmpdir.name, "words.txt")
+        with open(self.words_path, "w") as file:
+            file.write("sample\ntext\n")
+        self.qe = QuestionEngine(self.book_path, self.words_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_book(self, text):
+        with open(self.book_path, "w", newline="") as file:
+            file.write(text)
+
+    def test_iter_sentences_matches_parse_for_every_chunk_size(self):
+        texts = [
+            "Hello! How are you? I'm fine.",
+            "A sample.   \n\n  Next text.\r\nLast one without end",
+            "Trailing space. ",
+            "",
+            "...!!! ?",
+        ]
+        for text in texts:
+            self.write_book(text)
+            expected = self.qe.parse_text_to_sentences(self.qe.read_file_from_local())
+            for chunk_size in (1, 2, 3, 5, 8, 1024):
+                with self.subTest(text=text, chunk_size=chunk_size):
+                    result = list(self.qe.iter_sentences(chunk_size=chunk_size))
+                    self.assertEqual(result, expected)
+
+    def test_iter_questions_matches_question_generator(self):
+        self.write_book("A sample here. Nothing there.\nSome text\nover lines. End.")
+        expected = self.qe.question_generator()
+        result = list(self.qe.iter_questions(chunk_size=4))
+        self.assertEqual(result, expected)
+        self.assertEqual(len(result), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
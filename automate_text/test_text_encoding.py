@@ -0,0 +1,95 @@
+import gzip
+import os
+import tempfile
+import unittest
+from QuestionEngine import QuestionEngine
+from text_encoding import is_bytes_compatible, sniff_encoding
+
+TEXT = "A café au lait. Nothing there.\nThe naïve text here. Plain end."
+
+
+class TestSniffEncoding(unittest.TestCase):
+
+    def test_byte_order_marks(self):
+        self.assertEqual(sniff_encoding("﻿abc".encode("utf-8")), "utf-8-sig")
+        self.assertEqual(sniff_encoding("abc".encode("utf-16")), "utf-16")
+        self.assertEqual(sniff_encoding("abc".encode("utf-32")), "utf-32")
+
+    def test_utf8_and_legacy_encodings(self):
+        self.assertEqual(sniff_encoding(TEXT.encode("utf-8")), "utf-8")
+        # Cut in the middle of "é"
+        self.assertEqual(sniff_encoding("Café".encode("utf-8")[:-1]), "utf-8")
+        self.assertEqual(sniff_encoding(TEXT.encode("cp1252")), "cp1252")
+        self.assertEqual(sniff_encoding(b"caf\xe9 \x81"), "latin-1")
+        self.assertEqual(sniff_encoding(b"plain ascii"), "utf-8")
+
+    def test_gutenberg_declaration(self):
+        header = b"Character set encoding: ISO-8859-1\r\n\r\n"
+        self.assertEqual(sniff_encoding(header + b"plain"), "iso8859-1")
+        self.assertEqual(
+            sniff_encoding(header + "café au lait".encode("latin-1")), "iso8859-1"
+        )
+        # A declaration the bytes contradict is ignored
+        self.assertEqual(sniff_encoding(header + "café".encode("utf-8")), "utf-8")
+        unknown = b"Character set encoding: NOPE\n"
+        self.assertEqual(sniff_encoding(unknown + b"x"), "utf-8")
+
+    def test_is_bytes_compatible(self):
+        for encoding in ("utf-8", "utf-8-sig", "latin-1", "cp1252", "ascii"):
+            self.assertTrue(is_bytes_compatible(encoding), encoding)
+        for encoding in ("utf-16", "utf-32", "shift_jis"):
+            self.assertFalse(is_bytes_compatible(encoding), encoding)
+
+
+class TestBytesQuestions(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.words_path = os.path.join(self.tmpdir.name, "words.txt")
+        with open(self.words_path, "w", encoding="utf-8") as file:
+            file.write("café\nnaïve\n")
+        self.expected = [
+            {"sentence": "A café au lait.", "word": "café"},
+            {"sentence": "The naïve text here.", "word": "naïve"},
+        ]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_book(self, name, data):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "wb") as file:
+            file.write(data)
+        return path
+
+    def engine(self, path, **options):
+        qe = QuestionEngine(path, self.words_path, encoding="auto", **options)
+        # The word list is UTF-8 whatever the locale
+        qe.read_words_from_file = lambda: ["café", "naïve"]
+        return qe
+
+    def test_every_path_agrees(self):
+        for encoding in ("utf-8", "utf-8-sig", "cp1252"):
+            qe = self.engine(self.write_book("book.txt", TEXT.encode(encoding)))
+            with self.subTest(encoding=encoding):
+                self.assertEqual(qe.question_generator(), self.expected)
+                self.assertEqual(
+                    list(qe.iter_bytes_questions(chunk_size=3)), self.expected
+                )
+                self.assertEqual(list(qe.iter_mapped_questions()), self.expected)
+
+    def test_compressed_book(self):
+        path = self.write_book("book.txt.gz", gzip.compress(TEXT.encode("cp1252")))
+        qe = self.engine(path, match_order="text")
+        self.assertEqual(qe.book_encoding(), "cp1252")
+        self.assertEqual(list(qe.iter_bytes_questions()), self.expected)
+
+    def test_utf16_falls_back_to_text(self):
+        qe = self.engine(self.write_book("book.txt", TEXT.encode("utf-16")))
+        self.assertEqual(list(qe.iter_bytes_questions()), self.expected)
+        with self.assertRaises(ValueError):
+            qe.read_mapped_book()
+
+
+if __name__ == "__main__":
+    unittest.main()
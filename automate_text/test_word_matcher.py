@@ -0,0 +1,165 @@
+import json
+import marshal
+import os
+import pickle
+import tempfile
+import unittest
+from unittest.mock import patch
+from word_matcher import AhoCorasick, WholeWordMatcher, load_matcher
+
+
+class TestAhoCorasick(unittest.TestCase):
+
+    def setUp(self):
+        self.words = ["text", "sample", "art", "party"]
+        self.matcher = AhoCorasick(self.words)
+
+    def test_first_match_uses_word_list_order(self):
+        # "sample" starts earlier in the sentence but "text" comes first
+        # in the word list, like the original nested loop
+        result = self.matcher.first_match("This is a sample text.")
+        self.assertEqual(result, "text")
+
+    def test_first_match_matches_substrings(self):
+        self.assertEqual(self.matcher.first_match("Let's party."), "art")
+
+    def test_first_match_returns_none_without_match(self):
+        self.assertIsNone(self.matcher.first_match("Nothing here."))
+
+    def test_leftmost_match(self):
+        result = self.matcher.leftmost_match("This is a sample text.")
+        self.assertEqual(result, "sample")
+
+    def test_iter_matches_reports_every_occurrence(self):
+        matches = sorted(self.matcher.iter_matches("a party"))
+        self.assertEqual(matches, [(2, 3), (3, 2)])
+
+    def test_same_result_as_nested_loop(self):
+        words = ["he", "she", "his", "hers", "", "s"]
+        matcher = AhoCorasick(words[:4])
+        for sentence in ["ushers", "ahishers", "shh", "", "xyz"]:
+            expected = next((w for w in words[:4] if w in sentence), None)
+            self.assertEqual(matcher.first_match(sentence), expected)
+
+    def test_empty_word_matches_everything(self):
+        matcher = AhoCorasick(["zzz", ""])
+        self.assertEqual(matcher.first_match("abc"), "")
+
+    def test_bytes_patterns(self):
+        matcher = AhoCorasick([b"sample", b"text"])
+        self.assertEqual(matcher.first_match(b"a sample text"), b"sample")
+
+
+class TestWholeWordMatcher(unittest.TestCase):
+
+    def test_only_whole_words_match(self):
+        matcher = WholeWordMatcher(["art", "party"])
+        self.assertEqual(matcher.first_match("Let's party."), "party")
+        self.assertEqual(matcher.first_match("Art is art."), "art")
+        self.assertIsNone(matcher.first_match("Apartment."))
+
+    def test_first_match_uses_word_list_order(self):
+        matcher = WholeWordMatcher(["text", "sample"])
+        self.assertEqual(matcher.first_match("A sample text."), "text")
+        self.assertEqual(matcher.leftmost_match("A sample text."), "sample")
+
+    def test_casefold_and_lemmatize(self):
+        self.assertIsNone(WholeWordMatcher(["party"]).first_match("PARTY!"))
+        matcher = WholeWordMatcher(
+            ["Walk"], casefold=True, lemmatize=lambda token: token.rstrip("s")
+        )
+        self.assertEqual(matcher.first_match("She WALKS home."), "Walk")
+
+    def test_phrases(self):
+        matcher = WholeWordMatcher(["cream", "ice cream"])
+        self.assertEqual(matcher.first_match("Some ice  cream."), "cream")
+        self.assertEqual(
+            list(matcher.iter_matches("Some ice  cream.")), [(5, 1), (10, 0)]
+        )
+
+
+class TestLoadMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.words_path = os.path.join(self.tmpdir.name, "words.txt")
+        self.write_words("sample\ntext\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_words(self, text, mtime_ns=None):
+        with open(self.words_path, "w") as file:
+            file.write(text)
+        if mtime_ns is not None:
+            os.utime(self.words_path, ns=(mtime_ns, mtime_ns))
+
+    def test_artifact_is_saved_and_reused(self):
+        matcher = load_matcher(self.words_path)
+        self.assertEqual(matcher.words, ["sample", "text"])
+        self.assertTrue(os.path.exists(self.words_path + ".matcher"))
+
+        with patch.object(AhoCorasick, "_build_failure_links") as compile_matcher:
+            reloaded = load_matcher(self.words_path)
+            compile_matcher.assert_not_called()
+        self.assertEqual(reloaded.words, ["sample", "text"])
+
+    def test_touched_but_unchanged_file_is_not_recompiled(self):
+        load_matcher(self.words_path)
+        self.write_words("sample\ntext\n", mtime_ns=10**18)
+        with patch.object(AhoCorasick, "_build_failure_links") as compile_matcher:
+            load_matcher(self.words_path)
+            compile_matcher.assert_not_called()
+
+    def test_changed_file_is_recompiled(self):
+        load_matcher(self.words_path)
+        self.write_words("party\n", mtime_ns=10**18)
+        self.assertEqual(load_matcher(self.words_path).words, ["party"])
+
+    def test_corrupt_artifact_is_rebuilt(self):
+        with open(self.words_path + ".matcher", "wb") as file:
+            file.write(b"not json")
+        self.assertEqual(load_matcher(self.words_path).words, ["sample", "text"])
+
+    def test_pickle_artifact_is_never_unpickled(self):
+        marker = os.path.join(self.tmpdir.name, "pwned")
+        with open(self.words_path + ".matcher", "wb") as file:
+            pickle.dump(_CreateFile(marker), file)
+        self.assertEqual(load_matcher(self.words_path).words, ["sample", "text"])
+        self.assertFalse(os.path.exists(marker))
+
+    def test_invalid_automaton_is_rebuilt(self):
+        load_matcher(self.words_path)
+        path = self.words_path + ".matcher"
+        with open(path, "rb") as file:
+            artifact = marshal.load(file)
+        artifact["matcher"]["goto"][0]["s"] = 10**6
+        with open(path, "wb") as file:
+            marshal.dump(artifact, file)
+        matcher = load_matcher(self.words_path)
+        self.assertEqual(matcher.first_match("a sample"), "sample")
+
+    def test_state_round_trip(self):
+        matcher = AhoCorasick(["he", "she", "his", "hers"])
+        reloaded = AhoCorasick.from_state(json.loads(json.dumps(matcher.to_state())))
+        for text in ("ushers", "this", "nothing"):
+            self.assertEqual(reloaded.first_match(text), matcher.first_match(text))
+            self.assertEqual(
+                list(reloaded.iter_matches(text)), list(matcher.iter_matches(text))
+            )
+        with self.assertRaises(ValueError):
+            AhoCorasick.from_state({"words": ["a"], "goto": [{"a": 1.0}, {}]})
+
+
+class _CreateFile:
+    # Unpickling this creates a file, as a hostile artifact could
+
+    def __init__(self, path):
+        self.path = path
+
+    def __reduce__(self):
+        return open, (self.path, "w")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+from typing import Optional
+import codecs
+import re
+
+# Bytes read from the start of a book to guess its encoding
+SNIFF_BYTES = 64 * 1024
+
+# Longest first: the UTF-32 LE mark starts with the UTF-16 LE one
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# Project Gutenberg headers name the encoding of the file
+DECLARED = re.compile(rb"Character set encoding:[ \t]*([A-Za-z0-9_.:-]+)")
+# Bytes that windows-1252 leaves undefined
+CP1252_UNDEFINED = re.compile(b"[\x81\x8d\x8f\x90\x9d]")
+
+
+def _declared_encoding(sample: bytes) -> Optional[str]:
+    match = DECLARED.search(sample)
+    if match is None:
+        return None
+    try:
+        name = codecs.lookup(match.group(1).decode("ascii")).name
+    except LookupError:
+        return None
+    # A file declared ASCII is read as its superset
+    return "utf-8" if name == "ascii" else name
+
+
+def sniff_encoding(sample: bytes) -> str:
+    """
+    Guesses the encoding of a book from its first bytes.
+
+    In order: a byte order mark; UTF-8 if the sample is valid UTF-8 and not
+    plain ASCII; the encoding declared in a Project Gutenberg header; UTF-8
+    for plain ASCII; else windows-1252, or latin-1 when the sample holds bytes
+    windows-1252 does not define.
+
+    Args:
+        sample (bytes): The start of the file, e.g. ``SNIFF_BYTES`` of it.
+
+    Returns:
+        str: A codec name for ``open`` or ``bytes.decode``.
+    """
+
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    declared = _declared_encoding(sample)
+    if sample.isascii():
+        return declared or "utf-8"
+    try:
+        # Not final: the sample may end in the middle of a character
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    if declared is not None:
+        try:
+            sample.decode(declared)
+            return declared
+        except (UnicodeDecodeError, LookupError):
+            pass
+    if CP1252_UNDEFINED.search(sample):
+        return "latin-1"
+    return "cp1252"
+
+
+def is_bytes_compatible(encoding: str) -> bool:
+    """
+    Tells whether words and sentence boundaries can be found in the raw bytes
+    of text in this encoding: true for UTF-8 and the single-byte encodings
+    that extend ASCII, where a byte string match is a character match.
+    """
+
+    name = codecs.lookup(encoding).name
+    if name in ("utf-8", "utf-8-sig"):
+        return True
+    if ". \n".encode(name) != b". \n":
+        return False
+    # Single-byte: every byte decodes to exactly one character
+    return len(bytes(range(256)).decode(name, errors="replace")) == 256
@@ -0,0 +1,407 @@
+from itertools import chain
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import hashlib
+import marshal
+import os
+import re
+import tempfile
+
+# Bump when the layout of AhoCorasick changes so old artifacts are rebuilt
+ARTIFACT_VERSION = 3
+ARTIFACT_SUFFIX = ".matcher"
+# A word, with inner apostrophes kept: "don't", "Darcy's"
+TOKEN_PATTERN = re.compile(r"\w+(?:['’]\w+)*")
+
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher compiled once from a word list.
+
+    The automaton scans a sentence in a single pass and reports which of the
+    words occur in it, so matching no longer costs one substring scan per word.
+    Patterns may be ``str`` or ``bytes``; the text passed to the matching
+    methods must be of the same type.
+
+    Usage:
+        matcher = AhoCorasick(["sample", "text"])
+        matcher.first_match("This is a sample text.")  # -> "sample"
+    """
+
+    def __init__(self, words: Sequence):
+        self.words = list(words)
+        self._goto: List[Dict] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        self._max_len = max((len(word) for word in self.words), default=0)
+
+        # Duplicated words keep the index of their first occurrence, which is
+        # the one the nested loop would have reported.
+        seen = set()
+        for index, word in enumerate(self.words):
+            if word in seen:
+                continue
+            seen.add(word)
+            state = 0
+            for symbol in word:
+                nxt = self._goto[state].get(symbol)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][symbol] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] = self._out[state] + (index,)
+
+        self._build_failure_links()
+        self._index_best()
+
+    def _index_best(self) -> None:
+        # Lowest word index reported by each state, or len(words) for none.
+        sentinel = len(self.words)
+        self._best = [min(out, default=sentinel) for out in self._out]
+
+    def to_state(self) -> dict:
+        """
+        Returns the compiled automaton as plain data (dicts, lists, tuples,
+        ``str`` and ``int``), for ``from_state``. Only ``str`` patterns can be
+        saved this way.
+        """
+
+        return {
+            "words": self.words,
+            "goto": self._goto,
+            "fail": self._fail,
+            "out": self._out,
+            "best": self._best,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "AhoCorasick":
+        """
+        Rebuilds a matcher from ``to_state`` data without recompiling it.
+
+        The data is checked to describe a well-formed automaton over ``str``
+        patterns, so a damaged file cannot make matching fail later.
+
+        Raises:
+            ValueError: If the data is not a valid automaton.
+        """
+
+        try:
+            words, goto, fail, out, best = (
+                state["words"],
+                state["goto"],
+                state["fail"],
+                state["out"],
+                state["best"],
+            )
+            size = len(goto)
+            out_types = set(map(type, out))
+            targets = list(chain.from_iterable(map(dict.values, goto)))
+            indices = list(chain.from_iterable(out))
+            # Type sets first: min and max alone would accept floats and bools
+            valid = (
+                size > 0
+                and len(fail) == size
+                and len(out) == size
+                and len(best) == size
+                and set(map(type, words)) <= {str}
+                and out_types <= {list, tuple}
+                and set(map(type, chain(targets, fail, indices, best))) <= {int}
+                and (not targets or (min(targets) > 0 and max(targets) < size))
+                and min(fail) >= 0
+                and max(fail) < size
+                and (not indices or (min(indices) >= 0 and max(indices) < len(words)))
+                and min(best) >= 0
+                and max(best) <= len(words)
+            )
+        except (KeyError, TypeError):
+            valid = False
+        if not valid:
+            raise ValueError("not a compiled matcher")
+
+        matcher = cls.__new__(cls)
+        matcher.words = words
+        matcher._goto = goto
+        matcher._fail = fail
+        matcher._out = out if out_types <= {tuple} else list(map(tuple, out))
+        matcher._max_len = max(map(len, words), default=0)
+        matcher._best = best
+        return matcher
+
+    def _build_failure_links(self) -> None:
+        queue = list(self._goto[0].values())
+        for state in queue:
+            if self._fail[state] == 0:
+                self._out[state] = self._out[state] + self._out[0]
+        for state in queue:
+            for symbol, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and symbol not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(symbol, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def first_match(self, text) -> Optional[str]:
+        """
+        Returns the first word, in word-list order, that occurs in the text.
+
+        This is the result of ``next(w for w in words if w in text)`` computed
+        in one pass over the text.
+        """
+
+        goto = self._goto
+        fail = self._fail
+        best = self._best
+        found = best[0]
+        state = 0
+        for symbol in text:
+            if found == 0:
+                break
+            while state and symbol not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(symbol, 0)
+            if best[state] < found:
+                found = best[state]
+
+        return self.words[found] if found < len(self.words) else None
+
+    def leftmost_match(self, text) -> Optional[str]:
+        """
+        Returns the word that starts earliest in the text.
+
+        Ties between words starting at the same offset go to the word that
+        comes first in the word list.
+        """
+
+        found: Optional[Tuple[int, int]] = None
+        for start, index in self.iter_matches(text):
+            if found is not None and start > found[0] + self._max_len:
+                break
+            if found is None or (start, index) < found:
+                found = (start, index)
+
+        return self.words[found[1]] if found is not None else None
+
+    def iter_matches(self, text) -> Iterator[Tuple[int, int]]:
+        """
+        Yields ``(start_offset, word_index)`` for every occurrence of every
+        word in the text, ordered by the offset at which the occurrence ends.
+        """
+
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        words = self.words
+        for index in out[0]:
+            yield 0, index
+        state = 0
+        for position, symbol in enumerate(text):
+            while state and symbol not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(symbol, 0)
+            for index in out[state]:
+                yield position + 1 - len(words[index]), index
+
+
+class WholeWordMatcher:
+    """
+    Whole-word matcher: "art" matches "art." but not "party".
+
+    Each sentence is tokenized once and its tokens are looked up in a
+    frozenset of the words, so the cost depends on the number of tokens in the
+    sentence and not on the size of the word list. Words made of several
+    tokens ("ice cream") are matched as consecutive tokens.
+
+    Args:
+        words (Sequence[str]): The word list, in priority order.
+        casefold (bool): Match regardless of case.
+        lemmatize (Callable[[str], str]): Optional hook applied to every token
+            of the words and of the sentences, e.g. a stemmer, so that
+            "walked" can match "walk".
+
+    Usage:
+        matcher = WholeWordMatcher(["art", "party"], casefold=True)
+        matcher.first_match("Let's Party.")  # -> "party"
+    """
+
+    def __init__(
+        self,
+        words: Sequence[str],
+        casefold: bool = False,
+        lemmatize: Optional[Callable[[str], str]] = None,
+    ):
+        self.words = list(words)
+        self.casefold = casefold
+        self.lemmatize = lemmatize
+
+        # Normalized token sequence -> index of its first word in the list
+        single: Dict[str, int] = {}
+        phrases: Dict[Tuple[str, ...], int] = {}
+        for index, word in enumerate(self.words):
+            key = tuple(self._normalize(token) for token in TOKEN_PATTERN.findall(word))
+            if len(key) == 1:
+                single.setdefault(key[0], index)
+            elif key:
+                phrases.setdefault(key, index)
+        self._single = single
+        self._phrases = phrases
+        self.vocabulary = frozenset(single)
+        self._phrase_lengths = sorted({len(key) for key in phrases})
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def _normalize(self, token: str) -> str:
+        if self.casefold:
+            token = token.casefold()
+        if self.lemmatize is not None:
+            token = self.lemmatize(token)
+        return token
+
+    def _tokens(self, text: str) -> List[str]:
+        tokens = TOKEN_PATTERN.findall(text)
+        if self.casefold or self.lemmatize is not None:
+            tokens = [self._normalize(token) for token in tokens]
+        return tokens
+
+    def first_match(self, text: str) -> Optional[str]:
+        """
+        Returns the first word, in word-list order, found in the text.
+        """
+
+        tokens = self._tokens(text)
+        hits = self.vocabulary.intersection(tokens)
+        found = min((self._single[token] for token in hits), default=len(self.words))
+        for length in self._phrase_lengths:
+            for start in range(len(tokens) - length + 1):
+                end = start + length
+                index = self._phrases.get(tuple(tokens[start:end]))
+                if index is not None and index < found:
+                    found = index
+
+        return self.words[found] if found < len(self.words) else None
+
+    def leftmost_match(self, text: str) -> Optional[str]:
+        """
+        Returns the word that starts earliest in the text.
+        """
+
+        found = min(self.iter_matches(text), default=None)
+        return self.words[found[1]] if found is not None else None
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Yields ``(start_offset, word_index)`` for every occurrence of every
+        word in the text, ordered by offset.
+        """
+
+        spans = [match.span() for match in TOKEN_PATTERN.finditer(text)]
+        tokens = [self._normalize(text[start:end]) for start, end in spans]
+        for position, token in enumerate(tokens):
+            start = spans[position][0]
+            index = self._single.get(token)
+            if index is not None:
+                yield start, index
+            for length in self._phrase_lengths:
+                end = position + length
+                key = tuple(tokens[position:end])
+                index = self._phrases.get(key)
+                if index is not None:
+                    yield start, index
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_words(path: str) -> List[str]:
+    with open(path, "r") as file:
+        return [line.strip() for line in file]
+
+
+def _write_artifact(artifact_path: str, artifact: dict) -> None:
+    directory = os.path.dirname(os.path.abspath(artifact_path))
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    except OSError:
+        # Read-only location: the matcher is still usable, just not saved
+        return
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(marshal.dumps(artifact))
+        os.replace(tmp_path, artifact_path)
+    except OSError:
+        os.remove(tmp_path)
+
+
+def load_matcher(
+    words_file_path: str, artifact_path: Optional[str] = None
+) -> AhoCorasick:
+    """
+    Returns the compiled matcher for a word list file.
+
+    The compiled matcher is saved next to the word list (``<words>.matcher``)
+    and reused by later calls. It is recompiled only when the word list has
+    changed: a matching mtime and size is trusted as is, otherwise the content
+    hash decides.
+
+    The file holds plain data written with ``marshal``, never pickle, so
+    whoever can write next to the word list cannot run code in the jobs that
+    load it: ``marshal`` only builds containers, strings and numbers here,
+    and the automaton is checked before use. It loads several times faster
+    than JSON, and keeps tuples. A file that does not describe a valid
+    automaton, or was written by another Python version, is rebuilt.
+
+    Args:
+        words_file_path (str): The path to the words file, one word per line.
+        artifact_path (str): Where to keep the compiled matcher.
+
+    Returns:
+        AhoCorasick: The matcher for the words in the file.
+    """
+
+    artifact_path = artifact_path or words_file_path + ARTIFACT_SUFFIX
+    stat = os.stat(words_file_path)
+    stamp = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    artifact = matcher = None
+    try:
+        with open(artifact_path, "rb") as file:
+            # marshal.load reads a file in small pieces; loads is much faster
+            artifact = marshal.loads(file.read())
+        if artifact["version"] != ARTIFACT_VERSION:
+            raise ValueError("old artifact")
+        matcher = AhoCorasick.from_state(artifact["matcher"])
+    except (OSError, EOFError, ValueError, KeyError, TypeError):
+        # Missing, damaged, older or foreign (e.g. pickle) files are rebuilt
+        artifact = matcher = None
+
+    if artifact is not None and artifact.get("stamp") == stamp:
+        return matcher
+
+    digest = _file_sha256(words_file_path)
+    if artifact is None or artifact.get("sha256") != digest:
+        matcher = AhoCorasick(_read_words(words_file_path))
+    # else touched but unchanged: only refresh the stamp
+
+    _write_artifact(
+        artifact_path,
+        {
+            "version": ARTIFACT_VERSION,
+            "stamp": stamp,
+            "sha256": digest,
+            "matcher": matcher.to_state(),
+        },
+    )
+    return matcher
@@ -0,0 +1,130 @@
+"""
+Cold-start benchmark for the Lambda handler.
+
+Each run starts a fresh interpreter, as Lambda does for a new execution
+environment, then measures:
+
+- import: ``import main`` plus looking up ``main.handler``, i.e. what the
+  Lambda runtime does during its Init phase;
+- first: the first invocation through Mangum with a synthetic API Gateway
+  event;
+- second: the next, warm, invocation.
+
+``--no-bytecode-cache`` makes every run compile its imports from source, as
+on Lambda when the package was built without ``.pyc`` files: ``/var/task`` is
+read-only, so they are never cached.
+
+Usage:
+    python bench_cold_start.py --runs 10
+    ROLE_SERVICE_ENV=production python bench_cold_start.py --path /role_configuration
+"""
+
+from typing import Dict, List
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Runs in the fresh interpreter; prints its timings as JSON
+CHILD = """
+import json, sys, time
+
+start = time.perf_counter()
+import main
+
+handler = main.handler
+imported = time.perf_counter()
+first = handler(json.loads(sys.argv[1]), None)
+answered = time.perf_counter()
+handler(json.loads(sys.argv[1]), None)
+second = time.perf_counter()
+assert first["statusCode"] == 200, first
+print(json.dumps({
+    "import": imported - start,
+    "first": answered - imported,
+    "second": second - answered,
+}))
+"""
+
+
+def api_gateway_event(path: str) -> dict:
+    # REST API (payload format 1.0) proxy event, as API Gateway sends it
+    return {
+        "resource": "/{proxy+}",
+        "path": path,
+        "httpMethod": "GET",
+        "headers": {"Accept": "application/json", "Host": "example.com"},
+        "multiValueHeaders": {
+            "Accept": ["application/json"],
+            "Host": ["example.com"],
+        },
+        "queryStringParameters": None,
+        "multiValueQueryStringParameters": None,
+        "pathParameters": {"proxy": path.lstrip("/")},
+        "stageVariables": None,
+        "requestContext": {
+            "resourcePath": "/{proxy+}",
+            "httpMethod": "GET",
+            "path": f"/prod{path}",
+            "stage": "prod",
+            "requestId": "c6af9ac6-7b61-11e6-9a41-93e8deadbeef",
+            "identity": {"sourceIp": "127.0.0.1", "userAgent": "bench"},
+        },
+        "body": None,
+        "isBase64Encoded": False,
+    }
+
+
+def run_once(path: str, bytecode_cache: bool = True) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(os.environ)
+        if not bytecode_cache:
+            # An empty cache of its own, instead of the __pycache__ directories
+            env["PYTHONPYCACHEPREFIX"] = cache_dir
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD, json.dumps(api_gateway_event(path))],
+            cwd=HERE,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    timings = json.loads(result.stdout)
+    # Interpreter start-up included
+    timings["process"] = time.perf_counter() - started
+    return timings
+
+
+def summarize(runs: List[Dict[str, float]]) -> str:
+    return "  ".join(
+        f"{name} {statistics.median(run[name] for run in runs) * 1000:.1f}ms"
+        for name in ("import", "first", "second", "process")
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--path", default="/", help="Path of the synthetic request")
+    parser.add_argument("--no-bytecode-cache", action="store_true")
+    args = parser.parse_args()
+
+    runs = [
+        run_once(args.path, bytecode_cache=not args.no_bytecode_cache)
+        for _ in range(args.runs)
+    ]
+    mode = os.environ.get("ROLE_SERVICE_ENV", "development")
+    if args.no_bytecode_cache:
+        mode += ", no bytecode cache"
+    print(f"{mode}, median of {args.runs} runs: {summarize(runs)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,67 +1,380 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from mangum import Mangum
-from typing import Dict
+from base64 import b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from typing import Any, AsyncIterator, Dict, List, Optional
+import json
+import os
 
-app = FastAPI(title="Role Configuration Service")
-# Mangum handler will be used by Lambda
-handler = Mangum(app)
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from models import BulkResponse, BulkResult, RoleConfig, RoleConfigList
+from storage import create_store
+
+MAX_PAGE_SIZE = 1000
+# Configs fetched per store query while streaming NDJSON
+STREAM_BATCH_SIZE = 500
+MAX_BULK_ITEMS = 1000
+# Bulk bodies are refused past this size, before anything is parsed
+MAX_BULK_BYTES = MAX_BULK_ITEMS * 1024
+# ROLE_SERVICE_ENV=production turns off /docs, /redoc and /openapi.json
+PRODUCTION = os.environ.get("ROLE_SERVICE_ENV", "development") == "production"
+
+# Routes are declared on a router; create_app mounts them on an app
+router = APIRouter()
 
 
 # 🌟 New welcome endpoint
-@app.get("/", summary="Welcome")
+@router.get("/", summary="Welcome")
 async def welcome():
     return {"message": "Welcome to the Role Configuration Service!"}
 
 
-# In-memory “database”
-DB: Dict[str, "RoleConfig"] = {}
+# In-memory by default; set ROLE_STORE=sqlite or dynamodb to persist
+store = create_store()
+
+
+def encode_cursor(role_id: str) -> str:
+    # Opaque to clients: the last roleId of the page they were sent
+    return urlsafe_b64encode(role_id.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        return b64decode(cursor, altchars=b"-_", validate=True).decode()
+    except (Base64Error, UnicodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def iter_ndjson(
+    filters: Dict[str, str], after: Optional[str], limit: Optional[int]
+) -> AsyncIterator[str]:
+    # One store query per batch, so memory does not grow with the table
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = (
+            STREAM_BATCH_SIZE
+            if remaining is None
+            else min(remaining, STREAM_BATCH_SIZE)
+        )
+        batch = await store.query(filters, after, size)
+        if batch:
+            yield "".join(config.model_dump_json() + "\n" for config in batch)
+        if len(batch) < size:
+            return
+        after = batch[-1].roleId
+        if remaining is not None:
+            remaining -= len(batch)
+
+
+async def list_response(
+    filters: Dict[str, str],
+    limit: Optional[int],
+    cursor: Optional[str],
+    output: str,
+) -> Response:
+    """
+    Configs matching ``filters`` in the key order of the store (roleId order
+    except for DynamoDB, see ``DynamoDBStore.query``), in the response shape
+    every list endpoint shares.
+
+    With ``limit``, one page is returned and the ``X-Next-Cursor`` header, if
+    present, is the ``cursor`` of the next page. Without it every match is
+    returned, as before. ``format=ndjson`` streams one config per line.
+    """
+
+    after = None if cursor is None else decode_cursor(cursor)
+    if output == "ndjson":
+        return StreamingResponse(
+            iter_ndjson(filters, after, limit), media_type="application/x-ndjson"
+        )
 
+    # One extra config tells whether there is a next page
+    page = await store.query(filters, after, None if limit is None else limit + 1)
+    headers = {}
+    if limit is not None and len(page) > limit:
+        page = page[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(page[-1].roleId)
+    return Response(
+        RoleConfigList.dump_json(page), media_type="application/json", headers=headers
+    )
 
-class RoleConfig(BaseModel):
-    roleId: str
-    role: str
-    accountId: str
-    environment: str
 
+def filters_of(**values: Optional[str]) -> Dict[str, str]:
+    return {field: value for field, value in values.items() if value is not None}
 
-@app.get("/role_configuration", response_model=list[RoleConfig])
-async def list_role_configurations():
-    return list(DB.values())
 
+LIMIT = Query(None, ge=1, le=MAX_PAGE_SIZE)
+FORMAT = Query("json", alias="format", pattern="^(json|ndjson)$")
 
-@app.get("/role_configuration/{role_id}", response_model=RoleConfig)
+
+@router.get("/role_configuration", response_model=list[RoleConfig])
+async def list_role_configurations(
+    accountId: Optional[str] = None,
+    environment: Optional[str] = None,
+    role: Optional[str] = None,
+    limit: Optional[int] = LIMIT,
+    cursor: Optional[str] = None,
+    output: str = FORMAT,
+):
+    # Optionally filtered on accountId, environment and role
+    filters = filters_of(accountId=accountId, environment=environment, role=role)
+    return await list_response(filters, limit, cursor, output)
+
+
+@router.get("/accounts/{accountId}/role_configuration", response_model=list[RoleConfig])
+async def list_account_role_configurations(
+    accountId: str,
+    role: Optional[str] = None,
+    limit: Optional[int] = LIMIT,
+    cursor: Optional[str] = None,
+    output: str = FORMAT,
+):
+    filters = filters_of(accountId=accountId, role=role)
+    return await list_response(filters, limit, cursor, output)
+
+
+@router.get(
+    "/accounts/{accountId}/environments/{environment}/role_configuration",
+    response_model=list[RoleConfig],
+)
+async def list_account_environment_role_configurations(
+    accountId: str,
+    environment: str,
+    role: Optional[str] = None,
+    limit: Optional[int] = LIMIT,
+    cursor: Optional[str] = None,
+    output: str = FORMAT,
+):
+    filters = filters_of(accountId=accountId, environment=environment, role=role)
+    return await list_response(filters, limit, cursor, output)
+
+
+def too_many_items() -> HTTPException:
+    return HTTPException(
+        status_code=400, detail=f"At most {MAX_BULK_ITEMS} items per request"
+    )
+
+
+async def read_bulk_body(request: Request) -> bytes:
+    # Refused from Content-Length when it is sent, else while it is read
+    too_large = HTTPException(
+        status_code=413, detail=f"At most {MAX_BULK_BYTES} bytes per request"
+    )
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > MAX_BULK_BYTES:
+        raise too_large
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > MAX_BULK_BYTES:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def parse_json_array(body: bytes) -> Any:
+    # Items are counted before any of them is validated
+    try:
+        items = json.loads(body)
+    except ValueError:
+        raise HTTPException(
+            status_code=422,
+            detail=[{"loc": ["body"], "msg": "Invalid JSON", "type": "json_invalid"}],
+        )
+    if isinstance(items, list) and len(items) > MAX_BULK_ITEMS:
+        raise too_many_items()
+    return items
+
+
+def parse_ndjson(body: bytes) -> List[Any]:
+    # One JSON document per non-blank line, counted before any is parsed
+    lines = [line for line in body.splitlines() if line.strip()]
+    if len(lines) > MAX_BULK_ITEMS:
+        raise too_many_items()
+    items = []
+    for index, line in enumerate(lines):
+        try:
+            items.append(json.loads(line))
+        except ValueError:
+            raise HTTPException(
+                status_code=422,
+                detail=[
+                    {
+                        "loc": ["body", index],
+                        "msg": "Invalid JSON",
+                        "type": "json_invalid",
+                    }
+                ],
+            )
+    return items
+
+
+def validation_detail(error: ValidationError) -> List[dict]:
+    # Shaped like FastAPI's own 422s; loc is ["body", item index, field]
+    return [
+        {"loc": ["body", *item["loc"]], "msg": item["msg"], "type": item["type"]}
+        for item in error.errors(include_url=False)
+    ]
+
+
+def duplicate_detail(configs: List[RoleConfig]) -> List[dict]:
+    # Every repeat of a roleId already seen earlier in the batch
+    seen = set()
+    detail = []
+    for index, config in enumerate(configs):
+        if config.roleId in seen:
+            detail.append(
+                {
+                    "loc": ["body", index, "roleId"],
+                    "msg": "Duplicate roleId in the batch",
+                    "type": "duplicate",
+                }
+            )
+        seen.add(config.roleId)
+    return detail
+
+
+BULK_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {
+                    "type": "array",
+                    "items": {"$ref": "#/components/schemas/RoleConfig"},
+                }
+            },
+            "application/x-ndjson": {"schema": {"type": "string"}},
+        },
+    }
+}
+
+
+@router.post(
+    "/bulk/role_configuration", response_model=BulkResponse, openapi_extra=BULK_BODY
+)
+async def bulk_upsert_role_configurations(request: Request):
+    """
+    Creates or replaces up to ``MAX_BULK_ITEMS`` configs in one request, sent
+    as a JSON array or, with ``Content-Type: application/x-ndjson``, one
+    config per line.
+
+    Bodies over ``MAX_BULK_BYTES`` get a 413 and batches over
+    ``MAX_BULK_ITEMS`` a 400, both before any item is validated. Items are
+    then validated together in one ``TypeAdapter`` pass: if any is invalid,
+    or repeats a ``roleId`` of the batch, the 422 lists the errors of every
+    item by index and nothing is stored. Otherwise the batch is applied at
+    once (in one transaction with the memory and sqlite stores) and the
+    result of each item is returned.
+    """
+
+    body = await read_bulk_body(request)
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type == "application/x-ndjson":
+        items = parse_ndjson(body)
+    else:
+        items = parse_json_array(body)
+    try:
+        configs = RoleConfigList.validate_python(items)
+    except ValidationError as error:
+        raise HTTPException(status_code=422, detail=validation_detail(error))
+    duplicates = duplicate_detail(configs)
+    if duplicates:
+        raise HTTPException(status_code=422, detail=duplicates)
+
+    created = await store.upsert_many(configs)
+    return BulkResponse(
+        created=sum(created),
+        updated=len(created) - sum(created),
+        results=[
+            BulkResult(roleId=config.roleId, status="created" if new else "updated")
+            for config, new in zip(configs, created)
+        ],
+    )
+
+
+@router.get("/role_configuration/{role_id}", response_model=RoleConfig)
 async def get_role_configuration(role_id: str):
-    cfg = DB.get(role_id)
+    cfg = await store.get(role_id)
     if not cfg:
         raise HTTPException(status_code=404, detail="Role configuration not found")
     return cfg
 
 
-@app.post(
+@router.post(
     "/role_configuration/{role_id}",
     status_code=201,
     response_model=RoleConfig,
 )
 async def create_role_configuration(role_id: str, config: RoleConfig):
-    if role_id in DB:
-        raise HTTPException(status_code=400, detail="Role configuration already exists")
     if config.roleId != role_id:
+        if await store.get(role_id):
+            raise HTTPException(
+                status_code=400, detail="Role configuration already exists"
+            )
         raise HTTPException(
             status_code=400, detail="Path role_id must match body.roleId"
         )
-    DB[role_id] = config
+    if not await store.create(config):
+        raise HTTPException(status_code=400, detail="Role configuration already exists")
     return config
 
 
-@app.patch("/role_configuration/{role_id}", response_model=RoleConfig)
+@router.patch("/role_configuration/{role_id}", response_model=RoleConfig)
 async def update_role_configuration(role_id: str, patch: RoleConfig):
-    existing = DB.get(role_id)
-    if not existing:
-        raise HTTPException(status_code=404, detail="Role configuration not found")
     if patch.roleId != role_id:
+        if not await store.get(role_id):
+            raise HTTPException(status_code=404, detail="Role configuration not found")
         raise HTTPException(
             status_code=400, detail="Path role_id must match body.roleId"
         )
-    DB[role_id] = patch
+    if not await store.update(patch):
+        raise HTTPException(status_code=404, detail="Role configuration not found")
     return patch
+
+
+def create_app(production: bool = PRODUCTION) -> FastAPI:
+    """
+    Builds the app, without the docs routes in production.
+
+    Everything FastAPI and pydantic would otherwise build on the first
+    request is built here: the middleware stack, the OpenAPI schema when it
+    is served, and the RoleConfig validators and serializers. On Lambda this
+    happens during Init, before the first invocation is timed.
+    """
+
+    docs = {}
+    if production:
+        docs = {"docs_url": None, "redoc_url": None, "openapi_url": None}
+    app = FastAPI(title="Role Configuration Service", **docs)
+    app.include_router(router)
+
+    app.middleware_stack = app.build_middleware_stack()
+    if app.openapi_url:
+        app.openapi()
+    sample = RoleConfig.model_validate_json(
+        '{"roleId": "r", "role": "r", "accountId": "a", "environment": "e"}'
+    )
+    RoleConfigList.dump_json([sample])
+    sample.model_dump_json()
+    return app
+
+
+def __getattr__(name: str):
+    # app and handler are built on first lookup, by uvicorn (main:app) or by
+    # the Lambda runtime (main.handler), so importing main for its routes or
+    # create_app builds nothing and Mangum is only imported on Lambda
+    module = globals()
+    if name == "app":
+        module["app"] = create_app()
+        return module["app"]
+    if name == "handler":
+        from mangum import Mangum
+
+        app = module["app"] if "app" in module else __getattr__("app")
+        # The app has no startup or shutdown events: skip the lifespan
+        # protocol Mangum would otherwise run on every invocation
+        module["handler"] = Mangum(app, lifespan="off")
+        return module["handler"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,26 @@
+from typing import Literal
+
+from pydantic import BaseModel, TypeAdapter
+
+
+class RoleConfig(BaseModel):
+    roleId: str
+    role: str
+    accountId: str
+    environment: str
+
+
+# Serializes a whole page in one pydantic-core call
+RoleConfigList = TypeAdapter(list[RoleConfig])
+
+
+class BulkResult(BaseModel):
+    roleId: str
+    status: Literal["created", "updated"]
+
+
+class BulkResponse(BaseModel):
+    created: int
+    updated: int
+    # One per item, in request order
+    results: list[BulkResult]
@@ -0,0 +1,587 @@
+"""
+Storage backends for the Role Configuration Service.
+
+All backends share the async ``RoleConfigStore`` interface:
+
+- ``InMemoryStore``: a dict, the default; data lives as long as the process.
+- ``SQLiteStore``: a SQLite file in WAL mode behind a small connection pool.
+- ``DynamoDBStore``: a DynamoDB table keyed by ``roleId``, or any object with
+  the same ``get_item`` / ``put_item`` / ``scan`` methods such as
+  ``LocalTable``.
+
+``create_store`` picks one from the environment:
+
+    ROLE_STORE=memory|sqlite|dynamodb
+    ROLE_STORE_PATH=role_configuration.db       # sqlite
+    ROLE_STORE_TABLE=role_configuration         # dynamodb
+    DYNAMODB_ENDPOINT_URL=http://localhost:8000 # e.g. DynamoDB Local
+"""
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+from operator import attrgetter
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+
+from models import RoleConfig
+
+KEY = "roleId"
+# Secondary indexes of InMemoryStore, each keyed on a tuple of fields
+INDEXES = (("accountId",), ("environment",), ("role",), ("accountId", "environment"))
+
+
+class RoleConfigStore(ABC):
+    @abstractmethod
+    async def get(self, role_id: str) -> Optional[RoleConfig]: ...
+
+    @abstractmethod
+    async def list(self) -> List[RoleConfig]: ...
+
+    async def query(
+        self,
+        filters: Dict[str, str],
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[RoleConfig]:
+        """
+        Returns up to ``limit`` configs whose fields equal ``filters``,
+        starting after the ``after`` roleId. Configs come in the key order of
+        the backend: ``roleId`` order except for DynamoDB.
+
+        This fallback lists everything for every page; every backend here
+        overrides it.
+        """
+
+        configs = sorted(
+            (
+                config
+                for config in await self.list()
+                if _matches(config, filters)
+                and (after is None or config.roleId > after)
+            ),
+            key=lambda config: config.roleId,
+        )
+        return configs if limit is None else configs[:limit]
+
+    @abstractmethod
+    async def create(self, config: RoleConfig) -> bool:
+        """Stores a new config; False if its roleId is already taken."""
+
+    @abstractmethod
+    async def update(self, config: RoleConfig) -> bool:
+        """Replaces an existing config; False if there is none."""
+
+    async def upsert_many(self, configs: List[RoleConfig]) -> List[bool]:
+        """
+        Creates or replaces every config, in order; True for each one that
+        was created.
+
+        This fallback writes them one by one; backends that can override it
+        to apply the batch in one transaction.
+        """
+
+        created = []
+        for config in configs:
+            new = await self.create(config)
+            if not new:
+                await self.update(config)
+            created.append(new)
+        return created
+
+    async def close(self) -> None:
+        pass
+
+
+def _matches(config: RoleConfig, filters: Dict[str, str]) -> bool:
+    return all(getattr(config, field) == value for field, value in filters.items())
+
+
+class SortedIndex:
+    # Secondary index: values of ``fields`` -> sorted roleIds of the configs
+
+    def __init__(self, fields: Tuple[str, ...]):
+        self.fields = fields
+        self.key = attrgetter(*fields) if len(fields) > 1 else _single(fields[0])
+        self.ids: Dict[Tuple[str, ...], List[str]] = {}
+
+    def add(self, config: RoleConfig) -> None:
+        insort(self.ids.setdefault(self.key(config), []), config.roleId)
+
+    def remove(self, config: RoleConfig) -> None:
+        key = self.key(config)
+        ids = self.ids[key]
+        del ids[bisect_left(ids, config.roleId)]
+        if not ids:
+            del self.ids[key]
+
+    def lookup(self, filters: Dict[str, str]) -> List[str]:
+        return self.ids.get(tuple(filters[field] for field in self.fields), [])
+
+
+def _single(field: str) -> Callable[[RoleConfig], Tuple[str]]:
+    return lambda config: (getattr(config, field),)
+
+
+class InMemoryStore(RoleConfigStore):
+    """
+    Dict of configs plus a sorted list of all roleIds and the ``INDEXES``, so
+    a filtered page walks the shortest matching id list from the cursor on
+    instead of scanning every config. Filtering on accountId, or on accountId
+    and environment, reads an index holding exactly the matches: the cost
+    depends on the result, not on the number of configs.
+
+    Writes update the dict and every index under one lock, and reads take
+    it too, so no reader sees a config missing from an index it matches,
+    even when the store is shared with worker threads.
+    """
+
+    def __init__(self):
+        self.data: Dict[str, RoleConfig] = {}
+        self._ids: List[str] = []
+        self.indexes = [SortedIndex(fields) for fields in INDEXES]
+        self._lock = threading.Lock()
+
+    async def get(self, role_id: str) -> Optional[RoleConfig]:
+        return self.data.get(role_id)
+
+    async def list(self) -> List[RoleConfig]:
+        return list(self.data.values())
+
+    async def query(
+        self,
+        filters: Dict[str, str],
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[RoleConfig]:
+        with self._lock:
+            candidates = [
+                index.lookup(filters)
+                for index in self.indexes
+                if filters.keys() >= set(index.fields)
+            ]
+            ids = min(candidates, key=len) if candidates else self._ids
+            start = 0 if after is None else bisect_right(ids, after)
+            page: List[RoleConfig] = []
+            for role_id in islice(ids, start, None):
+                if limit is not None and len(page) == limit:
+                    break
+                config = self.data[role_id]
+                if _matches(config, filters):
+                    page.append(config)
+            return page
+
+    def _put(self, config: RoleConfig) -> bool:
+        # Stores config and updates the indexes; the caller holds the lock
+        old = self.data.get(config.roleId)
+        self.data[config.roleId] = config
+        if old is None:
+            insort(self._ids, config.roleId)
+            for index in self.indexes:
+                index.add(config)
+            return True
+        for index in self.indexes:
+            if index.key(old) != index.key(config):
+                index.remove(old)
+                index.add(config)
+        return False
+
+    async def create(self, config: RoleConfig) -> bool:
+        with self._lock:
+            return config.roleId not in self.data and self._put(config)
+
+    async def update(self, config: RoleConfig) -> bool:
+        with self._lock:
+            return config.roleId in self.data and not self._put(config)
+
+    async def upsert_many(self, configs: List[RoleConfig]) -> List[bool]:
+        # Nothing can fail midway, so holding the lock makes the batch atomic
+        with self._lock:
+            return [self._put(config) for config in configs]
+
+
+# Constant SQL strings, so each pooled connection compiles them once and
+# reuses the prepared statements from its statement cache
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS role_configuration (
+    role_id TEXT PRIMARY KEY,
+    role TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    environment TEXT NOT NULL
+)
+"""
+CREATE_INDEXES_SQL = (
+    "CREATE INDEX IF NOT EXISTS role_configuration_account"
+    " ON role_configuration (account_id, role_id)",
+    "CREATE INDEX IF NOT EXISTS role_configuration_account_environment"
+    " ON role_configuration (account_id, environment, role_id)",
+    "CREATE INDEX IF NOT EXISTS role_configuration_environment"
+    " ON role_configuration (environment, role_id)",
+    "CREATE INDEX IF NOT EXISTS role_configuration_role"
+    " ON role_configuration (role, role_id)",
+)
+COLUMNS = "role_id, role, account_id, environment"
+COLUMN_OF = {"accountId": "account_id", "environment": "environment", "role": "role"}
+GET_SQL = f"SELECT {COLUMNS} FROM role_configuration WHERE role_id = ?"
+LIST_SQL = f"SELECT {COLUMNS} FROM role_configuration ORDER BY role_id"
+INSERT_SQL = (
+    f"INSERT INTO role_configuration ({COLUMNS}) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(role_id) DO NOTHING"
+)
+UPDATE_SQL = (
+    "UPDATE role_configuration SET role = ?, account_id = ?, environment = ? "
+    "WHERE role_id = ?"
+)
+
+
+def _row_to_config(row) -> RoleConfig:
+    # Rows were validated on the way in
+    role_id, role, account_id, environment = row
+    return RoleConfig.model_construct(
+        roleId=role_id, role=role, accountId=account_id, environment=environment
+    )
+
+
+class SQLiteStore(RoleConfigStore):
+    """
+    SQLite backend shared by every process that opens the same file.
+
+    WAL mode lets readers run while a write is in progress. Queries run in
+    worker threads, each on a connection taken from a pool of ``pool_size``,
+    so the event loop never waits on the disk.
+    """
+
+    def __init__(self, path: str = "role_configuration.db", pool_size: int = 4):
+        self.path = path
+        self._pool: "queue.SimpleQueue[sqlite3.Connection]" = queue.SimpleQueue()
+        first = self._connect()
+        first.execute(CREATE_TABLE_SQL)
+        for sql in CREATE_INDEXES_SQL:
+            first.execute(sql)
+        self._pool.put(first)
+        for _ in range(pool_size - 1):
+            self._pool.put(self._connect())
+        self._size = pool_size
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit: every statement is its own transaction
+        connection = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA busy_timeout=5000")
+        return connection
+
+    def _with_connection(self, func: Callable, *args):
+        connection = self._pool.get()
+        try:
+            return func(connection, *args)
+        finally:
+            self._pool.put(connection)
+
+    async def _run(self, func: Callable, *args):
+        return await asyncio.to_thread(self._with_connection, func, *args)
+
+    @staticmethod
+    def _get(connection: sqlite3.Connection, role_id: str) -> Optional[RoleConfig]:
+        row = connection.execute(GET_SQL, (role_id,)).fetchone()
+        return None if row is None else _row_to_config(row)
+
+    @staticmethod
+    def _list(connection: sqlite3.Connection) -> List[RoleConfig]:
+        return [_row_to_config(row) for row in connection.execute(LIST_SQL)]
+
+    @staticmethod
+    def _query(
+        connection: sqlite3.Connection,
+        filters: Dict[str, str],
+        after: Optional[str],
+        limit: Optional[int],
+    ) -> List[RoleConfig]:
+        # Filters in a fixed order, so each combination is one cached statement
+        clauses = [f"{COLUMN_OF[field]} = ?" for field in sorted(filters)]
+        values: list = [filters[field] for field in sorted(filters)]
+        if after is not None:
+            clauses.append("role_id > ?")
+            values.append(after)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (
+            f"SELECT {COLUMNS} FROM role_configuration{where}"
+            " ORDER BY role_id LIMIT ?"
+        )
+        values.append(-1 if limit is None else limit)
+        return [_row_to_config(row) for row in connection.execute(sql, values)]
+
+    @staticmethod
+    def _insert(connection: sqlite3.Connection, config: RoleConfig) -> bool:
+        values = (config.roleId, config.role, config.accountId, config.environment)
+        return connection.execute(INSERT_SQL, values).rowcount == 1
+
+    @staticmethod
+    def _update(connection: sqlite3.Connection, config: RoleConfig) -> bool:
+        values = (config.role, config.accountId, config.environment, config.roleId)
+        return connection.execute(UPDATE_SQL, values).rowcount == 1
+
+    @staticmethod
+    def _upsert_many(
+        connection: sqlite3.Connection, configs: List[RoleConfig]
+    ) -> List[bool]:
+        # One write transaction: every config is stored, or none on error
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            created = []
+            for config in configs:
+                new = SQLiteStore._insert(connection, config)
+                if not new:
+                    SQLiteStore._update(connection, config)
+                created.append(new)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return created
+
+    async def get(self, role_id: str) -> Optional[RoleConfig]:
+        return await self._run(self._get, role_id)
+
+    async def list(self) -> List[RoleConfig]:
+        return await self._run(self._list)
+
+    async def query(
+        self,
+        filters: Dict[str, str],
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[RoleConfig]:
+        return await self._run(self._query, filters, after, limit)
+
+    async def create(self, config: RoleConfig) -> bool:
+        return await self._run(self._insert, config)
+
+    async def upsert_many(self, configs: List[RoleConfig]) -> List[bool]:
+        return await self._run(self._upsert_many, configs)
+
+    async def update(self, config: RoleConfig) -> bool:
+        return await self._run(self._update, config)
+
+    async def close(self) -> None:
+        for _ in range(self._size):
+            self._pool.get().close()
+        self._size = 0
+
+
+class ConditionalCheckFailed(Exception):
+    # Shaped like botocore's ClientError for a failed condition
+    def __init__(self):
+        super().__init__("The conditional request failed")
+        self.response = {"Error": {"Code": "ConditionalCheckFailedException"}}
+
+
+class LocalTable:
+    """
+    In-process stand-in for a boto3 DynamoDB ``Table`` keyed by ``roleId``.
+
+    Supports what ``DynamoDBStore`` uses: ``get_item``, ``put_item`` with an
+    ``attribute_exists`` / ``attribute_not_exists`` condition on the key, and
+    paginated ``scan``.
+    """
+
+    def __init__(self, page_size: int = 100):
+        self.items: Dict[str, dict] = {}
+        self.page_size = page_size
+
+    def get_item(self, Key: dict) -> dict:
+        item = self.items.get(Key[KEY])
+        return {} if item is None else {"Item": dict(item)}
+
+    def put_item(self, Item: dict, ConditionExpression: Optional[str] = None) -> dict:
+        exists = Item[KEY] in self.items
+        if ConditionExpression == f"attribute_not_exists({KEY})" and exists:
+            raise ConditionalCheckFailed()
+        if ConditionExpression == f"attribute_exists({KEY})" and not exists:
+            raise ConditionalCheckFailed()
+        self.items[Item[KEY]] = dict(Item)
+        return {}
+
+    def scan(
+        self,
+        ExclusiveStartKey: Optional[dict] = None,
+        Limit: Optional[int] = None,
+        FilterExpression: Optional[str] = None,
+        ExpressionAttributeNames: Optional[dict] = None,
+        ExpressionAttributeValues: Optional[dict] = None,
+    ) -> dict:
+        # Like DynamoDB, Limit caps the items read, before the filter applies
+        keys = sorted(self.items)
+        if ExclusiveStartKey is not None:
+            start = bisect_right(keys, ExclusiveStartKey[KEY])
+            keys = keys[start:]
+        size = self.page_size if Limit is None else min(Limit, self.page_size)
+        page = keys[:size]
+        conditions = _equality_conditions(
+            FilterExpression, ExpressionAttributeNames, ExpressionAttributeValues
+        )
+        response = {
+            "Items": [
+                dict(self.items[key])
+                for key in page
+                if all(self.items[key].get(name) == value for name, value in conditions)
+            ]
+        }
+        if len(keys) > size:
+            response["LastEvaluatedKey"] = {KEY: page[-1]}
+        return response
+
+
+def _equality_conditions(
+    expression: Optional[str], names: Optional[dict], values: Optional[dict]
+) -> List[Tuple[str, str]]:
+    # LocalTable only understands "#name = :value AND ...", as built by
+    # DynamoDBStore.query
+    if not expression:
+        return []
+    conditions = []
+    for condition in expression.split(" AND "):
+        name, value = (part.strip() for part in condition.split("="))
+        conditions.append((names[name], values[value]))
+    return conditions
+
+
+def _is_conditional_failure(error: Exception) -> bool:
+    response = getattr(error, "response", None) or {}
+    return response.get("Error", {}).get("Code") == "ConditionalCheckFailedException"
+
+
+class DynamoDBStore(RoleConfigStore):
+    """
+    DynamoDB backend on the ``role_configuration`` table, partition key
+    ``roleId``.
+
+    Creates and updates are conditional puts, so concurrent instances cannot
+    overwrite each other's new roles. ``upsert_many`` is not transactional:
+    TransactWriteItems is capped at 100 items per call. boto3 is blocking, so
+    every call runs in a worker thread. Pass ``table`` to use a ``LocalTable``
+    or a table of DynamoDB Local.
+    """
+
+    def __init__(
+        self,
+        table=None,
+        table_name: str = "role_configuration",
+        endpoint_url: Optional[str] = None,
+    ):
+        if table is None:
+            import boto3
+
+            table = boto3.resource("dynamodb", endpoint_url=endpoint_url).Table(
+                table_name
+            )
+        self.table = table
+
+    def _get(self, role_id: str) -> Optional[RoleConfig]:
+        item = self.table.get_item(Key={KEY: role_id}).get("Item")
+        return None if item is None else RoleConfig.model_construct(**item)
+
+    def _list(self) -> List[RoleConfig]:
+        configs = []
+        kwargs: dict = {}
+        while True:
+            response = self.table.scan(**kwargs)
+            configs.extend(
+                RoleConfig.model_construct(**item) for item in response["Items"]
+            )
+            if "LastEvaluatedKey" not in response:
+                return configs
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def _put(self, config: RoleConfig, condition: str) -> bool:
+        try:
+            self.table.put_item(Item=config.model_dump(), ConditionExpression=condition)
+        except Exception as error:
+            if _is_conditional_failure(error):
+                return False
+            raise
+        return True
+
+    def _query(
+        self, filters: Dict[str, str], after: Optional[str], limit: Optional[int]
+    ) -> List[RoleConfig]:
+        kwargs: dict = {}
+        if filters:
+            fields = sorted(filters)
+            kwargs["FilterExpression"] = " AND ".join(
+                f"#f{number} = :v{number}" for number in range(len(fields))
+            )
+            kwargs["ExpressionAttributeNames"] = {
+                f"#f{number}": field for number, field in enumerate(fields)
+            }
+            kwargs["ExpressionAttributeValues"] = {
+                f":v{number}": filters[field] for number, field in enumerate(fields)
+            }
+        if after is not None:
+            kwargs["ExclusiveStartKey"] = {KEY: after}
+
+        configs: List[RoleConfig] = []
+        while limit is None or len(configs) < limit:
+            if limit is not None and not filters:
+                # Without a filter every item read is returned
+                kwargs["Limit"] = limit - len(configs)
+            response = self.table.scan(**kwargs)
+            for item in response["Items"]:
+                configs.append(RoleConfig.model_construct(**item))
+                if len(configs) == limit:
+                    break
+            if "LastEvaluatedKey" not in response:
+                break
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        return configs
+
+    async def get(self, role_id: str) -> Optional[RoleConfig]:
+        return await asyncio.to_thread(self._get, role_id)
+
+    async def list(self) -> List[RoleConfig]:
+        return await asyncio.to_thread(self._list)
+
+    async def query(
+        self,
+        filters: Dict[str, str],
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[RoleConfig]:
+        """
+        Scans the table page by page with a ``FilterExpression`` and stops
+        as soon as ``limit`` configs matched. Configs come in the scan order
+        of the table, not sorted by roleId: ``after`` is the last roleId of
+        the previous page and resumes the scan right after it, as
+        ``ExclusiveStartKey``. A page costs the items read to fill it, not
+        the whole table.
+        """
+
+        return await asyncio.to_thread(self._query, filters, after, limit)
+
+    async def create(self, config: RoleConfig) -> bool:
+        return await asyncio.to_thread(
+            self._put, config, f"attribute_not_exists({KEY})"
+        )
+
+    async def update(self, config: RoleConfig) -> bool:
+        return await asyncio.to_thread(self._put, config, f"attribute_exists({KEY})")
+
+
+def create_store(kind: Optional[str] = None) -> RoleConfigStore:
+    kind = kind or os.environ.get("ROLE_STORE", "memory")
+    if kind == "memory":
+        return InMemoryStore()
+    if kind == "sqlite":
+        return SQLiteStore(os.environ.get("ROLE_STORE_PATH", "role_configuration.db"))
+    if kind == "dynamodb":
+        return DynamoDBStore(
+            table_name=os.environ.get("ROLE_STORE_TABLE", "role_configuration"),
+            endpoint_url=os.environ.get("DYNAMODB_ENDPOINT_URL"),
+        )
+    raise ValueError(f"unknown ROLE_STORE {kind!r}")
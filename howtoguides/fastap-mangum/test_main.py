@@ -0,0 +1,225 @@
+import json
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+import main
+from storage import InMemoryStore
+
+
+def body(role_id, account="a1", environment="prod", role="dev"):
+    return {
+        "roleId": role_id,
+        "role": role,
+        "accountId": account,
+        "environment": environment,
+    }
+
+
+class TestRoleConfigurationService(unittest.TestCase):
+
+    def setUp(self):
+        store_patch = patch.object(main, "store", InMemoryStore())
+        store_patch.start()
+        self.addCleanup(store_patch.stop)
+        self.client = TestClient(main.create_app(production=False))
+
+    def create_roles(self, count):
+        roles = [
+            body(
+                f"r{index:02d}", account=f"a{index % 3}", role=("dev", "ops")[index % 2]
+            )
+            for index in range(count)
+        ]
+        for role in roles:
+            response = self.client.post(
+                f"/role_configuration/{role['roleId']}", json=role
+            )
+            self.assertEqual(response.status_code, 201)
+        return roles
+
+    def read_pages(self, path, params):
+        roles, cursor = [], None
+        while True:
+            page_params = dict(params, **({"cursor": cursor} if cursor else {}))
+            response = self.client.get(path, params=page_params)
+            self.assertEqual(response.status_code, 200)
+            roles.extend(response.json())
+            cursor = response.headers.get("x-next-cursor")
+            if cursor is None:
+                return roles
+
+    def test_create_get_update(self):
+        role = body("r1")
+        self.assertEqual(
+            self.client.post("/role_configuration/r1", json=role).json(), role
+        )
+        self.assertEqual(
+            self.client.post("/role_configuration/r1", json=role).status_code, 400
+        )
+        self.assertEqual(
+            self.client.post("/role_configuration/r2", json=role).status_code, 400
+        )
+        patched = body("r1", environment="dev")
+        self.assertEqual(
+            self.client.patch("/role_configuration/r1", json=patched).json(), patched
+        )
+        self.assertEqual(self.client.get("/role_configuration/r1").json(), patched)
+        self.assertEqual(
+            self.client.patch("/role_configuration/r9", json=body("r9")).status_code,
+            404,
+        )
+
+    def test_list_without_limit_returns_everything(self):
+        roles = self.create_roles(7)
+        response = self.client.get("/role_configuration")
+        self.assertEqual(response.json(), roles)
+        self.assertNotIn("x-next-cursor", response.headers)
+
+    def test_cursor_pagination_with_filters(self):
+        roles = self.create_roles(20)
+        for params in ({}, {"accountId": "a1"}, {"role": "ops", "accountId": "a2"}):
+            expected = [
+                role for role in roles if all(role[k] == v for k, v in params.items())
+            ]
+            with self.subTest(params=params):
+                pages = self.read_pages("/role_configuration", dict(params, limit=3))
+                self.assertEqual(pages, expected)
+
+    def test_invalid_cursor_and_limit(self):
+        self.assertEqual(
+            self.client.get("/role_configuration", params={"cursor": "!!"}).status_code,
+            400,
+        )
+        self.assertEqual(
+            self.client.get("/role_configuration", params={"limit": 0}).status_code,
+            422,
+        )
+
+    def test_ndjson(self):
+        roles = self.create_roles(12)
+        with patch.object(main, "STREAM_BATCH_SIZE", 5):
+            response = self.client.get(
+                "/role_configuration", params={"format": "ndjson", "accountId": "a0"}
+            )
+        self.assertTrue(
+            response.headers["content-type"].startswith("application/x-ndjson")
+        )
+        self.assertEqual(
+            [json.loads(line) for line in response.text.splitlines()],
+            [role for role in roles if role["accountId"] == "a0"],
+        )
+
+    def test_account_routes_follow_patches(self):
+        roles = self.create_roles(9)
+        moved = body("r00", account="a1", environment="dev")
+        self.client.patch("/role_configuration/r00", json=moved)
+
+        account = self.client.get("/accounts/a0/role_configuration").json()
+        self.assertEqual(
+            account, [role for role in roles[1:] if role["accountId"] == "a0"]
+        )
+        self.assertEqual(
+            self.client.get("/accounts/a1/environments/dev/role_configuration").json(),
+            [moved],
+        )
+        self.assertEqual(
+            self.read_pages(
+                "/accounts/a1/environments/prod/role_configuration", {"limit": 1}
+            ),
+            [role for role in roles if role["accountId"] == "a1"],
+        )
+
+    def test_bulk_upsert(self):
+        self.client.post("/role_configuration/r1", json=body("r1", environment="dev"))
+        response = self.client.post(
+            "/bulk/role_configuration", json=[body("r0"), body("r1")]
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                "created": 1,
+                "updated": 1,
+                "results": [
+                    {"roleId": "r0", "status": "created"},
+                    {"roleId": "r1", "status": "updated"},
+                ],
+            },
+        )
+        self.assertEqual(
+            self.client.get("/role_configuration/r1").json()["environment"], "prod"
+        )
+
+    def test_bulk_ndjson(self):
+        lines = "\n".join(json.dumps(body(f"r{index}")) for index in range(3))
+        response = self.client.post(
+            "/bulk/role_configuration",
+            content=lines + "\n\n",
+            headers={"content-type": "application/x-ndjson"},
+        )
+        self.assertEqual(response.json()["created"], 3)
+
+    def test_bulk_errors_locate_items_and_store_nothing(self):
+        items = [body("r0"), {"roleId": "r1", "role": "dev"}, body("r2")]
+        response = self.client.post("/bulk/role_configuration", json=items)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(
+            [error["loc"] for error in response.json()["detail"]],
+            [["body", 1, "accountId"], ["body", 1, "environment"]],
+        )
+        self.assertEqual(self.client.get("/role_configuration").json(), [])
+
+        response = self.client.post(
+            "/bulk/role_configuration",
+            content=json.dumps(body("r0")) + "\n{oops\n",
+            headers={"content-type": "application/x-ndjson"},
+        )
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()["detail"][0]["loc"], ["body", 1])
+        self.assertEqual(self.client.get("/role_configuration").json(), [])
+
+    def test_bulk_limits_are_checked_before_validation(self):
+        with patch.object(main, "MAX_BULK_ITEMS", 2):
+            # The third line is not even parsed
+            response = self.client.post(
+                "/bulk/role_configuration",
+                content=json.dumps(body("r0")) + "\n{}\n{oops\n",
+                headers={"content-type": "application/x-ndjson"},
+            )
+            self.assertEqual(response.status_code, 400)
+            response = self.client.post("/bulk/role_configuration", json=[{}, {}, {}])
+            self.assertEqual(response.status_code, 400)
+
+        with patch.object(main, "MAX_BULK_BYTES", 100):
+            items = [body("r0"), body("r1")]
+            response = self.client.post("/bulk/role_configuration", json=items)
+            self.assertEqual(response.status_code, 413)
+            # Without Content-Length the body is refused while it is read
+            chunks = iter([b"[", json.dumps(items[0]).encode(), b","] * 2)
+            response = self.client.post("/bulk/role_configuration", content=chunks)
+            self.assertEqual(response.status_code, 413)
+        self.assertEqual(self.client.get("/role_configuration").json(), [])
+
+    def test_bulk_rejects_duplicate_role_ids(self):
+        items = [body("r0"), body("r1"), body("r0", role="ops"), body("r0")]
+        response = self.client.post("/bulk/role_configuration", json=items)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(
+            [error["loc"] for error in response.json()["detail"]],
+            [["body", 2, "roleId"], ["body", 3, "roleId"]],
+        )
+        self.assertEqual(self.client.get("/role_configuration").json(), [])
+
+    def test_docs_routes(self):
+        self.assertEqual(self.client.get("/docs").status_code, 200)
+        self.assertIn(
+            "/bulk/role_configuration", self.client.get("/openapi.json").json()["paths"]
+        )
+        production = TestClient(main.create_app(production=True))
+        for path in ("/docs", "/redoc", "/openapi.json"):
+            self.assertEqual(production.get(path).status_code, 404)
+        self.assertEqual(production.get("/").status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from models import RoleConfig
+from storage import DynamoDBStore, InMemoryStore, LocalTable, SQLiteStore
+
+
+def config(role_id, account="a1", environment="prod", role="dev"):
+    return RoleConfig(
+        roleId=role_id, role=role, accountId=account, environment=environment
+    )
+
+
+class StoreTests:
+    # Run against every backend by the subclasses below
+
+    def make_store(self):
+        raise NotImplementedError
+
+    async def asyncSetUp(self):
+        self.store = self.make_store()
+
+    async def asyncTearDown(self):
+        await self.store.close()
+
+    async def test_create_get_update(self):
+        self.assertTrue(await self.store.create(config("r1")))
+        self.assertFalse(await self.store.create(config("r1", role="admin")))
+        self.assertEqual(await self.store.get("r1"), config("r1"))
+        self.assertIsNone(await self.store.get("r2"))
+
+        self.assertTrue(await self.store.update(config("r1", role="admin")))
+        self.assertFalse(await self.store.update(config("r2")))
+        self.assertEqual((await self.store.get("r1")).role, "admin")
+        self.assertIsNone(await self.store.get("r2"))
+
+    async def test_upsert_many(self):
+        await self.store.create(config("r1", environment="dev"))
+        created = await self.store.upsert_many([config("r0"), config("r1")])
+        self.assertEqual(created, [True, False])
+        self.assertEqual((await self.store.get("r1")).environment, "prod")
+        self.assertEqual(len(await self.store.list()), 2)
+
+    async def test_query(self):
+        for index in range(12):
+            await self.store.create(
+                config(f"r{index:02d}", account=f"a{index % 3}", role="dev")
+            )
+        everything = await self.store.query({})
+        self.assertEqual(
+            [c.roleId for c in everything], [f"r{i:02d}" for i in range(12)]
+        )
+        page = await self.store.query({"accountId": "a1"}, after="r01", limit=2)
+        self.assertEqual([c.roleId for c in page], ["r04", "r07"])
+        self.assertEqual(await self.store.query({"accountId": "zz"}), [])
+
+    async def test_query_after_update(self):
+        await self.store.create(config("r1", account="a1", environment="dev"))
+        await self.store.create(config("r2", account="a1", environment="prod"))
+        await self.store.update(config("r1", account="a2", environment="prod"))
+        by_account = await self.store.query({"accountId": "a1"})
+        self.assertEqual([c.roleId for c in by_account], ["r2"])
+        moved = await self.store.query({"accountId": "a2", "environment": "prod"})
+        self.assertEqual([c.roleId for c in moved], ["r1"])
+        self.assertEqual(
+            await self.store.query({"accountId": "a1", "environment": "dev"}), []
+        )
+
+
+class TestInMemoryStore(StoreTests, unittest.IsolatedAsyncioTestCase):
+
+    def make_store(self):
+        return InMemoryStore()
+
+    async def test_indexes_follow_updates(self):
+        await self.store.create(config("r1", account="a1", environment="dev"))
+        await self.store.create(config("r2", account="a1", environment="dev"))
+        await self.store.update(config("r1", account="a2", environment="prod"))
+        by_fields = {index.fields: index.ids for index in self.store.indexes}
+        self.assertEqual(by_fields[("accountId",)], {("a1",): ["r2"], ("a2",): ["r1"]})
+        self.assertEqual(
+            by_fields[("accountId", "environment")],
+            {("a1", "dev"): ["r2"], ("a2", "prod"): ["r1"]},
+        )
+        # Emptied entries are dropped rather than left as empty lists
+        await self.store.update(config("r2", account="a2", environment="prod"))
+        self.assertEqual(by_fields[("accountId",)], {("a2",): ["r1", "r2"]})
+
+
+class TestSQLiteStore(StoreTests, unittest.IsolatedAsyncioTestCase):
+
+    def make_store(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        return SQLiteStore(os.path.join(self.tmpdir.name, "roles.db"), pool_size=2)
+
+    async def test_upsert_many_rolls_back(self):
+        await self.store.create(config("r1", environment="dev"))
+        with patch.object(SQLiteStore, "_update", side_effect=RuntimeError("disk")):
+            with self.assertRaises(RuntimeError):
+                await self.store.upsert_many([config("r0"), config("r1")])
+        self.assertIsNone(await self.store.get("r0"))
+        self.assertEqual((await self.store.get("r1")).environment, "dev")
+        # The connection is usable again once the transaction is gone
+        self.assertTrue(await self.store.create(config("r2")))
+
+    async def test_data_is_shared_between_stores(self):
+        await self.store.create(config("r1"))
+        other = SQLiteStore(self.store.path, pool_size=1)
+        try:
+            self.assertEqual(await other.get("r1"), config("r1"))
+        finally:
+            await other.close()
+
+
+class TestDynamoDBStore(StoreTests, unittest.IsolatedAsyncioTestCase):
+
+    def make_store(self):
+        # Small pages, so scans have to follow LastEvaluatedKey
+        return DynamoDBStore(table=LocalTable(page_size=5))
+
+    async def test_query_reads_only_what_the_page_needs(self):
+        for index in range(40):
+            await self.store.create(config(f"r{index:02d}", account=f"a{index % 4}"))
+        scans = []
+        original = self.store.table.scan
+
+        def counting_scan(**kwargs):
+            scans.append(kwargs)
+            return original(**kwargs)
+
+        self.store.table.scan = counting_scan
+        page = await self.store.query({"accountId": "a1"}, limit=3)
+        self.assertEqual([c.roleId for c in page], ["r01", "r05", "r09"])
+        # 3 matches out of every 4 items: two pages of 5 are enough
+        self.assertEqual(len(scans), 2)
+        self.assertEqual(scans[0]["ExpressionAttributeValues"], {":v0": "a1"})
+
+        scans.clear()
+        page = await self.store.query({}, after="r09", limit=2)
+        self.assertEqual([c.roleId for c in page], ["r10", "r11"])
+        self.assertEqual(scans, [{"ExclusiveStartKey": {"roleId": "r09"}, "Limit": 2}])
+
+
+if __name__ == "__main__":
+    unittest.main()